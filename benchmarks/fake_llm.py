@@ -0,0 +1,85 @@
+import asyncio
+import json
+import re
+import time
+from typing import AsyncIterator, Iterator
+
+# The prompt templates render these lines for every endpoint
+_ENDPOINT_LINE = re.compile(r"^\s*Endpoint: (\S+)\s*$", re.MULTILINE)
+_METHOD_LINE = re.compile(r"^\s*Method: (\S+)\s*$", re.MULTILINE)
+
+
+class FakeLLMError(Exception):
+    """An injected provider failure, carrying an HTTP status like the OpenAI client's errors."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"fake LLM returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeLLMManager:
+    """
+    Deterministic stand-in for LLMManager: no network, a fixed latency per call and a JSON array of
+    `cases_per_endpoint` test cases for the endpoint named in the prompt. Completions are streamed
+    in `chunk_size` character chunks, like the model's token stream. The first `failures` calls
+    raise FakeLLMError with `error_status` after the latency, e.g. to exercise LLMPool retries.
+    """
+
+    def __init__(self, latency: float = 0.0, cases_per_endpoint: int = 4, chunk_size: int = 16,
+                 model_name: str = "fake-model", max_tokens: int = 2048, failures: int = 0,
+                 error_status: int = 503):
+        self.latency = latency
+        self.cases_per_endpoint = cases_per_endpoint
+        self.chunk_size = chunk_size
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.failures = failures
+        self.error_status = error_status
+        self.calls = 0
+
+    def completion(self, prompt: str) -> str:
+        path = _ENDPOINT_LINE.search(prompt)
+        method = _METHOD_LINE.search(prompt)
+        path = path.group(1) if path else "/"
+        method = method.group(1) if method else "GET"
+        cases = [{
+            "Test Case Name": f"{method} {path} case {i}",
+            "Description": "Generated by the benchmark fake LLM.",
+            "Endpoint": re.sub(r"\{[^}]+\}", "1", path),
+            "Method": method,
+            "Operation ID": "",
+            "Summary": "",
+            "Request Body": {"name": "bench", "value": i},
+            "Expected Status Code": 200,
+            "Headers": {},
+        } for i in range(self.cases_per_endpoint)]
+        return "```json\n" + json.dumps(cases, indent=2) + "\n```"
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        for start in range(0, len(text), self.chunk_size):
+            yield text[start:start + self.chunk_size]
+
+    def _answer(self, prompt: str) -> str:
+        if self.calls <= self.failures:
+            raise FakeLLMError(self.error_status)
+        return self.completion(prompt)
+
+    def generate_response(self, prompt: str, bypass_cache: bool = False) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._answer(prompt)
+
+    async def agenerate_response(self, prompt: str, bypass_cache: bool = False) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._answer(prompt)
+
+    def stream_response(self, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        yield from self._chunks(self.generate_response(prompt, bypass_cache))
+
+    async def astream_response(self, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        for chunk in self._chunks(await self.agenerate_response(prompt, bypass_cache)):
+            yield chunk
+
+    def evict(self, prompt: str) -> None:
+        pass
@@ -0,0 +1,179 @@
+"""
+Offline benchmark harness: times the spec, generation, parsing, execution and export hot paths
+against synthetic specs, the fake LLM and a local stub API, and writes the timings as JSON.
+
+    python -m benchmarks --sizes 10 100 1000 --repeat 3
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fake_llm import FakeLLMManager
+from benchmarks.specs import synthetic_spec
+from benchmarks.stub_api import StubAPI
+from utils.export import iter_csv
+from utils.utils import (
+    execute_test_cases,
+    extract_endpoints_from_swagger,
+    extract_json_array,
+    generate_test_cases,
+    resolve_schema_refs,
+)
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class BenchmarkContext:
+    """Inputs shared by the benchmarks of one spec size, built once outside the timed region."""
+
+    def __init__(self, size: int, depth: int, llm: FakeLLMManager, stub: StubAPI, workdir: str, args):
+        self.size = size
+        self.llm = llm
+        self.stub = stub
+        self.args = args
+        self.spec = synthetic_spec(size, depth)
+        self.spec_path = os.path.join(workdir, f"spec_{size}.json")
+        with open(self.spec_path, "w") as f:
+            json.dump(self.spec, f)
+        self.extracted = extract_endpoints_from_swagger(self.spec_path, allow_local=True)
+        self.test_cases = generate_test_cases(self.extracted.endpoints[:min(size, args.max_execute_endpoints)], llm)
+        # A completion holding `size` test cases, fenced like real model output
+        cases = [self.test_cases[i % len(self.test_cases)] for i in range(size)]
+        self.llm_output = "```json\n" + json.dumps(cases, indent=2) + "\n```"
+
+
+def bench_extract(ctx: BenchmarkContext) -> int:
+    extract_endpoints_from_swagger(ctx.spec_path, allow_local=True)
+    return ctx.size
+
+
+def bench_resolve(ctx: BenchmarkContext) -> int:
+    definitions = ctx.spec["definitions"]
+    operations = [op for item in ctx.spec["paths"].values() for op in item.values()]
+    for operation in operations:
+        resolve_schema_refs(operation["responses"]["200"]["schema"], definitions)
+    return len(operations)
+
+
+def bench_generate(ctx: BenchmarkContext) -> int:
+    generate_test_cases(ctx.extracted.endpoints, ctx.llm, max_concurrency=ctx.args.generation_concurrency)
+    return ctx.size
+
+
+def bench_parse(ctx: BenchmarkContext) -> int:
+    return len(extract_json_array(ctx.llm_output))
+
+
+def bench_execute(ctx: BenchmarkContext) -> int:
+    execute_test_cases(ctx.test_cases, max_workers=ctx.args.execution_workers, base_url=ctx.stub.base_url)
+    return len(ctx.test_cases)
+
+
+def bench_export_csv(ctx: BenchmarkContext) -> int:
+    cases = ctx.test_cases
+    rows = [cases[i % len(cases)] for i in range(ctx.size * 10)]
+    for _ in iter_csv(rows):
+        pass
+    return len(rows)
+
+
+# Benchmark name -> function timed once per repeat; it returns the number of items it processed
+BENCHMARKS = {
+    "extract_endpoints_from_swagger": bench_extract,
+    "resolve_schema_refs": bench_resolve,
+    "generate_test_cases": bench_generate,
+    "extract_json_array": bench_parse,
+    "execute_test_cases": bench_execute,
+    "export_csv": bench_export_csv,
+}  # type: Dict[str, Callable[[BenchmarkContext], int]]
+
+
+def time_benchmark(name: str, func: Callable[[BenchmarkContext], int], ctx: BenchmarkContext, repeat: int) -> dict:
+    timings, items = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = func(ctx)
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        "benchmark": name,
+        "size": ctx.size,
+        "items": items,
+        "repeat": repeat,
+        "seconds": timings,
+        "min_seconds": min(timings),
+        "median_seconds": median,
+        "items_per_second": items / median if median else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(args) -> dict:
+    selected = args.only or list(BENCHMARKS)
+    llm = FakeLLMManager(latency=args.llm_latency, cases_per_endpoint=args.cases_per_endpoint)
+    results = []  # type: List[dict]
+    with StubAPI(latency=args.api_latency) as stub, tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            ctx = BenchmarkContext(size, args.depth, llm, stub, workdir, args)
+            for name in selected:
+                result = time_benchmark(name, BENCHMARKS[name], ctx, args.repeat)
+                results.append(result)
+                print(f"{name:<32} size={size:<6} median={result['median_seconds'] * 1000:10.2f} ms "
+                      f"items/s={result['items_per_second'] or 0:12.1f}", flush=True)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="operations per synthetic spec")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark and size")
+    parser.add_argument("--depth", type=int, default=6, help="nesting depth of the synthetic model chain")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake LLM latency per call, in seconds")
+    parser.add_argument("--cases-per-endpoint", type=int, default=4, help="test cases the fake LLM returns per endpoint")
+    parser.add_argument("--generation-concurrency", type=int, default=8, help="max_concurrency for generate_test_cases")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="stub API latency per request, in seconds")
+    parser.add_argument("--execution-workers", type=int, default=16, help="max_workers for execute_test_cases")
+    parser.add_argument("--max-execute-endpoints", type=int, default=500,
+                        help="endpoints whose generated cases are executed and exported")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--log-level", default="WARNING", help="level for the application logger during runs")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.getLogger("utils").setLevel(args.log_level.upper())
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
@@ -0,0 +1,87 @@
+from typing import Dict
+
+METHODS = ("get", "post", "put", "delete")
+
+
+def _definitions(depth: int) -> Dict[str, dict]:
+    """A chain of `depth` nested models plus a self-referencing and two mutually recursive ones."""
+    definitions = {
+        "Leaf": {
+            "type": "object",
+            "required": ["id"],
+            "properties": {
+                "id": {"type": "integer", "minimum": 1},
+                "name": {"type": "string", "maxLength": 32},
+                "score": {"type": "number"},
+                "active": {"type": "boolean"},
+                "created": {"type": "string", "format": "date-time"},
+                "status": {"type": "string", "enum": ["new", "active", "closed"]},
+            },
+        },
+        "Node": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "parent": {"$ref": "#/definitions/Node"},
+                "children": {"type": "array", "items": {"$ref": "#/definitions/Node"}},
+            },
+        },
+        "Owner": {"type": "object", "properties": {"id": {"type": "integer"}, "pets": {"type": "array", "items": {"$ref": "#/definitions/Pet"}}}},
+        "Pet": {"type": "object", "properties": {"id": {"type": "integer"}, "owner": {"$ref": "#/definitions/Owner"}}},
+    }
+    previous = "Leaf"
+    for level in range(depth):
+        name = f"Level{level}"
+        definitions[name] = {
+            "type": "object",
+            "required": ["child"],
+            "properties": {
+                "child": {"$ref": f"#/definitions/{previous}"},
+                "items": {"type": "array", "items": {"$ref": f"#/definitions/{previous}"}},
+                "node": {"$ref": "#/definitions/Node"},
+                "owner": {"$ref": "#/definitions/Owner"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+            },
+        }
+        previous = name
+    return definitions
+
+
+def synthetic_spec(operations: int, depth: int = 6) -> dict:
+    """
+    A Swagger 2.0 spec with `operations` operations spread over resources of up to four methods
+    each. Bodies and responses reference a `depth`-level model chain and cyclic definitions.
+    """
+    top = f"Level{depth - 1}" if depth else "Leaf"
+    paths = {}
+    for index in range(operations):
+        resource, method = divmod(index, len(METHODS))
+        method = METHODS[method]
+        path = f"/resource{resource}/{{id}}" if method in ("get", "delete") else f"/resource{resource}"
+        operation = {
+            "operationId": f"{method}Resource{resource}",
+            "summary": f"{method.upper()} resource {resource}",
+            "parameters": [],
+            "responses": {
+                "200": {"description": "OK", "schema": {"$ref": f"#/definitions/{top}"}},
+                "400": {"description": "Invalid input"},
+                "404": {"description": "Not found"},
+            },
+        }
+        if "{id}" in path:
+            operation["parameters"].append({"name": "id", "in": "path", "required": True, "type": "integer"})
+            operation["parameters"].append({"name": "verbose", "in": "query", "required": False, "type": "boolean"})
+        else:
+            operation["parameters"].append({
+                "name": "body", "in": "body", "required": True, "schema": {"$ref": f"#/definitions/{top}"}
+            })
+        paths.setdefault(path, {})[method] = operation
+
+    return {
+        "swagger": "2.0",
+        "info": {"title": f"Synthetic API ({operations} operations)", "version": "1.0"},
+        "host": "127.0.0.1",
+        "basePath": "/",
+        "paths": paths,
+        "definitions": _definitions(depth),
+    }
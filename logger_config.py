@@ -1,35 +1,180 @@
-
-import os
+import atexit
+import copy
+import json
 import logging
-from datetime import datetime
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+from utils.constants import (
+    DEFAULT_LOG_BACKUP_COUNT,
+    DEFAULT_LOG_MAX_BODY_CHARS,
+    DEFAULT_LOG_MAX_BYTES,
+    DEFAULT_LOG_QUEUE_SIZE,
+    DEFAULT_LOG_SAMPLE_BURST,
+    DEFAULT_LOG_SAMPLE_EVERY,
+    DEFAULT_LOG_SAMPLE_WINDOW,
+)
+from utils.metrics import LOG_RECORDS_DROPPED
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through `extra` and goes into the JSON record
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+_listener = None  # type: Optional[logging.handlers.QueueListener]
+_queue_handler = None  # type: Optional[logging.handlers.QueueHandler]
+_setup_lock = threading.Lock()
+max_body_chars = DEFAULT_LOG_MAX_BODY_CHARS
+
+
+def truncate_body(text: Optional[str], limit: Optional[int] = None) -> Optional[str]:
+    """`text` cut to `limit` characters (the configured `logging.max_body_chars` by default; 0 keeps all)."""
+    limit = max_body_chars if limit is None else limit
+    if not text or not limit or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more characters]"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, `extra` fields and any traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class FailureSampler(logging.Filter):
+    """
+    Thin out repetitive records: records carrying a `sample_key` extra pass for the first `burst`
+    occurrences of that key per `window` seconds, then one in every `every`. A passing record
+    reports how many were dropped before it in `suppressed`. Records without a key always pass.
+    """
+
+    def __init__(self, burst: int = DEFAULT_LOG_SAMPLE_BURST, every: int = DEFAULT_LOG_SAMPLE_EVERY,
+                 window: float = DEFAULT_LOG_SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.every = max(1, every)
+        self.window = window
+        self._seen = {}  # sample key -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] > self.window:
+                if len(self._seen) > 10000:  # Bound memory under many distinct keys
+                    self._seen.clear()
+                # Drops from the previous window are still reported on the next record that passes
+                state = self._seen[key] = [now, 0, state[2] if state else 0]
+            state[1] += 1
+            if state[1] > self.burst and (state[1] - self.burst) % self.every:
+                state[2] += 1
+                return False
+            if state[2]:
+                record.suppressed = state[2]
+                state[2] = 0
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler over a bounded queue that drops records when it is full instead of blocking the caller."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        A copy of `record` with its arguments merged into the message, like the stdlib QueueHandler:
+        the listener formats it later on its own thread, when mutable arguments may have changed.
+        A traceback is rendered to `exc_text` so queued records do not keep its frames alive.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-def setup_logger():
-    # Create logs directory if it doesn't exist
-    logs_dir = 'logs'
-    if not os.path.exists(logs_dir):
-        os.makedirs(logs_dir)
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
 
-    # Create a unique log filename with timestamp
-    log_filename = os.path.join(logs_dir, f'api_test_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
 
-    # Create a logger
-    logger = logging.getLogger('API_Testing')
-    logger.setLevel(logging.INFO)
+def setup_logging(log_config: Optional[dict] = None) -> None:
+    """
+    Route all logging through a bounded queue. A background listener thread writes text to the
+    console and JSON lines to a size-rotated file; callers only enqueue. Safe to call more than
+    once: later calls are ignored.
+    """
+    global _listener, _queue_handler, max_body_chars
+    log_config = log_config or {}
+    with _setup_lock:
+        if _listener is not None:
+            return
+        max_body_chars = log_config.get("max_body_chars", DEFAULT_LOG_MAX_BODY_CHARS)
 
-    # Create handlers
-    file_handler = logging.FileHandler(log_filename)
-    console_handler = logging.StreamHandler()
+        handlers = []
+        log_file = log_config.get("file", os.path.join("logs", "testrogue.log"))
+        if log_file:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=log_config.get("max_bytes", DEFAULT_LOG_MAX_BYTES),
+                backupCount=log_config.get("backup_count", DEFAULT_LOG_BACKUP_COUNT),
+                encoding="utf-8",
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        if log_config.get("console", True):
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+            handlers.append(console_handler)
 
-    # Create formatters and add it to handlers
-    log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(log_format)
-    console_handler.setFormatter(log_format)
+        queue_handler = DroppingQueueHandler(queue.Queue(log_config.get("queue_size", DEFAULT_LOG_QUEUE_SIZE)))
+        queue_handler.addFilter(FailureSampler(
+            burst=log_config.get("sample_burst", DEFAULT_LOG_SAMPLE_BURST),
+            every=log_config.get("sample_every", DEFAULT_LOG_SAMPLE_EVERY),
+            window=log_config.get("sample_window_seconds", DEFAULT_LOG_SAMPLE_WINDOW),
+        ))
 
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+        root = logging.getLogger()
+        root.setLevel(log_config.get("level", "INFO").upper())
+        root.addHandler(queue_handler)
+        _queue_handler = queue_handler
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
 
-    return logger
 
-# Create a global logger instance
-logger = setup_logger()
\ No newline at end of file
+def stop_logging() -> None:
+    """Flush the queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _listener.stop()
+            _listener, _queue_handler = None, None
@@ -1,5 +1,5 @@
  let currentEndpoints = [];  // store current endpoints globally
-  let extractedDefinitions = {};
+  let currentSpecId = null; // server-side handle for the extracted spec and its generated suites
   let allGeneratedTestCases = {}; // Store test cases grouped by endpoint path-method
 
   async function extractEndpoints() {
@@ -26,7 +26,7 @@
       console.log("Extracted data swagger:", data.swagger); // Log the extracted data for debugging
 
       currentEndpoints = data.endpoints;  // store endpoints globally
-      extractedDefinitions = data.definitions || {};
+      currentSpecId = data.spec_id;
 
       // Update bulk button text
       const generateAllBtn = document.getElementById('generateAllBtn');
@@ -116,7 +116,7 @@
       const response = await fetch('/generate_single_test', { // New Flask endpoint
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ endpoint: endpoint })
+        body: JSON.stringify({ spec_id: currentSpecId, operation: endpoint.operation_key })
       });
 
       if (!response.ok) throw new Error(`Failed to generate test cases for ${method} ${path}`);
@@ -152,29 +152,24 @@
         return; // Stop execution if no tests
       }
 
-      // Show a loading message while executing
-      testCasesSection.innerHTML = "<p class='loading'>Executing tests for this endpoint...</p>";
-
+      // Render every card as "Not Executed" and fill results in as they stream back
+      renderTestResults(generatedTests, {}, testCasesSection);
+      const testsByName = {};
+      generatedTests.forEach(tc => testsByName[tc['Test Case Name']] = tc);
 
       const response = await fetch('/execute_tests', { // Can reuse existing /execute_tests
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ test_cases: generatedTests })
+        body: JSON.stringify({ spec_id: currentSpecId, operations: [`${method} ${path}`], stream: 'ndjson' })
       });
 
       if (!response.ok) throw new Error(`Failed to execute test cases for ${method} ${path}`);
-      const data = await response.json(); // This data contains summary and individual test results
-
-      // Pass only the individual test case results relevant to this endpoint
-      const individualResults = {};
-      // Filter out the summary from data before passing to renderTestResults
-      for (const key in data) {
-          if (key !== 'summary') {
-              individualResults[key] = data[key];
-          }
-      }
 
-      renderTestResults(generatedTests, individualResults, testCasesSection); // Pass only individual results
+      await readNdjson(response, record => {
+        if (record.type === 'result' && testsByName[record.test_case_name]) {
+          updateTestResultCard(testsByName[record.test_case_name], record);
+        }
+      });
       button.textContent = 'Execute Tests';
       button.disabled = false;
     } catch (error) {
@@ -206,93 +201,151 @@
   }
 
 
-  function renderTestResults(testCases, individualResults, targetElement) { // Renamed resultsData to individualResults for clarity
-    if (!testCases || testCases.length === 0) {
-      targetElement.innerHTML = "<p class='info'>No test cases to display results for.</p>";
-      return;
+  // Read an NDJSON response body and call onRecord for every complete line as it arrives
+  async function readNdjson(response, onRecord) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop(); // Keep the trailing partial line for the next chunk
+      lines.filter(line => line.trim()).forEach(line => onRecord(JSON.parse(line)));
     }
+    buffer += decoder.decode();
+    if (buffer.trim()) onRecord(JSON.parse(buffer));
+  }
 
-    const testCaseHtml = testCases.map(tc => {
-      const tcName = tc['Test Case Name'];
-      const result = individualResults[tcName]; // Get result for this specific test case
-      let statusClass = '';
-      let statusText = 'Not Executed';
-      let errorInfo = '';
-      let actualStatusCode = '';
-      let responseTimeInfo = '';
-      let actualResponseContent = ''; // Variable for the actual response body
-
-      if (result) {
-        statusText = result.status;
-        statusClass = result.status.toLowerCase();
-        if (result.error) {
-          errorInfo = `<p class='error'><strong>Error:</strong> ${result.error}</p>`;
-        }
-        if (result.actual_status_code) {
-          actualStatusCode = `<p><strong>Actual Status:</strong> ${result.actual_status_code}</p>`;
-        }
-        if (result.response_time) {
-          responseTimeInfo = `<p><strong>Response Time:</strong> ${result.response_time.toFixed(4)}s</p>`;
-        }
-        // Capture and format actual response body
-        if (result.actual_response_body !== undefined && result.actual_response_body !== null) {
+  // Submit a background job and poll its records until it finishes, calling onRecord for each new one
+  async function runJob(url, payload, onRecord, pollIntervalMs = 1000) {
+    const submitResponse = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload)
+    });
+    if (!submitResponse.ok) throw new Error("Failed to submit background job");
+    const { job_id } = await submitResponse.json();
+
+    let after = 0;
+    while (true) {
+      const response = await fetch(`/jobs/${job_id}/records?after=${after}`);
+      if (!response.ok) throw new Error("Failed to fetch job progress");
+      const { job, records } = await response.json();
+      records.forEach(record => {
+        after = record.seq;
+        onRecord(record);
+      });
+
+      if (job.status === 'succeeded') return job;
+      if (job.status === 'failed') throw new Error(job.error || "Background job failed");
+      if (job.status === 'cancelled') throw new Error("Background job was cancelled");
+      await new Promise(resolve => setTimeout(resolve, pollIntervalMs));
+    }
+  }
+
+  function getResultCardId(tcName) {
+    return `result-card-${btoa(tcName).replace(/=/g, '')}`;
+  }
+
+  function renderTestResultCard(tc, result) {
+    const tcName = tc['Test Case Name'];
+    let statusClass = '';
+    let statusText = 'Not Executed';
+    let errorInfo = '';
+    let actualStatusCode = '';
+    let responseTimeInfo = '';
+    let actualResponseContent = ''; // Variable for the actual response body
+
+    if (result) {
+      statusText = result.status;
+      statusClass = result.status.toLowerCase();
+      if (result.error) {
+        errorInfo = `<p class='error'><strong>Error:</strong> ${result.error}</p>`;
+      }
+      if (result.actual_status_code) {
+        actualStatusCode = `<p><strong>Actual Status:</strong> ${result.actual_status_code}</p>`;
+      }
+      if (result.response_time) {
+        responseTimeInfo = `<p><strong>Response Time:</strong> ${result.response_time.toFixed(4)}s</p>`;
+      }
+      // Capture and format actual response body
+      if (result.actual_response_body !== undefined && result.actual_response_body !== null) {
+          try {
+              // Try to pretty-print JSON responses
+              actualResponseContent = JSON.stringify(result.actual_response_body, null, 2);
+          } catch (e) {
+              // If not JSON, just display as plain text
+              actualResponseContent = String(result.actual_response_body);
+          }
+      }
+    }
+
+    // Generate a unique ID for the expandable content of this test case
+    const contentId = `response-content-${btoa(tcName).replace(/=/g, '')}`;
+
+    return `
+      <div class="test-case-card" id="${getResultCardId(tcName)}">
+        <span class="test-case-status ${statusClass}">${statusText}</span>
+        <h4>${tcName || 'Unnamed Test Case'}</h4>
+        <p><strong>Description:</strong> ${tc['Description'] || 'N/A'}</p>
+        <p><strong>Endpoint:</strong> ${tc['Endpoint'] || 'N/A'}</p>
+        <p><strong>Method:</strong> ${tc['Method'] || 'N/A'}</p>
+        <p><strong>Expected Status:</strong> ${tc['Expected Status Code'] || 'N/A'}</p>
+        ${actualStatusCode}
+        ${responseTimeInfo}
+        ${errorInfo}
+        ${tc['Request Body'] && Object.keys(tc['Request Body']).length > 0 ? `
+          <p><strong>Request Body:</strong></p><pre>${JSON.stringify(tc['Request Body'], null, 2)}</pre>` : ''}
+        ${tc['Headers'] && Object.keys(tc['Headers']).length > 0 ? `
+          <p><strong>Headers:</strong></p><pre>${JSON.stringify(tc['Headers'], null, 2)}</pre>` : ''}
+
+        ${actualResponseContent ? `
+          <button class="expand-collapse-btn" onclick="toggleResponseDisplay('${contentId}', this)" aria-expanded="false">
+              <span>Show Actual Response</span> <span class="arrow">&#9660;</span>
+          </button>
+          <pre id="${contentId}" class="expandable-content"></pre>
+        ` : ''}
+      </div>
+    `;
+  }
+
+  // Populate the pre tag for the actual response content once the card is in the DOM
+  function fillActualResponse(tc, result) {
+    if (result && result.actual_response_body !== undefined && result.actual_response_body !== null) {
+        const contentId = `response-content-${btoa(tc['Test Case Name']).replace(/=/g, '')}`;
+        const preElement = document.getElementById(contentId);
+        if (preElement) {
             try {
-                // Try to pretty-print JSON responses
-                actualResponseContent = JSON.stringify(result.actual_response_body, null, 2);
+                preElement.textContent = JSON.stringify(result.actual_response_body, null, 2);
             } catch (e) {
-                // If not JSON, just display as plain text
-                actualResponseContent = String(result.actual_response_body);
+                preElement.textContent = String(result.actual_response_body);
             }
         }
-      }
+    }
+  }
 
-      // Generate a unique ID for the expandable content of this test case
-      const contentId = `response-content-${btoa(tcName).replace(/=/g, '')}`;
-
-      return `
-        <div class="test-case-card">
-          <span class="test-case-status ${statusClass}">${statusText}</span>
-          <h4>${tcName || 'Unnamed Test Case'}</h4>
-          <p><strong>Description:</strong> ${tc['Description'] || 'N/A'}</p>
-          <p><strong>Endpoint:</strong> ${tc['Endpoint'] || 'N/A'}</p>
-          <p><strong>Method:</strong> ${tc['Method'] || 'N/A'}</p>
-          <p><strong>Expected Status:</strong> ${tc['Expected Status Code'] || 'N/A'}</p>
-          ${actualStatusCode}
-          ${responseTimeInfo}
-          ${errorInfo}
-          ${tc['Request Body'] && Object.keys(tc['Request Body']).length > 0 ? `
-            <p><strong>Request Body:</strong></p><pre>${JSON.stringify(tc['Request Body'], null, 2)}</pre>` : ''}
-          ${tc['Headers'] && Object.keys(tc['Headers']).length > 0 ? `
-            <p><strong>Headers:</strong></p><pre>${JSON.stringify(tc['Headers'], null, 2)}</pre>` : ''}
-
-          ${actualResponseContent ? `
-            <button class="expand-collapse-btn" onclick="toggleResponseDisplay('${contentId}', this)" aria-expanded="false">
-                <span>Show Actual Response</span> <span class="arrow">&#9660;</span>
-            </button>
-            <pre id="${contentId}" class="expandable-content"></pre>
-          ` : ''}
-        </div>
-      `;
-    }).join('');
+  function renderTestResults(testCases, individualResults, targetElement) { // Renamed resultsData to individualResults for clarity
+    if (!testCases || testCases.length === 0) {
+      targetElement.innerHTML = "<p class='info'>No test cases to display results for.</p>";
+      return;
+    }
 
+    const testCaseHtml = testCases.map(tc => renderTestResultCard(tc, individualResults[tc['Test Case Name']])).join('');
     targetElement.innerHTML = `<h3>Test Execution Results (${testCases.length} test cases)</h3>${testCaseHtml}`;
 
     // After HTML is rendered, populate the pre tags for actual response content
-    testCases.forEach(tc => {
-        const tcName = tc['Test Case Name'];
-        const result = individualResults[tcName];
-        if (result && result.actual_response_body !== undefined && result.actual_response_body !== null) {
-            const contentId = `response-content-${btoa(tcName).replace(/=/g, '')}`;
-            const preElement = document.getElementById(contentId);
-            if (preElement) {
-                try {
-                    preElement.textContent = JSON.stringify(result.actual_response_body, null, 2);
-                } catch (e) {
-                    preElement.textContent = String(result.actual_response_body);
-                }
-            }
-        }
-    });
+    testCases.forEach(tc => fillActualResponse(tc, individualResults[tc['Test Case Name']]));
+  }
+
+  // Replace a single rendered card with its executed result
+  function updateTestResultCard(tc, result) {
+    const card = document.getElementById(getResultCardId(tc['Test Case Name']));
+    if (card) {
+      card.outerHTML = renderTestResultCard(tc, result);
+      fillActualResponse(tc, result);
+    }
   }
 
   // New JavaScript function for toggling display
@@ -310,6 +363,38 @@
   }
 
 
+  // Generate in a background job and render each endpoint's batch in its section as soon as it arrives
+  async function streamGenerateAll(statusDiv) {
+    // Clear previous individual test cases
+    allGeneratedTestCases = {};
+    let allTests = [];
+    let completedEndpoints = 0;
+
+    await runJob('/jobs/generate_tests', { spec_id: currentSpecId }, record => {
+      if (record.type !== 'endpoint') return;
+      completedEndpoints++;
+
+      const testCasesSection = document.getElementById(getTestCasesSectionId(record.path, record.method));
+      allGeneratedTestCases[`${record.path}-${record.method}`] = record.test_cases; // Store for future execution
+      allTests = allTests.concat(record.test_cases);
+
+      if (testCasesSection) {
+        if (record.error) {
+          testCasesSection.innerHTML = `<p class='error'>Error generating test cases for ${record.method.toUpperCase()} ${record.path}: ${record.error}</p>`;
+        } else if (record.test_cases.length > 0) {
+          renderTestCases(record.test_cases, testCasesSection);
+        } else {
+          testCasesSection.innerHTML = `<p class='info'>No test cases generated for ${record.method.toUpperCase()} ${record.path}.</p>`; // Info message, capitalize method
+        }
+        testCasesSection.style.display = 'block';
+      }
+
+      statusDiv.innerHTML = `<p class='loading'>Generated test cases for ${completedEndpoints} of ${currentEndpoints.length} endpoints...</p>`;
+    });
+
+    return allTests;
+  }
+
   // Bulk generate test cases for all endpoints
   async function generateTestsForAll() {
     if (!currentEndpoints.length) {
@@ -326,40 +411,7 @@
 
 
     try {
-      const response = await fetch('/generate_tests', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ endpoints: currentEndpoints, definitions: extractedDefinitions  })
-      });
-
-      if (!response.ok) throw new Error("Failed to generate test cases for all endpoints");
-      const data = await response.json();
-      const allTests = data.test_cases || [];
-
-      // Clear previous individual test cases
-      allGeneratedTestCases = {};
-
-      // Distribute and render generated test cases to their respective sections
-      currentEndpoints.forEach(ep => {
-        const sectionId = getTestCasesSectionId(ep.path, ep.method);
-        const testCasesSection = document.getElementById(sectionId);
-        const swaggerPath = ep.path.replace(/{[^}]+}/g, '[^/]+');  // Convert to regex
-        const pathRegex = new RegExp(`^${swaggerPath}$`);
-
-        const generatedTestsForEndpoint = allTests.filter(
-          tc => pathRegex.test(tc.Endpoint) && tc.Method.toLowerCase() === ep.method.toLowerCase() // Case-insensitive method check
-        );
-
-        allGeneratedTestCases[`${ep.path}-${ep.method}`] = generatedTestsForEndpoint; // Store for future execution
-
-        renderTestCases(generatedTestsForEndpoint, testCasesSection);
-        if (generatedTestsForEndpoint.length > 0) {
-            testCasesSection.style.display = 'block'; // Show section if tests are generated
-        } else {
-            testCasesSection.innerHTML = `<p class='info'>No test cases generated for ${ep.method.toUpperCase()} ${ep.path}.</p>`; // Info message, capitalize method
-            testCasesSection.style.display = 'block';
-        }
-      });
+      const allTests = await streamGenerateAll(overallResultsDiv);
 
       overallResultsDiv.innerHTML = `<p class='success'>Successfully generated ${allTests.length} test cases across ${Object.keys(allGeneratedTestCases).length} endpoints.</p>`;
 
@@ -402,34 +454,7 @@
     if (needToGenerateAll) {
         overallResultsDiv.innerHTML = "<p class='warning'>Not all test cases are generated. Generating all test cases first...</p>";
         try {
-            const genResponse = await fetch('/generate_tests', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ endpoints: currentEndpoints, definitions: extractedDefinitions }) // Pass definitions here too
-            });
-
-            if (!genResponse.ok) throw new Error("Failed to generate test cases before bulk execution");
-            const genData = await genResponse.json();
-            allTestsToExecute = genData.test_cases || [];
-
-            // Distribute and render generated test cases to their respective sections
-            allGeneratedTestCases = {}; // Clear existing
-            currentEndpoints.forEach(ep => {
-                const swaggerPath = ep.path.replace(/{[^}]+}/g, '[^/]+');  // Convert to regex
-                const pathRegex = new RegExp(`^${swaggerPath}$`);
-                const generatedTestsForEndpoint = allTestsToExecute.filter(tc => pathRegex.test(tc.Endpoint) && tc.Method.toLowerCase() === ep.method.toLowerCase());
-                allGeneratedTestCases[`${ep.path}-${ep.method}`] = generatedTestsForEndpoint;
-
-                const sectionId = getTestCasesSectionId(ep.path, ep.method);
-                const testCasesSection = document.getElementById(sectionId);
-                renderTestCases(generatedTestsForEndpoint, testCasesSection); // Render just the generated tests
-                if (generatedTestsForEndpoint.length > 0) {
-                    testCasesSection.style.display = 'block';
-                } else {
-                    testCasesSection.innerHTML = `<p class='info'>No test cases generated for ${ep.method.toUpperCase()} ${ep.path}.</p>`;
-                    testCasesSection.style.display = 'block';
-                }
-            });
+            allTestsToExecute = await streamGenerateAll(overallResultsDiv);
 
         } catch (error) {
             overallResultsDiv.innerHTML = "<p class='error'>Error during pre-execution generation: " + error.message + "</p>";
@@ -450,40 +475,38 @@
     overallResultsDiv.innerHTML += "<p class='loading'>Executing tests for all endpoints...</p>";
 
     try {
-      const execResponse = await fetch('/execute_tests', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ test_cases: allTestsToExecute })
-      });
-
-      if (!execResponse.ok) throw new Error("Failed to execute test cases");
-      const execData = await execResponse.json();
-
-      // Render individual test results for each endpoint
+      // Render every endpoint's cards up front, then update them as results stream in
+      const testsByName = {};
       currentEndpoints.forEach(ep => {
         const sectionId = getTestCasesSectionId(ep.path, ep.method);
         const testCasesSection = document.getElementById(sectionId);
         const generatedTestsForEndpoint = allGeneratedTestCases[`${ep.path}-${ep.method}`] || [];
 
-        // Filter execData to only include results for the current endpoint's test cases
-        const individualResultsForEndpoint = {};
-        generatedTestsForEndpoint.forEach(tc => {
-            if (execData[tc['Test Case Name']]) {
-                individualResultsForEndpoint[tc['Test Case Name']] = execData[tc['Test Case Name']];
-            }
-        });
-
-        // Call renderTestResults with only the individual results for this endpoint
-        renderTestResults(generatedTestsForEndpoint, individualResultsForEndpoint, testCasesSection);
+        generatedTestsForEndpoint.forEach(tc => testsByName[tc['Test Case Name']] = tc);
+        renderTestResults(generatedTestsForEndpoint, {}, testCasesSection);
         if (generatedTestsForEndpoint.length > 0) {
             testCasesSection.style.display = 'block'; // Show section if tests were executed
         }
       });
 
+      let summary = null;
+      let executedCount = 0;
+      await runJob('/jobs/execute_tests', { spec_id: currentSpecId }, record => {
+        if (record.type === 'summary') {
+          summary = record;
+          return;
+        }
+        executedCount++;
+        if (testsByName[record.test_case_name]) {
+          updateTestResultCard(testsByName[record.test_case_name], record);
+        }
+        overallResultsDiv.innerHTML = `<p class='loading'>Executed ${executedCount} of ${allTestsToExecute.length} test cases...</p>`;
+      });
+
       // Display overall summary separately at the overallTestResults div
       // Declare a variable to hold the chart instance globally or in a scope that allows it to be reused
       let myPieChart = null;
-      if (execData.summary) {
+      if (summary) {
         const overallResultsDiv = document.getElementById('overallTestResults');
         // Set display to flex on the main overallResultsDiv for the side-by-side layout
         overallResultsDiv.style.display = 'flex';
@@ -491,10 +514,10 @@
         overallResultsDiv.style.justifyContent = 'space-between'; // Space out the header and content
         overallResultsDiv.style.alignItems = 'flex-start'; // Align content to the top
 
-        const totalCases = execData.summary.total_cases || 0;
-        const passedCases = execData.summary.passed_cases || 0;
-        const failedCases = execData.summary.failed_cases || 0;
-        const totalTime = execData.summary.total_time ? execData.summary.total_time.toFixed(4) + 's' : 'N/A';
+        const totalCases = summary.total_cases || 0;
+        const passedCases = summary.passed_cases || 0;
+        const failedCases = summary.failed_cases || 0;
+        const totalTime = summary.total_time ? summary.total_time.toFixed(4) + 's' : 'N/A';
 
         // Construct the HTML for the summary details and the chart container
         const summaryHtml = `
@@ -614,7 +637,7 @@
       const response = await fetch('/download_test_cases', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ test_cases: allTests })
+        body: JSON.stringify({ spec_id: currentSpecId })
       });
 
       if (!response.ok) {
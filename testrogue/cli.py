@@ -0,0 +1,390 @@
+"""
+Headless command line runner for CI: extract endpoints from a Swagger spec, generate test cases,
+run them and export the results, without the web app.
+
+    python -m testrogue extract spec.json -o endpoints.json
+    python -m testrogue generate endpoints.json -o tests.json --concurrency 8
+    python -m testrogue run tests.json --base-url http://localhost:8080 --junit junit.xml
+    python -m testrogue export results.json --format csv -o results.csv
+
+Exit codes: 0 on success, 1 when test cases failed or endpoints could not be generated,
+2 for usage and input errors.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from logger_config import setup_logging
+from utils.constants import (
+    DEFAULT_EXECUTION_WORKERS,
+    DEFAULT_GENERATION_CONCURRENCY,
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_PROMPT_TOKENS,
+    DEFAULT_MAX_SCHEMA_DEPTH,
+    DEFAULT_MODEL,
+    DEFAULT_PER_HOST_LIMIT,
+    EXECUTION_SCHEDULES,
+    GENERATION_MODES,
+    LLM_CACHE_PATH,
+    SPEC_CACHE_DIR,
+    SUPPORTED_MODELS,
+)
+from utils.export import EXPORT_FORMATS, export_test_cases
+from utils.llm_cache import LLMCache
+from utils.llm_manager import LLMManager
+from utils.llm_pool import LLMPool
+from utils.models import Endpoint, ExtractedSwagger
+from utils.prompt_builder import PromptBuilder
+from utils.response_validator import ResponseValidator
+from utils.scheduler import iter_scheduled_test_results
+from utils.spec_cache import SpecCache
+from utils.spec_diff import operation_key
+from utils.spec_store import RESULT_COLUMNS
+from utils.tracing import configure_tracing, recording, start_run
+from utils.utils import (
+    collect_generated_test_cases,
+    extract_endpoints_from_swagger,
+    iter_generated_test_cases,
+    iter_test_results,
+    load_config,
+)
+
+EXIT_OK, EXIT_FAILURES, EXIT_USAGE = 0, 1, 2
+# Case files are written as a JSON array, or in any export format
+OUTPUT_FORMATS = ("json",) + tuple(EXPORT_FORMATS)
+
+
+class CLIError(Exception):
+    """A usage or input problem, reported on stderr with exit code 2."""
+
+
+# -- input and output ---------------------------------------------------------------------------
+
+
+def _read_json(path: str):
+    try:
+        with (sys.stdin if path == "-" else open(path, "r", encoding="utf-8")) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise CLIError(f"Cannot read {path}: {e}") from e
+
+
+def read_test_cases(path: str) -> List[dict]:
+    """Test cases from a JSON array, a JSON object with "test_cases", or a JSONL file."""
+    if path.endswith(".jsonl"):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            raise CLIError(f"Cannot read {path}: {e}") from e
+    data = _read_json(path)
+    if isinstance(data, dict):
+        data = data.get("test_cases")
+    if not isinstance(data, list):
+        raise CLIError(f"{path} does not hold a list of test cases")
+    return data
+
+
+def load_spec(source: str, config: dict) -> ExtractedSwagger:
+    """Endpoints from a file written by `extract`, or extracted from a Swagger URL or path."""
+    if os.path.isfile(source) and source.endswith(".json"):
+        data = _read_json(source)
+        if isinstance(data, dict) and "endpoints" in data and "swagger" not in data:
+            return ExtractedSwagger(
+                endpoints=[Endpoint(**ep) for ep in data["endpoints"]],
+                definitions=data.get("definitions") or {},
+            )
+    spec_cache_config = config.get("spec_cache", {})
+    spec_cache = SpecCache(
+        cache_dir=spec_cache_config.get("dir", SPEC_CACHE_DIR),
+        max_entries=spec_cache_config.get("max_entries", 32)
+    )
+    extracted = extract_endpoints_from_swagger(source, spec_cache=spec_cache, allow_local=True)
+    if not extracted.endpoints:
+        raise CLIError(f"No endpoints found in {source}")
+    return extracted
+
+
+def write_output(test_cases: Iterable[dict], path: Optional[str], output_format: str) -> None:
+    """Write cases to `path` ("-" or None for stdout) as a JSON array or in an export format."""
+    if output_format == "json":
+        chunks = iter([json.dumps(list(test_cases), indent=2) + "\n"])
+    else:
+        try:
+            chunks = export_test_cases(test_cases, output_format)
+        except ValueError as e:
+            raise CLIError(str(e)) from e
+
+    binary = output_format in ("parquet", "arrow", "junit")
+    if path in (None, "-"):
+        stream = sys.stdout.buffer if binary else sys.stdout
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
+        return
+    with open(path, "wb" if binary else "w", **({} if binary else {"encoding": "utf-8", "newline": ""})) as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _status(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+# -- commands -----------------------------------------------------------------------------------
+
+
+def select_endpoints(extracted: ExtractedSwagger, operations: Optional[List[str]]) -> List[Endpoint]:
+    if not operations:
+        return extracted.endpoints
+    by_key = {operation_key(ep): ep for ep in extracted.endpoints}
+    by_id = {ep.operation_id: ep for ep in extracted.endpoints if ep.operation_id}
+    unknown = [op for op in operations if op not in by_key and op not in by_id]
+    if unknown:
+        raise CLIError(f"Unknown operations: {', '.join(unknown)}")
+    return [by_key.get(op) or by_id[op] for op in operations]
+
+
+def cmd_extract(args, config: dict) -> int:
+    extracted = load_spec(args.spec, config)
+    document = {
+        "source": args.spec,
+        "endpoints": [{"operation_key": operation_key(ep), **ep.model_dump(by_alias=True)} for ep in extracted.endpoints],
+        "definitions": extracted.definitions or {},
+    }
+    text = json.dumps(document, indent=2) + "\n"
+    if args.output in (None, "-"):
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    _status(f"Extracted {len(extracted.endpoints)} endpoints from {args.spec}")
+    return EXIT_OK
+
+
+def build_llm(args, config: dict):
+    """The LLMManager (or LLMPool for several models) for `generate`, configured like the web app."""
+    llm_config = config.get("llm", {})
+    models = args.model or llm_config.get("models") or [DEFAULT_MODEL]
+    unknown = [name for name in models if name not in SUPPORTED_MODELS]
+    if unknown:
+        raise CLIError(f"Unsupported model: {', '.join(unknown)} (choose from {', '.join(SUPPORTED_MODELS)})")
+    if not os.getenv("OPENAI_API_KEY") and any(SUPPORTED_MODELS[name]["provider"] == "openai" for name in models):
+        raise CLIError("OPENAI_API_KEY environment variable not set; it is needed for LLM generation "
+                       "(use --mode offline to generate without a model)")
+
+    cache_config = config.get("cache", {})
+    llm_cache = None
+    if cache_config.get("enabled", True) and not args.no_cache:
+        max_age_days = cache_config.get("max_age_days")
+        llm_cache = LLMCache(
+            args.cache_path or cache_config.get("path", LLM_CACHE_PATH),
+            max_entries=cache_config.get("max_entries", 10000),
+            max_age_seconds=max_age_days * 86400 if max_age_days else None
+        )
+    if len(models) > 1:
+        return LLMPool.from_config({**llm_config, "models": models}, llm_cache)
+    return LLMManager.get_instance(models[0], cache=llm_cache, timeout=llm_config.get("timeout_seconds"))
+
+
+def cmd_generate(args, config: dict) -> int:
+    generation_config = config.get("generation", {})
+    prompt_config = config.get("prompt", {})
+    extracted = load_spec(args.spec, config)
+    endpoints = select_endpoints(extracted, args.operations)
+    mode = args.mode or generation_config.get("mode", "llm")
+
+    llm, prompt_builder = None, None
+    if mode == "llm":
+        llm = build_llm(args, config)
+        prompt_builder = PromptBuilder(
+            model_name=llm.model_name,
+            max_prompt_tokens=prompt_config.get("max_prompt_tokens", DEFAULT_MAX_PROMPT_TOKENS),
+            max_schema_depth=prompt_config.get("max_schema_depth", DEFAULT_MAX_SCHEMA_DEPTH),
+            report_savings=prompt_config.get("report_savings", False),
+            batch_token_budget=prompt_config.get("batch_token_budget"),
+            max_batch_size=prompt_config.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE)
+        )
+
+    offline_fallback = generation_config.get("offline_fallback", False)
+    if args.offline_fallback is not None:
+        offline_fallback = args.offline_fallback
+    start = time.perf_counter()
+    records = list(iter_generated_test_cases(
+        endpoints,
+        llm,
+        extracted.definitions,
+        max_concurrency=args.concurrency or generation_config.get("max_concurrency", DEFAULT_GENERATION_CONCURRENCY),
+        requests_per_minute=generation_config.get("requests_per_minute"),
+        tokens_per_minute=generation_config.get("tokens_per_minute"),
+        bypass_cache=args.force,
+        prompt_builder=prompt_builder,
+        generation_mode=mode,
+        offline_fallback=offline_fallback
+    ))
+    test_cases = collect_generated_test_cases(records)
+    write_output(test_cases, args.output, args.format)
+
+    failed = [r for r in records if r["type"] == "endpoint" and r["error"]]
+    for record in failed:
+        _status(f"FAILED {record['method'].upper()} {record['path']}: {record['error']}")
+    _status(f"Generated {len(test_cases)} test cases for {len(endpoints)} endpoints "
+            f"({len(failed)} failed) in {time.perf_counter() - start:.1f}s")
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def merge_results(test_cases: List[dict], records: Iterable[dict]) -> Tuple[List[dict], dict]:
+    """Test cases with their result columns filled in, in suite order, and the run summary."""
+    merged, summary = list(test_cases), {}
+    for record in records:
+        if record["type"] == "summary":
+            summary = {k: v for k, v in record.items() if k != "type"}
+            continue
+        case = merged[record["index"]]
+        merged[record["index"]] = {
+            **case, **{column: record[field] for field, column in RESULT_COLUMNS.items() if field in record}
+        }
+    return merged, summary
+
+
+def _progress(records: Iterator[dict], total: int, every: int) -> Iterator[dict]:
+    done = 0
+    for record in records:
+        if record["type"] == "result":
+            done += 1
+            if every and done % every == 0:
+                _status(f"{done}/{total} test cases run")
+        yield record
+
+
+def cmd_run(args, config: dict) -> int:
+    execution_config = config.get("execution", {})
+    test_cases = read_test_cases(args.tests)
+    if not test_cases:
+        raise CLIError(f"No test cases in {args.tests}")
+
+    schedule = args.schedule or execution_config.get("schedule", "parallel")
+    validate = args.validate_responses or execution_config.get("validate_responses", False)
+    extracted = None
+    if schedule == "dependencies" or validate:
+        if not args.spec:
+            raise CLIError("--spec is needed to validate responses or to schedule by dependencies")
+        extracted = load_spec(args.spec, config)
+
+    options = {
+        "max_workers": args.workers or execution_config.get("max_workers", DEFAULT_EXECUTION_WORKERS),
+        "per_host_limit": args.per_host_limit or execution_config.get("per_host_limit", DEFAULT_PER_HOST_LIMIT),
+        "response_validator": ResponseValidator(extracted.endpoints) if validate else None,
+        "base_url": args.base_url,
+    }
+    if schedule == "dependencies":
+        records = iter_scheduled_test_results(test_cases, extracted.endpoints, **options)
+    else:
+        records = iter_test_results(test_cases, **options)
+
+    results, summary = merge_results(test_cases, _progress(records, len(test_cases), args.progress_every))
+    if args.output:
+        write_output(results, args.output, args.format)
+    if args.junit:
+        write_output(results, args.junit, "junit")
+
+    failed = summary.get("failed_cases", 0)
+    for case in results:
+        if case.get("Status") != "PASSED":
+            _status(f"{case.get('Status', 'NOT RUN')} {case.get('Method', '')} {case.get('Endpoint', '')} "
+                    f"- {case.get('Test Case Name', '')}")
+    _status(f"{summary.get('passed_cases', 0)} passed, {failed} failed of {summary.get('total_cases', 0)} "
+            f"in {summary.get('total_time', 0):.1f}s")
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def cmd_export(args, config: dict) -> int:
+    test_cases = read_test_cases(args.cases)
+    write_output(test_cases, args.output, args.format)
+    return EXIT_OK
+
+
+# -- entry point --------------------------------------------------------------------------------
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    # Options every command takes, accepted after the command name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default="config.yaml", help="configuration file (default: config.yaml)")
+    common.add_argument("--log-level", default="WARNING", help="level of the log lines printed to stderr")
+    common.add_argument("--trace", metavar="FILE", help="write the command's timeline in Chrome trace format")
+
+    parser = argparse.ArgumentParser(prog="python -m testrogue", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser("extract", parents=[common], help="extract endpoints from a Swagger 2.0 spec")
+    extract.add_argument("spec", help="Swagger URL or path")
+    extract.add_argument("-o", "--output", help="endpoints file (default: stdout)")
+    extract.set_defaults(handler=cmd_extract)
+
+    generate = commands.add_parser("generate", parents=[common], help="generate test cases for a spec's endpoints")
+    generate.add_argument("spec", help="Swagger URL or path, or an endpoints file written by extract")
+    generate.add_argument("-o", "--output", help="test case file (default: stdout)")
+    generate.add_argument("--format", choices=OUTPUT_FORMATS, default="json", help="test case file format")
+    generate.add_argument("--operations", nargs="+", metavar="OP", help='only these operations ("GET /pet/{petId}" or operation IDs)')
+    generate.add_argument("--mode", choices=GENERATION_MODES, help="llm, or offline to generate without a model")
+    generate.add_argument("--model", action="append", help="model to use; repeat to pool several (first is the strong model)")
+    generate.add_argument("--concurrency", type=int, help="LLM calls in flight at once")
+    generate.add_argument("--force", action="store_true", help="ignore cached completions")
+    generate.add_argument("--no-cache", action="store_true", help="neither read nor write the completion cache")
+    generate.add_argument("--cache-path", help="completion cache file")
+    fallback = generate.add_mutually_exclusive_group()
+    fallback.add_argument("--offline-fallback", dest="offline_fallback", action="store_true", default=None,
+                          help="use rule-based test cases for endpoints the LLM fails on")
+    fallback.add_argument("--no-offline-fallback", dest="offline_fallback", action="store_false")
+    generate.set_defaults(handler=cmd_generate)
+
+    run = commands.add_parser("run", parents=[common], help="execute test cases against the API")
+    run.add_argument("tests", help="test case file (JSON array or JSONL)")
+    run.add_argument("--base-url", help="API base URL (default: api.base_url from the config)")
+    run.add_argument("--workers", type=int, help="test cases executed concurrently")
+    run.add_argument("--per-host-limit", type=int, help="concurrent requests against one host")
+    run.add_argument("--schedule", choices=EXECUTION_SCHEDULES, help="parallel, or dependencies (needs --spec)")
+    run.add_argument("--validate-responses", action="store_true", help="check bodies against their schemas (needs --spec)")
+    run.add_argument("--spec", help="Swagger URL or path, or an endpoints file written by extract")
+    run.add_argument("-o", "--output", help="results file: the test cases with their result columns")
+    run.add_argument("--format", choices=OUTPUT_FORMATS, default="json", help="results file format")
+    run.add_argument("--junit", metavar="FILE", help="also write a JUnit XML report")
+    run.add_argument("--progress-every", type=int, default=0, metavar="N", help="report progress every N cases")
+    run.set_defaults(handler=cmd_run)
+
+    export = commands.add_parser("export", parents=[common], help="convert a test case or results file")
+    export.add_argument("cases", help="test case or results file (JSON array or JSONL)")
+    export.add_argument("--format", choices=tuple(EXPORT_FORMATS), default="csv", help="output format")
+    export.add_argument("-o", "--output", help="output file (default: stdout)")
+    export.set_defaults(handler=cmd_export)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    load_dotenv()
+    config = load_config(args.config)
+    setup_logging({**config.get("logging", {}), "level": args.log_level})
+
+    recorder = None
+    if args.trace:
+        configure_tracing({"enabled": True})
+        recorder = start_run()
+    try:
+        with recording(recorder, args.command):
+            return args.handler(args, config)
+    except CLIError as e:
+        _status(f"error: {e}")
+        return EXIT_USAGE
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if recorder is not None:
+            with open(args.trace, "w", encoding="utf-8") as f:
+                json.dump(recorder.to_chrome(), f)
@@ -0,0 +1,46 @@
+import importlib
+import sys
+
+import pytest
+import yaml
+
+from benchmarks.stub_api import StubAPI
+from logger_config import stop_logging
+
+
+@pytest.fixture
+def stub_api():
+    with StubAPI() as api:
+        yield api
+
+
+@pytest.fixture
+def app_config(tmp_path, monkeypatch, stub_api):
+    """Writes config.yaml into a fresh working directory; the web app and load_base_url read it from there."""
+    config = {
+        "api": {"base_url": stub_api.base_url},
+        "cache": {"enabled": False},
+        "logging": {"file": None, "console": False},
+    }
+    monkeypatch.chdir(tmp_path)
+    # The web app builds its OpenAI client on import; tests that generate inject a fake LLM instead
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def write(**overrides):
+        config.update(overrides)
+        (tmp_path / "config.yaml").write_text(yaml.safe_dump(config))
+        return config
+
+    write()
+    return write
+
+
+@pytest.fixture
+def webapp(app_config):
+    """The Flask app module, imported against the test config."""
+    sys.modules.pop("webapp", None)
+    module = importlib.import_module("webapp")
+    module.app.config["TESTING"] = True
+    yield module
+    stop_logging()
+    sys.modules.pop("webapp", None)
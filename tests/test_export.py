@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from utils import export
+from utils.export import EXPORT_COLUMNS, export_test_cases
+
+PASSED = {
+    "Test Case Name": "add pet", "Description": "Creates a pet", "Endpoint": "/pet", "Method": "POST",
+    "Operation ID": "addPet", "Request Body": {"name": "rex", "tags": ["a"]}, "Expected Status Code": 200,
+    "Headers": {"X-API-Key": "k"}, "Actual Status Code": 200, "Status": "PASSED", "Response Time": 0.12345,
+}
+FAILED = {**PASSED, "Test Case Name": "bad pet", "Expected Status Code": 400, "Status": "FAILED"}
+ERRORED = {**PASSED, "Test Case Name": "down", "Status": "ERROR", "Error": "connection refused",
+           "Actual Status Code": None}
+NOT_RUN = {"Test Case Name": "not run", "Endpoint": "/pet", "Method": "POST", "Expected Status Code": 200}
+
+
+def text(chunks):
+    return "".join(chunks)
+
+
+def test_csv_writes_structured_fields_as_json():
+    rows = list(csv.DictReader(io.StringIO(text(export_test_cases([PASSED, NOT_RUN], "csv")))))
+
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert json.loads(rows[0]["Request Body"]) == PASSED["Request Body"]
+    assert rows[0]["Response Time"] == "0.1235"
+    assert rows[1]["Status"] == "" and rows[1]["Request Body"] == ""
+
+
+def test_text_exports_are_chunked_and_consume_lazily(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_SIZE", 100)
+    consumed = []
+
+    def cases():
+        for number in range(50):
+            consumed.append(number)
+            yield {**PASSED, "Test Case Name": f"case {number}"}
+
+    chunks = export_test_cases(cases(), "jsonl")
+    first = next(chunks)
+    assert len(consumed) < 50
+    lines = (first + text(chunks)).splitlines()
+    assert len(lines) == 50
+    assert json.loads(lines[-1])["Test Case Name"] == "case 49"
+    assert json.loads(lines[0])["Headers"] == {"X-API-Key": "k"}
+
+
+def test_junit_reports_failures_errors_and_skips():
+    report = ElementTree.fromstring(b"".join(export_test_cases([PASSED, FAILED, ERRORED, NOT_RUN], "junit")))
+    suite = report.find("testsuite")
+
+    assert {key: suite.get(key) for key in ("tests", "failures", "errors", "skipped")} == {
+        "tests": "4", "failures": "1", "errors": "1", "skipped": "1"
+    }
+    cases = {case.get("name"): case for case in suite.iter("testcase")}
+    assert cases["add pet"].get("classname") == "addPet" and len(cases["add pet"]) == 0
+    assert cases["bad pet"].find("failure").get("message") == "Expected status 400, got 200"
+    assert cases["down"].find("error").get("message") == "connection refused"
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        export_test_cases([PASSED], "xlsx")
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_columnar_exports_round_trip(export_format):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    data = b"".join(export_test_cases([PASSED, ERRORED], export_format))
+    if export_format == "parquet":
+        table = pyarrow.parquet.read_table(pyarrow.BufferReader(data))
+    else:
+        table = pyarrow.ipc.open_stream(data).read_all()
+    rows = table.to_pylist()
+    assert table.column_names == EXPORT_COLUMNS
+    assert json.loads(rows[0]["Request Body"]) == PASSED["Request Body"]
+    assert rows[1]["Actual Status Code"] is None
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from utils.jobs import CANCELLED, FAILED, FINISHED_STATUSES, SUCCEEDED, JobQueue, JobStore
+
+
+def wait_until_finished(store: JobStore, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job["status"] in FINISHED_STATUSES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def records(count: int, gate: threading.Event = None):
+    for number in range(count):
+        if gate is not None:
+            gate.wait()
+        yield {"type": "result", "number": number}
+    yield {"type": "summary", "total": count}
+
+
+def test_records_and_result_are_persisted(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = JobQueue(store).submit("execute", 3, lambda: records(3), lambda rs: rs[-1])
+
+    job = wait_until_finished(store, job_id)
+    assert (job["status"], job["done"], job["total"]) == (SUCCEEDED, 3, 3)
+    assert store.load_result(job_id) == {"type": "summary", "total": 3}
+    assert [record["seq"] for record in store.load_records(job_id, after=2)] == [3, 4]
+
+
+def test_failures_keep_the_records_produced_so_far(tmp_path):
+    def failing():
+        yield {"type": "result"}
+        raise RuntimeError("boom")
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = JobQueue(store).submit("generate", 2, failing, list)
+
+    job = wait_until_finished(store, job_id)
+    assert (job["status"], job["error"]) == (FAILED, "boom")
+    assert len(store.load_records(job_id)) == 1
+
+
+def test_cancellation_stops_at_the_next_record(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store)
+    gate = threading.Event()
+    job_id = queue.submit("execute", 100, lambda: records(100, gate), list)
+
+    assert queue.cancel(job_id)
+    gate.set()
+    job = wait_until_finished(store, job_id)
+    assert job["status"] == CANCELLED and job["done"] < 100
+    assert not queue.cancel(job_id)
+
+
+def test_jobs_in_flight_are_failed_on_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    JobStore(path).create("stale", "generate", 5)
+
+    job = JobStore(path).get("stale")
+    assert (job["status"], job["error"]) == (FAILED, "Interrupted by server restart")
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from benchmarks.fake_llm import FakeLLMManager
+from utils.json_stream import JsonArrayStream, repair_json
+from utils.models import Endpoint
+from utils.utils import TestCaseStream as CaseStream, iter_generated_test_cases
+
+ENDPOINT = Endpoint(path="/pets", full_path="/pets", method="GET", operation_id="listPets")
+
+
+def case(name: str) -> dict:
+    return {"Test Case Name": name, "Description": name, "Endpoint": "/pets", "Method": "GET",
+            "Expected Status Code": 200}
+
+
+def feed_all(parser: JsonArrayStream, text: str, size: int) -> list:
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return elements
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_elements_are_emitted_across_any_chunking(size):
+    values = [{"a": 'x]}\\"', "b": [1, {"c": "{["}]}, {"d": 'esc \\" quote'}]
+    text = "Sure! Here you go:\n```json\n" + json.dumps(values) + "\n```"
+    parser = JsonArrayStream()
+    assert feed_all(parser, text, size) == values
+    assert parser.finished and parser.elements == 2 and not parser.trailing_array
+
+
+def test_each_element_is_returned_by_the_chunk_that_closes_it():
+    parser = JsonArrayStream()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': 2}]') == [{"b": 2}]
+
+
+def test_malformed_elements_are_repaired_or_skipped():
+    parser = JsonArrayStream()
+    assert parser.feed("[{'a': 1,}, {\"b\": nope}, {\"c\": 3}]") == [{"a": 1}, {"c": 3}]
+    assert parser.skipped == 1 and parser.elements == 3
+
+
+def test_quoted_brackets_in_prose_do_not_open_the_array():
+    parser = JsonArrayStream()
+    assert parser.feed('Use the "tags[]" field.\n[{"a": 1}]') == [{"a": 1}]
+
+
+def test_an_unmatched_prose_quote_ends_with_its_line():
+    parser = JsonArrayStream()
+    assert parser.feed('A 5" screen\n[{"a": 1}]') == [{"a": 1}]
+
+
+def test_bracketed_prose_before_the_array_is_flagged():
+    parser = JsonArrayStream()
+    assert feed_all(parser, 'Here are the cases [JSON]:\n[{"a":1}]', 4) == []
+    assert parser.finished and parser.elements == 0 and parser.trailing_array
+
+
+def test_repair_json_fixes_common_mistakes():
+    assert json.loads(repair_json("[{'a': 1,},]")) == [{"a": 1}]
+    assert json.loads(repair_json('[{"a": 1} {"b": 2}]')) == [{"a": 1}, {"b": 2}]
+
+
+def stream_of(text: str, size: int = 5) -> CaseStream:
+    stream = CaseStream(ENDPOINT)
+    for start in range(0, len(text), size):
+        stream.feed(text[start:start + size])
+    return stream
+
+
+def test_test_case_stream_validates_as_it_goes():
+    stream = stream_of(json.dumps([case("one"), {"Description": "no name or status"}, case("two")]))
+    assert [c["Test Case Name"] for c in stream.close()] == ["one", "two"]
+
+
+def test_bracketed_prose_raises_instead_of_returning_nothing():
+    with pytest.raises(ValueError):
+        stream_of('Here are the cases [JSON]:\n' + json.dumps([case("one")])).close()
+
+
+def test_a_second_array_after_the_answer_raises():
+    with pytest.raises(ValueError):
+        stream_of(json.dumps([case("example")]) + "\nOr instead: " + json.dumps([case("other")])).close()
+
+
+@pytest.mark.parametrize("text", ["[]", "No test cases apply.", '["just", "strings"]'])
+def test_output_without_test_cases_raises(text):
+    with pytest.raises(ValueError):
+        stream_of(text).close()
+
+
+def test_truncated_output_keeps_completed_cases():
+    text = json.dumps([case("one"), case("two")])
+    assert [c["Test Case Name"] for c in stream_of(text[:-20]).close()] == ["one"]
+
+
+def test_unparseable_output_falls_back_to_offline_generation():
+    class ProseLLM(FakeLLMManager):
+        def completion(self, prompt: str) -> str:
+            return "Here are the cases [JSON]:\n" + super().completion(prompt)
+
+    records = list(iter_generated_test_cases([ENDPOINT], ProseLLM(), max_concurrency=1, offline_fallback=True))
+    assert records[0]["generator"] == "offline" and records[0]["test_cases"]
+    assert records[-1]["fallback_endpoints"] == 1
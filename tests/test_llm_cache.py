@@ -0,0 +1,110 @@
+import json
+
+from utils.llm_cache import LLMCache
+from utils.llm_manager import LLMManager
+from utils.prompt_builder import PromptBuilder
+from utils.rate_limiter import RateLimiter
+from utils.utils import _generate_for_endpoint, parse_swagger
+
+SPEC = {
+    "swagger": "2.0",
+    "paths": {"/pets": {"get": {"operationId": "listPets", "responses": {"200": {"description": "OK"}}}}},
+}
+CASE = {
+    "Test Case Name": "list pets", "Description": "", "Endpoint": "/pets", "Method": "GET",
+    "Operation ID": "listPets", "Summary": "", "Request Body": {}, "Expected Status Code": 200, "Headers": {},
+}
+
+
+def make_cache(tmp_path, **kwargs) -> LLMCache:
+    return LLMCache(str(tmp_path / "cache" / "llm.sqlite3"), **kwargs)
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = make_cache(tmp_path)
+    key = LLMCache.make_key("gpt-4o", 0.2, "prompt", "v1")
+    assert cache.get(key) is None
+    cache.set(key, "completion")
+    assert cache.get(key) == "completion"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_key_covers_model_temperature_prompt_and_template():
+    base = LLMCache.make_key("gpt-4o", 0.2, "prompt", "v1")
+    assert base == LLMCache.make_key("gpt-4o", 0.2, "prompt", "v1")
+    assert base != LLMCache.make_key("gpt-4o-mini", 0.2, "prompt", "v1")
+    assert base != LLMCache.make_key("gpt-4o", 0.7, "prompt", "v1")
+    assert base != LLMCache.make_key("gpt-4o", 0.2, "prompt!", "v1")
+    assert base != LLMCache.make_key("gpt-4o", 0.2, "prompt", "v2")
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path, max_age_seconds=-1)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("utils.llm_cache.time.time", lambda: next(clock))
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_entries_persist_across_instances(tmp_path):
+    make_cache(tmp_path).set("key", "value")
+    assert make_cache(tmp_path).get("key") == "value"
+
+
+def test_delete_removes_the_entry(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("key", "value")
+    cache.delete("key")
+    assert cache.get("key") is None
+
+
+class StubCompletionModel:
+    """Streams a fixed completion in two chunks, in place of the OpenAI client."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def stream(self, prompt):
+        middle = len(self.text) // 2
+        yield self.text[:middle]
+        yield self.text[middle:]
+
+
+def generate(tmp_path, monkeypatch, completion: str):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    cache = make_cache(tmp_path)
+    llm = LLMManager("text-davinci-003", cache=cache)
+    llm.llm = StubCompletionModel(completion)
+    endpoint = parse_swagger(SPEC).endpoints[0]
+    record = _generate_for_endpoint(0, endpoint, llm, RateLimiter(), PromptBuilder())
+    return record, cache
+
+
+def test_parsed_completions_stay_cached(tmp_path, monkeypatch):
+    record, cache = generate(tmp_path, monkeypatch, json.dumps([CASE]))
+    assert record["error"] is None and len(record["test_cases"]) == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_malformed_completions_are_evicted(tmp_path, monkeypatch):
+    record, cache = generate(tmp_path, monkeypatch, "Sorry, I cannot help with that.")
+    assert record["error"].startswith("LLM output parse error")
+    assert cache.stats()["entries"] == 0
+
+
+def test_truncated_completions_are_evicted(tmp_path, monkeypatch):
+    complete = json.dumps([CASE, dict(CASE, **{"Test Case Name": "second"})])
+    record, cache = generate(tmp_path, monkeypatch, complete[:complete.index("second")])
+    assert len(record["test_cases"]) == 1
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from benchmarks.fake_llm import FakeLLMError, FakeLLMManager
+from utils.llm_cache import LLMCache
+from utils.llm_manager import LLMManager
+from utils.llm_pool import LLMPool, retry_reason
+
+PROMPT = "Endpoint: /pet/{petId}\nMethod: GET\nOperation ID: getPet"
+
+
+def warmed_pool(slow, fast, **options):
+    """A pool whose slow member has enough fast latency samples for hedging to kick in early."""
+    pool = LLMPool([slow, fast], **options)
+    for _ in range(10):
+        pool.stats[slow.model_name].record(0.05, ok=True)
+    return pool
+
+
+def test_get_instance_is_keyed_by_cache_and_client_options(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"))
+    shared = LLMManager.get_instance("gpt-3.5-turbo", cache=cache, timeout=5)
+
+    assert LLMManager.get_instance("gpt-3.5-turbo", cache=cache, timeout=5) is shared
+    assert LLMManager.get_instance("gpt-3.5-turbo", cache=None, timeout=5).cache is None
+    pooled = LLMManager.get_instance("gpt-3.5-turbo", cache=cache, timeout=5, max_retries=0)
+    assert pooled is not shared and pooled.cache is cache
+    assert pooled.llm.max_retries == 0
+
+
+def test_conflicts_are_not_retried():
+    assert retry_reason(FakeLLMError(409)) is None
+    assert retry_reason(FakeLLMError(429)) == "429"
+    assert retry_reason(RuntimeError("wrapped")) is None
+    wrapped = RuntimeError("wrapped")
+    wrapped.__cause__ = FakeLLMError(503)
+    assert retry_reason(wrapped) == "503"
+
+
+def test_transient_errors_are_retried_on_the_next_model():
+    failing, healthy = FakeLLMManager(model_name="strong", failures=1), FakeLLMManager(model_name="fast")
+    pool = LLMPool([failing, healthy], max_retries=1, backoff_seconds=0)
+
+    assert "/pet/1" in pool.generate_response(PROMPT)
+    assert (failing.calls, healthy.calls) == (1, 1)
+    assert pool.stats["strong"].errors == 1
+
+
+def test_sync_streams_are_hedged_until_the_first_chunk():
+    slow, fast = FakeLLMManager(2.0, model_name="strong"), FakeLLMManager(model_name="fast")
+    pool = warmed_pool(slow, fast, hedge_percentile=0.5, max_retries=0, timeout=5)
+
+    start = time.perf_counter()
+    text = "".join(pool.stream_response(PROMPT))
+    assert time.perf_counter() - start < 1.0
+    assert text == fast.completion(PROMPT)
+    assert pool.stats["fast"].calls == 1
+
+
+def test_sync_stream_times_out_before_the_first_chunk():
+    pool = LLMPool([FakeLLMManager(0.6)], timeout=0.1, max_retries=0)
+
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        list(pool.stream_response(PROMPT))
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.parametrize("call", ["generate_response", "stream_response"])
+def test_a_timed_out_call_is_recorded_once(call):
+    member = FakeLLMManager(0.4)
+    pool = LLMPool([member], timeout=0.1, max_retries=0)
+
+    with pytest.raises(TimeoutError):
+        result = getattr(pool, call)(PROMPT)
+        if call == "stream_response":
+            list(result)
+    time.sleep(0.6)  # The abandoned call finishes in the background
+    stats = pool.stats[member.model_name]
+    assert stats.calls == 1 and stats.errors == 1
@@ -0,0 +1,157 @@
+import time
+
+import pytest
+
+from utils.load_test import (
+    LatencyHistogram, collect_load_test_report, expected_status, happy_path_cases, iter_load_test,
+    load_test_report_to_csv
+)
+
+HAPPY = {"Test Case Name": "get pet", "Endpoint": "/pet/1", "Method": "GET", "Operation ID": "getPet",
+         "Expected Status Code": 200}
+NEGATIVE = {**HAPPY, "Test Case Name": "missing pet", "Expected Status Code": 404}
+
+
+def test_histogram_percentiles_are_within_resolution():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000)
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(500, rel=0.016)
+    assert histogram.percentile(99) == pytest.approx(990, rel=0.016)
+    assert histogram.percentile(100) == 1000
+    assert histogram.mean() == pytest.approx(500.5)
+
+
+def test_histogram_merge_and_empty():
+    assert LatencyHistogram().percentile(99) == 0.0
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(0.001)
+    second.record(0.010)
+    first.merge(second)
+    assert first.count == 2 and first.max == 10000
+    assert first.percentile(100) == 10.0
+
+
+def test_expected_status_is_parsed_once_and_leniently():
+    assert [expected_status({"Expected Status Code": value}) for value in (201, "200 OK", " 204", "", "OK", True)] \
+        == [201, 200, 204, None, None, None]
+    assert expected_status({}) == 200
+    cases = [{**HAPPY, "Expected Status Code": value} for value in ("200 OK", "", None)]
+    assert happy_path_cases(cases + [NEGATIVE]) == cases[:1]
+
+
+def test_string_status_codes_are_compared_as_numbers(app_config):
+    report = collect_load_test_report(iter_load_test([{**HAPPY, "Expected Status Code": "200 OK"}],
+                                                     duration_seconds=0.2, concurrency=1))
+    assert report["summary"]["requests"] > 0 and report["summary"]["errors"] == 0
+
+
+def test_a_malformed_case_does_not_stop_its_worker(app_config):
+    broken = {**HAPPY, "Operation ID": "broken", "Headers": ["not", "a", "mapping"]}
+    report = collect_load_test_report(iter_load_test([broken, HAPPY], duration_seconds=0.3, concurrency=1))
+    operations = {operation["operation"]: operation for operation in report["operations"]}
+    assert operations["broken"]["errors"] == operations["broken"]["requests"] > 1
+    assert operations["getPet"]["requests"] > 1 and operations["getPet"]["errors"] == 0
+
+
+def test_needs_happy_path_cases():
+    with pytest.raises(ValueError):
+        list(iter_load_test([NEGATIVE], duration_seconds=0.1))
+
+
+def test_replays_happy_path_cases_with_progress(app_config):
+    records = list(iter_load_test([HAPPY, NEGATIVE], duration_seconds=0.5, concurrency=2, progress_interval=0.1))
+    assert records[-1]["type"] == "summary"
+    assert any(record["type"] == "progress" for record in records[:-1])
+
+    report = collect_load_test_report(records)
+    assert report["config"]["cases"] == 1
+    assert report["summary"]["requests"] > 0 and report["summary"]["errors"] == 0
+    assert [operation["operation"] for operation in report["operations"]] == ["getPet"]
+    assert load_test_report_to_csv(report).splitlines()[-1].startswith("TOTAL,")
+
+
+def test_paced_runs_hold_the_target_rate(app_config):
+    report = collect_load_test_report(iter_load_test([HAPPY], duration_seconds=1.0, target_rps=20, concurrency=2))
+    assert 15 <= report["summary"]["requests"] <= 21
+
+
+def test_closing_early_stops_the_workers(app_config):
+    start = time.perf_counter()
+    records = iter_load_test([HAPPY], duration_seconds=30, concurrency=2, progress_interval=0.05)
+    assert next(records)["type"] == "progress"
+    records.close()
+    assert time.perf_counter() - start < 5
+
+
+def wait_for_job(client, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_load_test_route_runs_as_a_job(webapp):
+    client = webapp.app.test_client()
+    response = client.post("/load_test", json={"test_cases": [HAPPY], "duration": 0.3, "concurrency": 2})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "succeeded" and job["kind"] == "load_test"
+    assert client.get(f"/jobs/{job_id}/result").get_json()["summary"]["requests"] > 0
+    csv_response = client.get(f"/jobs/{job_id}/result?format=csv")
+    assert csv_response.mimetype == "text/csv"
+    assert csv_response.get_data(as_text=True).startswith("operation,requests")
+
+
+def test_load_test_route_rejects_suites_without_happy_paths(webapp):
+    response = webapp.app.test_client().post("/load_test", json={"test_cases": [NEGATIVE], "duration": 1})
+    assert response.status_code == 400
+
+
+def add_pet():
+    from utils.models import Endpoint, RequestBody
+
+    schema = {"type": "object", "properties": {"name": {"type": "string"}, "age": {"type": "integer"}}}
+    endpoint = Endpoint(full_path="/pet", path="/pet", method="POST", operation_id="addPet",
+                        request_body=RequestBody(required=True, schema_data=schema))
+    create = {"Test Case Name": "add pet", "Endpoint": "/pet", "Method": "POST", "Operation ID": "addPet",
+              "Request Body": {"name": "fixed"}, "Expected Status Code": 200}
+    return endpoint, create
+
+
+def test_case_bodies_are_replayed_by_default(app_config):
+    from utils import load_test
+
+    endpoint, create = add_pet()
+    assert load_test.payload_variants([create], [endpoint]) == [None]
+    report = collect_load_test_report(iter_load_test([create], duration_seconds=0.2, concurrency=1,
+                                                     endpoints=[endpoint]))
+    assert report["config"]["synthesized_cases"] == 0
+
+
+def test_synthesized_payloads_rotate_per_operation(app_config, monkeypatch):
+    from utils import load_test
+
+    endpoint, create = add_pet()
+    variants = load_test.payload_variants([create, HAPPY], [endpoint], count=5)
+    assert variants[1] is None and len(variants[0]) == 5
+    assert variants[0] == load_test.payload_variants([create], [endpoint], count=5)[0]
+
+    sent = []
+    send_request = load_test.send_request
+
+    def recording_send_request(*args, **kwargs):
+        sent.append(args[3])
+        return send_request(*args, **kwargs)
+
+    monkeypatch.setattr(load_test, "send_request", recording_send_request)
+    report = collect_load_test_report(iter_load_test([create], duration_seconds=0.3, concurrency=1,
+                                                     endpoints=[endpoint], variants=5))
+    assert report["config"]["synthesized_cases"] == 1
+    assert sent[:5] == variants[0] and {"name": "fixed"} not in sent
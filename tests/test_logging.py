@@ -0,0 +1,58 @@
+import json
+import logging
+import queue
+
+import logger_config
+from logger_config import DroppingQueueHandler, setup_logging, stop_logging
+from utils.metrics import LOG_RECORDS_DROPPED
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_are_formatted_with_their_arguments_as_logged(tmp_path):
+    stop_logging()
+    log_file = tmp_path / "app.log"
+    setup_logging({"file": str(log_file), "console": False})
+    try:
+        payload = {"status": "pending"}
+        logging.getLogger("tests").warning("Payload: %s", payload, extra={"test_case": "add pet"})
+        payload["status"] = "sold"  # Changed before the listener thread gets to the record
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("tests").exception("Failed %s", "add pet")
+    finally:
+        stop_logging()
+
+    first, second = [record for record in read_records(log_file) if record["logger"] == "tests"]
+    assert first["message"] == "Payload: {'status': 'pending'}"
+    assert first["test_case"] == "add pet"
+    assert second["message"] == "Failed add pet"
+    assert "ValueError: boom" in second["exception"]
+
+
+def test_prepare_leaves_the_callers_record_untouched():
+    handler = DroppingQueueHandler(queue.Queue())
+    record = logging.LogRecord("tests", logging.INFO, __file__, 1, "%s items", ([1, 2],), None)
+
+    prepared = handler.prepare(record)
+    assert prepared is not record
+    assert (prepared.msg, prepared.args) == ("[1, 2] items", None)
+    assert (record.msg, record.args) == ("%s items", ([1, 2],))
+
+
+def test_a_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(1))
+    dropped = LOG_RECORDS_DROPPED._values.get((), 0)
+    for _ in range(3):
+        handler.emit(logging.LogRecord("tests", logging.INFO, __file__, 1, "message", (), None))
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED._values[()] == dropped + 2
+
+
+def test_truncate_body():
+    assert logger_config.truncate_body("x" * 10, 4) == "xxxx... [6 more characters]"
+    assert logger_config.truncate_body("short", 0) == "short"
@@ -0,0 +1,38 @@
+import pytest
+
+from utils.metrics import MetricsRegistry, _Metric
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("name", "doc")
+
+
+def test_counter_and_gauge_render_per_label_set():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls.", ["model"])
+    gauge = registry.gauge("in_flight", "In flight.")
+    counter.inc(model="a")
+    counter.inc(2, model='quo"te')
+    with gauge.track_inprogress():
+        assert 'in_flight 1' in registry.render()
+
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{model="a"} 1' in text
+    assert 'calls_total{model="quo\\"te"} 2' in text
+    assert "in_flight 0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_count 4" in lines
+    assert "latency_seconds_sum 5.65" in lines
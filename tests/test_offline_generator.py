@@ -0,0 +1,94 @@
+from utils.models import TestCase
+from utils.offline_generator import generate_offline_test_cases
+from utils.utils import _offline_record, parse_swagger
+
+SPEC = {
+    "swagger": "2.0",
+    "paths": {
+        "/pets": {
+            "post": {
+                "operationId": "addPet",
+                "parameters": [{"name": "body", "in": "body", "required": True, "schema": {"$ref": "#/definitions/Pet"}}],
+                "responses": {"201": {"description": "Created"}, "400": {"description": "Invalid"}},
+                "security": [{"petstore_auth": ["write:pets"]}],
+            },
+        },
+        "/pets/{petId}": {
+            "get": {
+                "operationId": "getPet",
+                "parameters": [{"name": "petId", "in": "path", "required": True, "type": "integer"}],
+                "responses": {"200": {"description": "OK"}},
+                "security": [{"api_key": [], "query_key": []}],
+            },
+            "delete": {
+                "operationId": "deletePet",
+                "parameters": [{"name": "petId", "in": "path", "required": True, "type": "integer"}],
+                "responses": {"204": {"description": "Deleted"}},
+                "security": [{"basic_auth": []}],
+            },
+        },
+    },
+    "securityDefinitions": {
+        "petstore_auth": {"type": "oauth2", "flow": "implicit", "authorizationUrl": "https://example.com/oauth"},
+        "api_key": {"type": "apiKey", "name": "X-API-Key", "in": "header"},
+        "query_key": {"type": "apiKey", "name": "key", "in": "query"},
+        "basic_auth": {"type": "basic"},
+    },
+    "definitions": {
+        "Pet": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {"name": {"type": "string"}, "age": {"type": "integer", "minimum": 0}},
+        },
+    },
+}
+
+
+def endpoints():
+    return {endpoint.operation_id: endpoint for endpoint in parse_swagger(SPEC).endpoints}
+
+
+def by_name(cases):
+    return {case["Test Case Name"].split(": ", 1)[1]: case for case in cases}
+
+
+def test_parse_swagger_keeps_the_referenced_security_schemes():
+    assert endpoints()["getPet"].security_schemes == {
+        "api_key": SPEC["securityDefinitions"]["api_key"],
+        "query_key": SPEC["securityDefinitions"]["query_key"],
+    }
+
+
+def test_only_missing_credentials_drops_the_credentials():
+    cases = by_name(generate_offline_test_cases(endpoints()["addPet"]))
+
+    missing = cases.pop("missing credentials")
+    assert "Authorization" not in missing["Headers"]
+    assert missing["Request Body"] == cases["happy path"]["Request Body"]
+    for name, case in cases.items():
+        assert case["Headers"]["Authorization"] == "Bearer test-token", name
+    assert len(cases) > 1
+
+
+def test_api_key_schemes_are_sent_where_they_are_defined():
+    cases = by_name(generate_offline_test_cases(endpoints()["getPet"]))
+
+    happy, missing = cases["happy path"], cases["missing credentials"]
+    assert happy["Headers"] == {"X-API-Key": "test-api-key"}
+    assert "key=test-api-key" in happy["Endpoint"]
+    assert missing["Headers"] == {} and "key=" not in missing["Endpoint"]
+
+
+def test_basic_scheme_sends_basic_authorization():
+    happy = by_name(generate_offline_test_cases(endpoints()["deletePet"]))["happy path"]
+    assert happy["Headers"]["Authorization"].startswith("Basic ")
+
+
+def test_offline_records_hold_validated_test_cases():
+    endpoint = endpoints()["addPet"]
+    record = _offline_record(0, endpoint)
+
+    assert record["generator"] == "offline" and record["error"] is None
+    assert record["test_cases"]
+    for case in record["test_cases"]:
+        assert TestCase(**case).Expected_Status_Code in (201, 400, 401)
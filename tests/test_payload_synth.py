@@ -0,0 +1,37 @@
+import copy
+
+from utils.payload_synth import PayloadSynthesizer, compile_schema
+
+PET = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer", "minimum": 1, "maximum": 10},
+        "name": {"type": "string", "pattern": "^[a-z]{3,6}$"},
+        "tags": {"type": "array", "minItems": 2, "items": {"type": "string", "format": "uuid"}},
+        "price": {"type": "number", "minimum": 0, "maximum": 5, "multipleOf": 0.5},
+    },
+}
+
+
+def test_compile_schema_is_cached_by_schema_identity():
+    schema = copy.deepcopy(PET)
+    assert compile_schema(schema) is compile_schema(schema)
+    assert compile_schema(copy.deepcopy(PET)) is not compile_schema(schema)
+
+
+def test_compile_schema_accepts_schemas_that_are_not_json():
+    schema = {"type": "string", "enum": [{1, 2}]}  # a set is not JSON serializable
+    assert compile_schema(schema).generate() == {1, 2}
+
+
+def test_generate_many_is_reproducible_and_varied():
+    synthesizer = PayloadSynthesizer(PET)
+    payloads = synthesizer.generate_many(20, seed=7)
+
+    assert payloads == synthesizer.generate_many(20, seed=7)
+    assert len({payload["name"] for payload in payloads}) > 1
+    for payload in payloads:
+        assert 1 <= payload["id"] <= 10
+        assert 3 <= len(payload["name"]) <= 6 and payload["name"].islower()
+        assert len(payload["tags"]) == 2
+        assert payload["price"] in [step / 2 for step in range(11)]
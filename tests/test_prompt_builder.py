@@ -0,0 +1,71 @@
+from benchmarks.specs import synthetic_spec
+from utils.models import Endpoint, Parameter, Response
+from utils.prompt_builder import PromptBuilder, count_tokens, prune_schema
+from utils.utils import build_generation_record, parse_swagger
+
+
+def test_prune_schema_keeps_only_model_relevant_keys():
+    schema = {
+        "type": "object", "title": "Pet", "xml": {"name": "pet"}, "required": [],
+        "properties": {"name": {"type": "string", "description": "", "example": "doggie"}},
+    }
+    assert prune_schema(schema, 4) == {"type": "object", "properties": {"name": {"type": "string", "example": "doggie"}}}
+
+
+def test_prune_schema_collapses_nesting_beyond_the_depth():
+    schema = {"type": "object", "properties": {"child": {"type": "object", "properties": {"id": {"type": "integer"}}}}}
+    assert prune_schema(schema, 1)["properties"]["child"] == {"type": "object", "x-truncated": True}
+
+
+def test_prompt_is_truncated_to_fit_the_budget():
+    endpoint = parse_swagger(synthetic_spec(2, depth=8)).endpoints[1]
+    full = PromptBuilder(max_prompt_tokens=10 ** 6).build(endpoint)
+    small = PromptBuilder(max_prompt_tokens=full.tokens // 2).build(endpoint)
+    assert small.tokens < full.tokens
+    assert small.tokens == count_tokens(small.text)
+
+
+def test_savings_are_reported_on_request():
+    endpoint = Endpoint(
+        path="/pets", full_path="/pets", method="GET", operation_id="listPets",
+        parameters=[Parameter(name="limit", in_="query", type="integer")],
+        responses={"200": Response(description="OK"), "400": Response(description="Bad request")},
+    )
+    prompt = PromptBuilder(report_savings=True).build(endpoint)
+    assert prompt.tokens_saved is not None and prompt.tokens_saved > 0
+    assert build_generation_record(0, endpoint, [], prompt=prompt)["prompt_tokens_saved"] == prompt.tokens_saved
+
+    assert PromptBuilder().build(endpoint).tokens_saved is None
+
+
+def small_endpoints(count: int) -> list:
+    return [Endpoint(path=f"/items{i}", full_path=f"/items{i}", method="GET", operation_id=f"getItems{i}")
+            for i in range(count)]
+
+
+def test_batches_are_sized_from_measured_output():
+    builder = PromptBuilder(batch_token_budget=100000, max_batch_size=50)
+    endpoints = small_endpoints(20)
+
+    # Unmeasured, a 2048 token completion is assumed to fit three endpoints of 5 x 120 tokens
+    assert max(len(indices) for indices, _ in builder.plan_batches(endpoints, 2048)) == 3
+
+    # Compact output: 10 test cases for 2 endpoints
+    output = "x" * 2000
+    builder.record_output(output, test_cases=10, endpoints=2)
+    expected = count_tokens(output) / 10 * 5
+    assert builder.expected_endpoint_tokens() == expected
+    assert max(len(indices) for indices, _ in builder.plan_batches(endpoints, 2048)) == int(2048 // expected) > 3
+
+
+def test_batch_planning_keeps_order_and_singles():
+    builder = PromptBuilder(batch_token_budget=100000, max_batch_size=4)
+    plan = builder.plan_batches(small_endpoints(10), 100000)
+    assert [index for indices, _ in plan for index in indices] == list(range(10))
+    assert all((prompt is None) == (len(indices) == 1) for indices, prompt in plan)
+    assert max(len(indices) for indices, _ in plan) == 4
+
+
+def test_batching_is_off_without_a_budget():
+    plan = PromptBuilder().plan_batches(small_endpoints(3), 100000)
+    assert plan == [([0], None), ([1], None), ([2], None)]
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fake_llm import FakeLLMManager
+from benchmarks.specs import synthetic_spec
+from utils.rate_limiter import RateLimiter, TokenBucket
+from utils.utils import iter_generated_test_cases, parse_swagger
+
+
+def test_bucket_starts_full_and_charges_debt():
+    bucket = TokenBucket(60)  # One token per second
+    assert bucket.take(60, bucket.updated) == 0.0
+    assert bucket.take(1, bucket.updated) == pytest.approx(1.0)
+    assert bucket.take(1, bucket.updated) == pytest.approx(2.0)
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(60)
+    start = bucket.updated
+    bucket.take(60, start)
+    assert bucket.take(1, start + 1.0) == 0.0
+
+
+def test_oversized_request_is_capped_at_capacity():
+    bucket = TokenBucket(10)
+    assert bucket.take(1000, bucket.updated) == 0.0
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_unlimited_limiter_never_waits():
+    limiter = RateLimiter()
+    assert limiter._reserve(10 ** 6) == 0.0
+    asyncio.run(limiter.acquire(10 ** 6))
+    limiter.acquire_sync(10 ** 6)
+
+
+def test_limiter_takes_the_longer_of_both_waits():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+    assert limiter._reserve(600) == 0.0
+    # One request (1s) versus 300 tokens (30s)
+    assert limiter._reserve(300) == pytest.approx(30.0, rel=0.01)
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_generation_applies_the_limiter_at_any_concurrency(monkeypatch, max_concurrency):
+    reserved = []
+    monkeypatch.setattr(RateLimiter, "_reserve", lambda self, tokens: reserved.append(tokens) or 0.0)
+    endpoints = parse_swagger(synthetic_spec(3)).endpoints
+    llm = FakeLLMManager()
+
+    records = list(iter_generated_test_cases(
+        endpoints, llm, max_concurrency=max_concurrency, requests_per_minute=100, tokens_per_minute=10 ** 6
+    ))
+
+    assert records[-1]["failed_endpoints"] == 0
+    assert len(reserved) == llm.calls
+    assert all(tokens > llm.max_tokens for tokens in reserved)
@@ -0,0 +1,58 @@
+import json
+
+from utils.models import Endpoint, Response
+from utils.response_validator import MAX_SCHEMA_ERRORS, ResponseValidator
+
+PET = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "name": {"type": "string"},
+        "status": {"type": "string", "enum": ["available", "sold"]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+ENDPOINTS = [
+    Endpoint(full_path="/pet/{petId}", path="/pet/{petId}", method="GET", operation_id="getPet",
+             responses={"200": Response(schema_data=PET), "404": Response(description="Not found")}),
+    Endpoint(full_path="/pets", path="/pets", method="GET", operation_id="listPets",
+             responses={"default": Response(schema_data={"type": "array", "items": PET})}),
+]
+GET_PET = {"Endpoint": "/pet/1", "Method": "GET", "Operation ID": "getPet"}
+
+
+def validate(test_case, status_code, body):
+    return ResponseValidator(ENDPOINTS).validate(test_case, status_code, json.dumps(body).encode())
+
+
+def test_conforming_bodies_have_no_errors():
+    assert validate(GET_PET, 200, {"id": 1, "name": "rex", "status": "sold", "tags": ["a"]}) == []
+
+
+def test_mismatches_are_reported_with_their_path():
+    errors = validate(GET_PET, 200, {"id": 0, "status": "lost", "tags": ["a", 2]})
+    assert {error["path"]: error["error"] for error in errors} == {
+        "$.name": "required property is missing",
+        "$.id": "0 is below the minimum 1",
+        "$.status": "'lost' is not one of ['available', 'sold']",
+        "$.tags[1]": "expected string, got integer",
+    }
+
+
+def test_operations_match_by_path_when_the_case_has_no_operation_id():
+    case = {"Endpoint": "/pets?limit=2", "Method": "GET"}
+    assert validate(case, 500, [{"id": 1, "name": "rex"}]) == []  # `default` covers undocumented statuses
+    assert validate(case, 200, [{"id": "1", "name": "rex"}])[0]["path"] == "$[0].id"
+
+
+def test_nothing_to_check_and_invalid_json():
+    validator = ResponseValidator(ENDPOINTS)
+    assert validator.validate(GET_PET, 404, b"") is None
+    assert validator.validate({"Endpoint": "/unknown", "Method": "GET"}, 200, b"{}") is None
+    assert validator.validate(GET_PET, 200, b"<html>")[0]["error"].startswith("response body is not valid JSON")
+
+
+def test_error_lists_are_capped():
+    errors = validate({"Endpoint": "/pets", "Method": "GET"}, 200, [{"id": "x"}] * 50)
+    assert len(errors) == MAX_SCHEMA_ERRORS + 1
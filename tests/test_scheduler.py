@@ -0,0 +1,65 @@
+from utils.models import Endpoint, Parameter
+from utils.scheduler import build_chains, iter_scheduled_test_results, resource_of
+
+PET_ID = Parameter(name="petId", in_="path", required=True, type="integer")
+ENDPOINTS = [
+    Endpoint(full_path="/pet", path="/pet", method="POST", operation_id="addPet"),
+    Endpoint(full_path="/pet/{petId}", path="/pet/{petId}", method="GET", operation_id="getPet", parameters=[PET_ID]),
+    Endpoint(full_path="/pet/{petId}", path="/pet/{petId}", method="DELETE", operation_id="deletePet",
+             parameters=[PET_ID]),
+    Endpoint(full_path="/store/inventory", path="/store/inventory", method="GET", operation_id="getInventory"),
+]
+
+
+def case(name, method, path, operation_id, expected=200):
+    return {"Test Case Name": name, "Endpoint": path, "Method": method, "Operation ID": operation_id,
+            "Expected Status Code": expected}
+
+
+SUITE = [
+    case("delete pet", "DELETE", "/pet/42", "deletePet"),
+    case("get pet", "GET", "/pet/42", "getPet"),
+    case("add pet", "POST", "/pet", "addPet"),
+    case("inventory", "GET", "/store/inventory", "getInventory"),
+]
+
+
+class RaisingValidator:
+    """Raises an unexpected error while validating the named case."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def validate(self, test_case, status_code, content):
+        if test_case["Test Case Name"] == self.name:
+            raise RuntimeError("validator crashed")
+        return None
+
+
+def test_chains_group_operations_by_resource_in_stage_order():
+    assert resource_of("/pet/{petId}/uploadImage") == "/pet"
+    chains = {chain.resource: chain for chain in build_chains(SUITE, ENDPOINTS)}
+    assert [step[2]["Test Case Name"] for step in chains["/pet"].ordered()] == ["add pet", "get pet", "delete pet"]
+    assert len(chains["/store/inventory"].steps) == 1
+
+
+def test_created_ids_are_substituted_into_later_cases(app_config):
+    records = list(iter_scheduled_test_results(SUITE, ENDPOINTS, max_workers=2))
+    results = {record["test_case_name"]: record for record in records if record["type"] == "result"}
+
+    assert results["get pet"]["resolved_endpoint"] == "/pet/1"
+    assert results["delete pet"]["resolved_endpoint"] == "/pet/1"
+    assert records[-1]["total_cases"] == 4 and records[-1]["passed_cases"] == 4
+
+
+def test_a_failed_chain_reports_its_remaining_cases_as_errors(app_config):
+    records = list(iter_scheduled_test_results(SUITE, ENDPOINTS, response_validator=RaisingValidator("get pet")))
+    results = {record["test_case_name"]: record for record in records if record["type"] == "result"}
+
+    assert results["add pet"]["status"] == "PASSED" and results["inventory"]["status"] == "PASSED"
+    for name in ("get pet", "delete pet"):
+        assert results[name]["status"] == "ERROR"
+        assert "validator crashed" in results[name]["error"]
+    assert sorted(record["index"] for record in results.values()) == [0, 1, 2, 3]
+    summary = records[-1]
+    assert summary["total_cases"] == 4 and summary["passed_cases"] == 2 and summary["failed_cases"] == 2
@@ -0,0 +1,117 @@
+import copy
+import time
+
+from benchmarks.specs import synthetic_spec
+from utils.schema_resolver import SchemaResolver
+
+MUTUAL = {
+    "Owner": {"type": "object", "properties": {"pets": {"type": "array", "items": {"$ref": "#/definitions/Pet"}}}},
+    "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/definitions/Owner"}}},
+}
+
+
+def ref(name: str) -> dict:
+    return {"$ref": f"#/definitions/{name}"}
+
+
+def test_resolves_nested_refs_without_mutating_input():
+    definitions = {
+        "Tag": {"type": "object", "properties": {"name": {"type": "string"}}},
+        "Pet": {"type": "object", "properties": {"tags": {"type": "array", "items": ref("Tag")}}},
+    }
+    original = copy.deepcopy(definitions)
+    resolved = SchemaResolver(definitions).resolve(ref("Pet"))
+    assert resolved["properties"]["tags"]["items"] == definitions["Tag"]
+    assert definitions == original
+
+
+def test_self_reference_becomes_placeholder():
+    definitions = {"Node": {"type": "object", "properties": {"parent": ref("Node")}}}
+    resolved = SchemaResolver(definitions).resolve(ref("Node"))
+    assert resolved["properties"]["parent"] == {"type": "object", "x-circular-ref": "Node"}
+
+
+def test_mutual_recursion_is_cut_at_the_first_repeat():
+    owner = SchemaResolver(MUTUAL).resolve(ref("Owner"))
+    assert owner["properties"]["pets"]["items"]["properties"]["owner"]["x-circular-ref"] == "Owner"
+
+
+def test_resolution_does_not_depend_on_order():
+    pet_first = SchemaResolver(MUTUAL)
+    pet_first.resolve(ref("Pet"))
+    owner_first = SchemaResolver(MUTUAL)
+    owner_first.resolve(ref("Owner"))
+
+    for name in MUTUAL:
+        fresh = SchemaResolver(MUTUAL).resolve(ref(name))
+        assert pet_first.resolve(ref(name)) == fresh
+        assert owner_first.resolve(ref(name)) == fresh
+
+
+def test_every_definition_resolves_like_a_fresh_resolver():
+    definitions = synthetic_spec(1)["definitions"]
+    shared = SchemaResolver(definitions)
+    for name in reversed(list(definitions)):
+        shared.resolve(ref(name))
+    for name in definitions:
+        assert shared.resolve(ref(name)) == SchemaResolver(definitions).resolve(ref(name))
+
+
+def dense_cycle(count: int) -> dict:
+    """`count` definitions that all refer to one another."""
+    return {
+        f"Model{i}": {"type": "object", "properties": {f"to{j}": ref(f"Model{j}") for j in range(count)}}
+        for i in range(count)
+    }
+
+
+def test_longer_cycles_are_cut_at_the_depth_bound():
+    definitions = {
+        "A": {"type": "object", "properties": {"b": ref("B")}},
+        "B": {"type": "object", "properties": {"c": ref("C")}},
+        "C": {"type": "object", "properties": {"a": ref("A")}},
+    }
+    resolved = SchemaResolver(definitions).resolve(ref("A"))
+    assert resolved["properties"]["b"]["properties"]["c"] == {"type": "object", "x-circular-ref": "C"}
+    deeper = SchemaResolver(definitions, max_cycle_depth=2).resolve(ref("A"))
+    assert deeper["properties"]["b"]["properties"]["c"]["properties"]["a"]["x-circular-ref"] == "A"
+
+
+def test_dense_cycles_resolve_in_bounded_time():
+    definitions = dense_cycle(30)
+    start = time.perf_counter()
+    resolver = SchemaResolver(definitions)
+    for name in definitions:
+        resolver.resolve(ref(name))
+    assert time.perf_counter() - start < 2.0
+
+
+def test_definitions_reached_from_a_cycle_are_shared():
+    definitions = {**MUTUAL, "Tag": {"type": "object", "properties": {"name": {"type": "string"}}}}
+    definitions["Pet"] = {"type": "object", "properties": {"owner": ref("Owner"), "tag": ref("Tag")}}
+    resolver = SchemaResolver(definitions)
+    pet = resolver.resolve(ref("Pet"))
+    owner = resolver.resolve(ref("Owner"))
+    assert pet["properties"]["tag"] is owner["properties"]["pets"]["items"]["properties"]["tag"]
+
+
+def test_acyclic_definitions_are_shared():
+    definitions = {"Leaf": {"type": "object", "properties": {"id": {"type": "integer"}}}}
+    resolver = SchemaResolver(definitions)
+    assert resolver.resolve(ref("Leaf")) is resolver.resolve(ref("Leaf"))
+
+
+def test_all_of_is_merged():
+    definitions = {"Base": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}}}
+    schema = {"allOf": [ref("Base"), {"properties": {"name": {"type": "string"}}, "required": ["name"]}]}
+    resolved = SchemaResolver(definitions).resolve(schema)
+    assert set(resolved["properties"]) == {"id", "name"}
+    assert resolved["required"] == ["id", "name"]
+    assert "allOf" not in resolved
+
+
+def test_parameter_refs_resolve_against_spec_parameters():
+    limit = {"name": "limit", "in": "query", "type": "integer"}
+    resolver = SchemaResolver({}, {"limitParam": limit})
+    assert resolver.resolve_parameter({"$ref": "#/parameters/limitParam"}) == limit
+    assert resolver.resolve_parameter({"$ref": "#/parameters/missing"}) == {}
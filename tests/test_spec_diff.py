@@ -0,0 +1,138 @@
+import copy
+import time
+
+from benchmarks.fake_llm import FakeLLMManager
+from utils.models import Endpoint
+from utils.spec_diff import (
+    OperationMatcher, compute_fingerprint, diff_fingerprints, endpoint_fingerprints, operation_key
+)
+from utils.suite_store import SuiteStore
+from utils.utils import parse_swagger, regenerate_changed_test_cases
+
+SPEC = {
+    "swagger": "2.0",
+    "basePath": "/v1",
+    "paths": {
+        "/pets/{petId}": {
+            "get": {
+                "operationId": "getPet",
+                "parameters": [{"name": "petId", "in": "path", "required": True, "type": "integer"}],
+                "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Pet"}}},
+            },
+        },
+        "/pets/findByStatus": {
+            "get": {"operationId": "findPets", "responses": {"200": {"description": "OK"}}},
+        },
+    },
+    "definitions": {
+        "Owner": {"type": "object", "properties": {"pets": {"type": "array", "items": {"$ref": "#/definitions/Pet"}}}},
+        "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/definitions/Owner"}}},
+    },
+}
+
+
+def with_owner_endpoint(spec: dict) -> dict:
+    """`spec` plus an operation listed first that reaches the Owner <-> Pet cycle from the other side."""
+    spec = copy.deepcopy(spec)
+    owner_path = {"/owners/{ownerId}": {"get": {
+        "operationId": "getOwner",
+        "parameters": [{"name": "ownerId", "in": "path", "required": True, "type": "integer"}],
+        "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Owner"}}},
+    }}}
+    spec["paths"] = {**owner_path, **spec["paths"]}
+    return spec
+
+
+def fingerprints(spec: dict) -> dict:
+    return endpoint_fingerprints(parse_swagger(spec).endpoints)
+
+
+def test_adding_an_endpoint_leaves_other_fingerprints_unchanged():
+    before = fingerprints(SPEC)
+    after = fingerprints(with_owner_endpoint(SPEC))
+    diff = diff_fingerprints(before, after)
+    assert diff.added == ["GET /owners/{ownerId}"]
+    assert diff.changed == [] and diff.removed == []
+    assert sorted(diff.unchanged) == sorted(before)
+
+
+def test_structural_changes_change_the_fingerprint_but_docs_do_not():
+    spec = copy.deepcopy(SPEC)
+    spec["paths"]["/pets/findByStatus"]["get"]["summary"] = "Find pets"
+    assert fingerprints(spec) == fingerprints(SPEC)
+
+    spec["paths"]["/pets/findByStatus"]["get"]["parameters"] = [{"name": "status", "in": "query", "type": "string"}]
+    diff = diff_fingerprints(fingerprints(SPEC), fingerprints(spec))
+    assert diff.changed == ["GET /pets/findByStatus"]
+
+
+def cyclic_spec(count: int, reverse: bool = False) -> dict:
+    """`count` mutually referencing models, each with an operation, plus a deep chain of shared models."""
+    names = [f"Model{i}" for i in range(count)]
+    definitions = {
+        name: {"type": "object", "properties": {f"to{j}": {"$ref": f"#/definitions/{other}"}
+                                                for j, other in enumerate(names)}}
+        for name in names
+    }
+    for level in range(30):  # Each level refers to the next one twice
+        next_ref = {"$ref": f"#/definitions/Level{level + 1}"}
+        definitions[f"Level{level}"] = {"type": "object", "properties": {"left": next_ref, "right": next_ref}}
+    definitions["Level30"] = {"type": "string"}
+    definitions["Model0"]["properties"]["levels"] = {"$ref": "#/definitions/Level0"}
+    paths = {
+        f"/models/{name}": {"post": {
+            "parameters": [{"name": "body", "in": "body", "schema": {"$ref": f"#/definitions/{name}"}}],
+            "responses": {"200": {"description": "OK", "schema": {"$ref": f"#/definitions/{name}"}}},
+        }}
+        for name in names
+    }
+    if reverse:
+        paths = dict(reversed(list(paths.items())))
+    return {"swagger": "2.0", "paths": paths, "definitions": definitions}
+
+
+def test_fingerprints_of_cyclic_specs_are_cheap_and_stable():
+    start = time.perf_counter()
+    endpoints = parse_swagger(cyclic_spec(30)).endpoints
+    assert time.perf_counter() - start < 5.0
+
+    # Independent of parse order and of sharing the digest memo between endpoints
+    assert fingerprints(cyclic_spec(30, reverse=True)) == endpoint_fingerprints(endpoints)
+    assert [compute_fingerprint(endpoint) for endpoint in endpoints] == [ep.fingerprint for ep in endpoints]
+
+    changed = cyclic_spec(30)
+    changed["definitions"]["Level30"] = {"type": "integer"}
+    diff = diff_fingerprints(endpoint_fingerprints(endpoints), fingerprints(changed))
+    assert len(diff.changed) == 30  # Every model reaches Model0, and through it the chain
+
+
+def test_operation_matcher_prefers_ids_then_literal_paths():
+    matcher = OperationMatcher(parse_swagger(SPEC).endpoints)
+    assert matcher.operation_for({"Operation ID": "getPet"}) == "GET /pets/{petId}"
+    assert matcher.operation_for({"Method": "GET", "Endpoint": "/pets/findByStatus?status=sold"}) == "GET /pets/findByStatus"
+    assert matcher.operation_for({"Method": "GET", "Endpoint": "/pets/7"}) == "GET /pets/{petId}"
+    assert matcher.operation_for({"Method": "DELETE", "Endpoint": "/pets/7"}) is None
+
+
+def test_operation_key_ignores_operation_id():
+    endpoint = Endpoint(path="/pets", full_path="/v1/pets", method="get", operation_id="renamed")
+    assert operation_key(endpoint) == "GET /pets"
+
+
+def test_regeneration_only_prompts_for_added_operations(tmp_path):
+    store = SuiteStore(str(tmp_path / "suites.sqlite3"))
+    llm = FakeLLMManager(cases_per_endpoint=2)
+
+    diff, cases = regenerate_changed_test_cases("spec", parse_swagger(SPEC).endpoints, llm, store, max_concurrency=1)
+    assert len(diff.added) == 2 and llm.calls == 2 and len(cases) == 4
+
+    diff, cases = regenerate_changed_test_cases(
+        "spec", parse_swagger(with_owner_endpoint(SPEC)).endpoints, llm, store, max_concurrency=1
+    )
+    assert diff.added == ["GET /owners/{ownerId}"] and diff.changed == []
+    assert llm.calls == 3 and len(cases) == 6
+
+    diff, cases = regenerate_changed_test_cases("spec", parse_swagger(SPEC).endpoints, llm, store, max_concurrency=1)
+    assert diff.removed == ["GET /owners/{ownerId}"]
+    assert llm.calls == 3 and len(cases) == 4
+    assert store.load_suite("spec", "GET /owners/{ownerId}") is None
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from testrogue.cli import load_spec
+from utils.utils import extract_endpoints_from_swagger, is_remote_spec
+
+SPEC = {
+    "swagger": "2.0",
+    "paths": {"/pets": {"get": {"operationId": "listPets", "responses": {"200": {"description": "OK"}}}}},
+}
+
+
+@pytest.fixture
+def spec_path(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps(SPEC))
+    return path
+
+
+def test_only_http_urls_are_remote(spec_path):
+    assert is_remote_spec("https://example.com/swagger.json")
+    assert is_remote_spec("http://localhost:8080/v2/swagger.json")
+    assert not is_remote_spec(str(spec_path))
+    assert not is_remote_spec(spec_path.as_uri())
+
+
+def test_local_specs_need_allow_local(spec_path):
+    assert extract_endpoints_from_swagger(str(spec_path)).endpoints == []
+    assert extract_endpoints_from_swagger(spec_path.as_uri()).endpoints == []
+    extracted = extract_endpoints_from_swagger(spec_path.as_uri(), allow_local=True)
+    assert [endpoint.operation_id for endpoint in extracted.endpoints] == ["listPets"]
+
+
+def test_cli_reads_local_specs(spec_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert [endpoint.operation_id for endpoint in load_spec(str(spec_path), {}).endpoints] == ["listPets"]
+
+
+@pytest.mark.parametrize("route", ["/extract_endpoints", "/diff_spec", "/regenerate_tests"])
+def test_web_routes_reject_local_specs(webapp, spec_path, route):
+    client = webapp.app.test_client()
+    for source in (str(spec_path), spec_path.as_uri()):
+        response = client.post(route, json={"swagger_url": source})
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Swagger URL must be an http(s) URL"}
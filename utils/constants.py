@@ -1,3 +1,5 @@
+import os
+
 import requests
 
 SUPPORTED_MODELS = {
@@ -20,6 +22,74 @@ SUPPORTED_MODELS = {
 
 DEFAULT_MODEL = "gpt-4.1-2025-04-14"
 
+# Bump whenever the test generation prompt changes so cached completions are invalidated
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Seed for the example request bodies embedded in prompts
+PROMPT_EXAMPLE_SEED = 1234
+
+# "llm" prompts the model per endpoint; "offline" derives test cases from the schemas alone
+GENERATION_MODES = ("llm", "offline")
+OFFLINE_GENERATOR_SEED = 1234
+
+# Prompts over this many tokens get their schemas truncated; deeper schema levels are collapsed
+DEFAULT_MAX_PROMPT_TOKENS = 6000
+DEFAULT_MAX_SCHEMA_DEPTH = 4
+
+# Upper bound on endpoints packed into one batched prompt (batching itself is off unless a budget is set)
+DEFAULT_MAX_BATCH_SIZE = 8
+
+# Worker threads used to execute test cases and the concurrent request cap per target host
+DEFAULT_EXECUTION_WORKERS = 16
+DEFAULT_PER_HOST_LIMIT = 8
+
+# "parallel" runs every case independently; "dependencies" orders each resource's cases and passes captured IDs along
+EXECUTION_SCHEDULES = ("parallel", "dependencies")
+
+# Load test defaults; max_duration caps what a single /load_test request may ask for
+DEFAULT_LOAD_TEST_DURATION = 30
+DEFAULT_LOAD_TEST_CONCURRENCY = 8
+MAX_LOAD_TEST_DURATION = 300
+# Request bodies synthesized per operation and rotated through when the spec is known; the default of 1
+# replays each case's own body, so synthesis is opt-in
+DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS = 1
+LOAD_TEST_PAYLOAD_SEED = 1234
+
+LLM_CACHE_PATH = os.path.join(".testrogue", "llm_cache.sqlite3")
+SPEC_CACHE_DIR = os.path.join(".testrogue", "specs")
+SUITE_STORE_PATH = os.path.join(".testrogue", "suites.sqlite3")
+JOB_STORE_PATH = os.path.join(".testrogue", "jobs.sqlite3")
+
+# Extracted specs (with their generated suites) kept server side for handle-based requests
+DEFAULT_SPEC_STORE_ENTRIES = 16
+
+# Background jobs (generation or execution runs) processed at the same time
+DEFAULT_JOB_WORKERS = 2
+
+# Number of endpoints sent to the LLM concurrently; 1 keeps generation sequential
+DEFAULT_GENERATION_CONCURRENCY = 1
+
+# Logging: rotated JSON log file, bounded queue, response body truncation and failure sampling
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+DEFAULT_LOG_QUEUE_SIZE = 10000
+DEFAULT_LOG_MAX_BODY_CHARS = 2048
+DEFAULT_LOG_SAMPLE_BURST = 10
+DEFAULT_LOG_SAMPLE_EVERY = 100
+DEFAULT_LOG_SAMPLE_WINDOW = 60
+
+# Tracing: runs whose timelines are kept in memory, and spans kept per run
+DEFAULT_TRACE_MAX_RUNS = 50
+DEFAULT_TRACE_MAX_EVENTS = 100000
+
+# LLM pool: prompts up to this many tokens go to the fast model
+DEFAULT_ROUTE_THRESHOLD_TOKENS = 1500
+# Per-call timeout and retries of transient LLM failures, with full-jitter exponential backoff
+DEFAULT_LLM_TIMEOUT = 120
+DEFAULT_LLM_MAX_RETRIES = 2
+DEFAULT_LLM_BACKOFF_SECONDS = 0.5
+DEFAULT_LLM_MAX_BACKOFF_SECONDS = 8
+
 HTTP_METHODS = {
     "GET": requests.get,
     "POST": requests.post,
@@ -0,0 +1,273 @@
+import csv
+import json
+import logging
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Optional: only needed for the parquet and arrow export formats
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Columns of an exported test case: the generated fields followed by the execution result fields
+EXPORT_COLUMNS = [
+    "Test Case Name",
+    "Description",
+    "Endpoint",
+    "Method",
+    "Operation ID",
+    "Summary",
+    "Request Body",
+    "Expected Status Code",
+    "Headers",
+    "Actual Status Code",
+    "Status",
+    "Error",
+    "Response Time",
+    "Schema Errors",
+]
+# Columns holding structured values, written as JSON text in CSV and columnar exports
+JSON_COLUMNS = {"Request Body", "Headers", "Schema Errors"}
+INTEGER_COLUMNS = {"Expected Status Code", "Actual Status Code"}
+
+# Format name -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "junit": ("application/xml", "xml"),
+}
+
+# Text formats are flushed in chunks of about this many characters
+CHUNK_SIZE = 64 * 1024
+# Test cases per Parquet row group / Arrow record batch
+ROWS_PER_BATCH = 2000
+
+
+def _json_text(value: Any) -> Any:
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _response_time(value: Any) -> Any:
+    # Four decimal places, consistent with the result view
+    return f"{value:.4f}" if isinstance(value, (float, int)) else value
+
+
+# Per-column conversion for CSV cells, picked once per column instead of inspected per cell
+_CSV_CONVERTERS = {column: _json_text for column in JSON_COLUMNS}
+_CSV_CONVERTERS["Response Time"] = _response_time
+
+
+class _Echo:
+    """File-like target that hands back what csv.writer writes, so rows can be yielded one by one."""
+
+    def write(self, text: str) -> str:
+        return text
+
+
+def _chunked(pieces: Iterable[str]) -> Iterator[str]:
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_csv(test_cases: Iterable[dict]) -> Iterator[str]:
+    """CSV export in chunks, holding only one chunk in memory at a time."""
+    writer = csv.writer(_Echo())
+    converters = [(column, _CSV_CONVERTERS.get(column)) for column in EXPORT_COLUMNS]
+
+    def rows():
+        yield writer.writerow(EXPORT_COLUMNS)
+        for tc in test_cases:
+            yield writer.writerow([
+                convert(tc.get(column, "")) if convert else tc.get(column, "")
+                for column, convert in converters
+            ])
+
+    return _chunked(rows())
+
+
+def iter_jsonl(test_cases: Iterable[dict]) -> Iterator[str]:
+    """One JSON object per test case and line, with the structured fields kept as JSON."""
+    return _chunked(
+        json.dumps({column: tc.get(column) for column in EXPORT_COLUMNS}) + "\n" for tc in test_cases
+    )
+
+
+def _arrow_schema():
+    def column_type(column):
+        if column in INTEGER_COLUMNS:
+            return pyarrow.int64()
+        if column == "Response Time":
+            return pyarrow.float64()
+        return pyarrow.string()
+    return pyarrow.schema([(column, column_type(column)) for column in EXPORT_COLUMNS])
+
+
+def _arrow_value(column: str, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    if column in JSON_COLUMNS:
+        return json.dumps(value) if not isinstance(value, str) else value
+    try:
+        if column in INTEGER_COLUMNS:
+            return int(value)
+        if column == "Response Time":
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def _batches(test_cases: Iterable[dict], schema) -> Iterator:
+    columns = {column: [] for column in EXPORT_COLUMNS}
+    rows = 0
+    for tc in test_cases:
+        for column, values in columns.items():
+            values.append(_arrow_value(column, tc.get(column)))
+        rows += 1
+        if rows == ROWS_PER_BATCH:
+            yield pyarrow.record_batch([columns[c] for c in EXPORT_COLUMNS], schema=schema)
+            columns = {column: [] for column in EXPORT_COLUMNS}
+            rows = 0
+    if rows:
+        yield pyarrow.record_batch([columns[c] for c in EXPORT_COLUMNS], schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file that collects the bytes a pyarrow writer produces until they are drained."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def iter_columnar(test_cases: Iterable[dict], export_format: str) -> Iterator[bytes]:
+    """
+    Parquet or Arrow IPC stream export, written and yielded one row group / record batch at a time.
+    Structured fields are stored as JSON text. Requires pyarrow.
+    """
+    if pyarrow is None:
+        raise ValueError(f"The {export_format} export needs pyarrow; install it with `pip install pyarrow`")
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    parquet = export_format == "parquet"
+    writer = pyarrow.parquet.ParquetWriter(sink, schema) if parquet else pyarrow.ipc.new_stream(sink, schema)
+
+    def generate():
+        try:
+            for batch in _batches(test_cases, schema):
+                if parquet:
+                    writer.write_table(pyarrow.Table.from_batches([batch]))
+                else:
+                    writer.write_batch(batch)
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    return generate()
+
+
+def _junit_outcome(tc: dict):
+    """(element tag, message) for a failed or errored case, or None when it passed or never ran."""
+    status = tc.get("Status")
+    if status == "ERROR":
+        return "error", tc.get("Error") or "Request failed"
+    if status != "FAILED":
+        return None
+    if tc.get("Schema Errors"):
+        return "failure", "Response body does not match the schema"
+    return "failure", f"Expected status {tc.get('Expected Status Code')}, got {tc.get('Actual Status Code')}"
+
+
+def junit_xml(test_cases: Iterable[dict], suite_name: str = "testrogue") -> bytes:
+    """
+    JUnit XML report of executed test cases (rows carrying the result columns), one testcase per
+    case with its operation as the classname. Cases without a result are reported as skipped.
+    The suite totals come first in the document, so the cases are held in memory.
+    """
+    suite = ElementTree.Element("testsuite", name=suite_name)
+    counts = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    total_time = 0.0
+    for tc in test_cases:
+        counts["tests"] += 1
+        operation = tc.get("Operation ID") or f"{tc.get('Method', '')} {tc.get('Endpoint', '')}".strip()
+        response_time = _arrow_value("Response Time", tc.get("Response Time")) or 0.0
+        total_time += response_time
+        case = ElementTree.SubElement(
+            suite, "testcase", classname=operation, name=str(tc.get("Test Case Name", "")), time=f"{response_time:.4f}"
+        )
+        outcome = _junit_outcome(tc)
+        if outcome is not None:
+            tag, message = outcome
+            counts["failures" if tag == "failure" else "errors"] += 1
+            detail = ElementTree.SubElement(case, tag, message=str(message))
+            detail.text = json.dumps({
+                column: tc.get(column) for column in
+                ("Method", "Endpoint", "Expected Status Code", "Actual Status Code", "Error", "Schema Errors")
+                if tc.get(column) not in (None, "")
+            }, indent=2)
+        elif tc.get("Status") != "PASSED":
+            counts["skipped"] += 1
+            ElementTree.SubElement(case, "skipped", message="Not executed")
+
+    for key, value in counts.items():
+        suite.set(key, str(value))
+    suite.set("time", f"{total_time:.4f}")
+    suites = ElementTree.Element("testsuites", {**{k: suite.get(k) for k in ("tests", "failures", "errors")},
+                                                "time": suite.get("time")})
+    suites.append(suite)
+    return ElementTree.tostring(suites, encoding="utf-8", xml_declaration=True)
+
+
+EXPORTERS = {
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+    "parquet": lambda test_cases: iter_columnar(test_cases, "parquet"),
+    "arrow": lambda test_cases: iter_columnar(test_cases, "arrow"),
+    "junit": lambda test_cases: iter([junit_xml(test_cases)]),
+}  # type: Dict[str, Callable[[Iterable[dict]], Iterator]]
+
+
+def export_test_cases(test_cases: Iterable[dict], export_format: str = "csv") -> Iterator:
+    """
+    Chunks of the export of `test_cases` in `export_format` (one of EXPORT_FORMATS).
+    Test cases are consumed lazily, so an iterator keeps memory flat for any suite size.
+    Raises ValueError for unknown formats or when a columnar format's dependency is missing.
+    """
+    if export_format not in EXPORTERS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return EXPORTERS[export_format](test_cases)
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.tracing import iter_traced, start_run
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """
+    SQLite store of background jobs and the records they produce.
+    Records are appended as they arrive, so partial results of a running, failed or
+    cancelled job stay readable.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " done INTEGER NOT NULL DEFAULT 0,"
+            " total INTEGER NOT NULL,"
+            " error TEXT,"
+            " result TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_records ("
+            " job_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " record TEXT NOT NULL,"
+            " PRIMARY KEY (job_id, seq))"
+        )
+        # Jobs cannot survive a restart; mark whatever was in flight so clients stop polling
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?)",
+            (FAILED, "Interrupted by server restart", time.time(), QUEUED, RUNNING)
+        )
+        self._conn.commit()
+
+    def create(self, job_id: str, kind: str, total: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, total, now, now)
+            )
+            self._conn.commit()
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None, result: Any = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, result = ?, updated_at = ? WHERE id = ?",
+                (status, error, json.dumps(result) if result is not None else None, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def add_record(self, job_id: str, seq: int, record: dict, done: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_records (job_id, seq, record) VALUES (?, ?, ?)", (job_id, seq, json.dumps(record))
+            )
+            self._conn.execute("UPDATE jobs SET done = ?, updated_at = ? WHERE id = ?", (done, time.time(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, done, total, error, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "kind", "status", "done", "total", "error", "created_at", "updated_at")
+        return dict(zip(keys, row))
+
+    def load_result(self, job_id: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def load_records(self, job_id: str, after: int = 0) -> List[dict]:
+        """Records with a sequence number greater than `after`, each tagged with its `seq`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, record FROM job_records WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        return [{"seq": seq, **json.loads(record)} for seq, record in rows]
+
+
+class JobQueue:
+    """
+    Runs record-producing work (iter_generated_test_cases, iter_test_results) on a thread pool,
+    persisting every record and the final result in a JobStore.
+    Cancellation is cooperative: it takes effect when the job produces its next record.
+    With tracing enabled, each job is traced as the run with the job's ID.
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = 2):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._cancel_events = {}  # type: Dict[str, threading.Event]
+        self._lock = threading.Lock()
+
+    def submit(
+            self,
+            kind: str,
+            total: int,
+            produce: Callable[[], Iterator[dict]],
+            finalize: Callable[[List[dict]], Any]
+    ) -> str:
+        """
+        Queue a job and return its ID. `produce` is called on a worker thread and yields records
+        ending with a summary record; `finalize` turns the records into the job's result.
+        """
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, kind, total)
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+        self._executor.submit(self._run, job_id, produce, finalize)
+        logger.info("Queued %s job %s (%d items)", kind, job_id, total)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; returns False if the job is unknown or already finished."""
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+    def _run(self, job_id: str, produce: Callable[[], Iterator[dict]], finalize: Callable[[List[dict]], Any]) -> None:
+        with self._lock:
+            cancelled = self._cancel_events[job_id]
+        records, done = [], 0
+        try:
+            if cancelled.is_set():
+                self.store.set_status(job_id, CANCELLED)
+                return
+
+            self.store.set_status(job_id, RUNNING)
+            stream = iter_traced(start_run(job_id), produce(), "job")
+            try:
+                for record in stream:
+                    records.append(record)
+                    if record.get("type") != "summary":
+                        done += 1
+                    self.store.add_record(job_id, len(records), record, done)
+                    if cancelled.is_set():
+                        break
+            finally:
+                # Closing the generator cancels in-flight LLM calls and shuts down executor threads
+                stream.close()
+
+            if cancelled.is_set():
+                logger.info("Job %s cancelled after %d items", job_id, done)
+                self.store.set_status(job_id, CANCELLED)
+            else:
+                self.store.set_status(job_id, SUCCEEDED, result=finalize(records))
+                logger.info("Job %s finished (%d items)", job_id, done)
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job_id, e)
+            self.store.set_status(job_id, FAILED, error=str(e))
+        finally:
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
@@ -0,0 +1,123 @@
+import json
+import logging
+import re
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+# Only these characters change the parser state; everything else is skipped in bulk
+_STRUCTURAL = re.compile(r'[\[\]{}"\\]')
+# Before the array starts: its opening bracket, and quotes so a bracket quoted in prose is not taken for it
+_PROSE = re.compile(r'[\["\n]')
+
+
+def repair_json(text: str) -> str:
+    """Apply the usual fixes for slightly malformed LLM JSON (quotes, trailing commas, comments, missing commas)."""
+    # Replace single quotes with double quotes
+    fixed = re.sub(r"(?<!\\)'", '"', text)
+
+    # Remove trailing commas
+    fixed = re.sub(r",(\s*[}\]])", r"\1", fixed)
+
+    # Remove comments if any (// or # style)
+    fixed = re.sub(r"(?m)^\s*(//|#).*$", "", fixed)
+
+    # Fix some missing commas between string-ending and next key
+    fixed = re.sub(r'(":[^"]*")(\s*")', r'\1,\2', fixed)  # "...": "val" "next"
+    fixed = re.sub(r'(\}|\])\s*{', r'\1, {', fixed)  # } { → }, {
+    return fixed
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a top-level JSON array of objects arriving in arbitrary chunks.
+
+    Text before the opening `[` (prose, markdown fences) is ignored, including brackets inside a
+    double-quoted span of a prose line. `feed` returns every object element completed by the
+    chunk, so callers can act on each one while the rest is still being produced. A malformed
+    element is repaired if possible, otherwise skipped and counted in `skipped`; it never affects
+    the elements around it. `elements` counts the object elements seen, and `trailing_array`
+    tells that another `[` followed the closed array, i.e. the array taken may not be the answer.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.elements = 0
+        self.skipped = 0
+        self.trailing_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._collecting = False
+        self._parts = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        elements = []
+        if self.finished:
+            self.trailing_array = self.trailing_array or "[" in chunk
+            return elements
+
+        element_start = 0
+        position = 0
+        while position < len(chunk):
+            if self._escape:
+                self._escape = False
+                position += 1
+                continue
+
+            match = (_STRUCTURAL if self.started else _PROSE).search(chunk, position)
+            if match is None:
+                break
+            position = match.start()
+            char = chunk[position]
+
+            if not self.started:
+                if char == '"':
+                    self._in_string = not self._in_string
+                elif char == "\n":
+                    self._in_string = False  # Prose quotes do not span lines
+                elif not self._in_string:
+                    self.started = True
+                    self._depth = 1
+            elif self._in_string:
+                if char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                if self._depth == 1 and char == "{":
+                    self._collecting = True
+                    self._parts = []
+                    element_start = position
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1 and self._collecting:
+                    self._parts.append(chunk[element_start:position + 1])
+                    self._collecting = False
+                    self.elements += 1
+                    self._emit("".join(self._parts), elements)
+                elif self._depth == 0:
+                    self.finished = True
+                    self.trailing_array = "[" in chunk[position + 1:]
+                    break
+            position += 1
+
+        if self._collecting:
+            self._parts.append(chunk[element_start:])
+        return elements
+
+    def _emit(self, text: str, elements: List[Any]) -> None:
+        try:
+            elements.append(json.loads(text))
+            return
+        except json.JSONDecodeError:
+            pass
+        try:
+            elements.append(json.loads(repair_json(text)))
+        except json.JSONDecodeError as e:
+            self.skipped += 1
+            logger.warning("Skipping malformed array element (%s): %.200s", e, text)
@@ -1,55 +1,238 @@
-from typing import Union, List
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, Union, List, Optional
 
 from langchain_openai import ChatOpenAI, OpenAI
-from utils.constants import SUPPORTED_MODELS, DEFAULT_MODEL
+from utils.constants import SUPPORTED_MODELS, DEFAULT_MODEL, PROMPT_TEMPLATE_VERSION
+from utils.llm_cache import LLMCache
+from utils.metrics import (
+    LLM_CACHE_LOOKUPS, LLM_COMPLETION_TOKENS, LLM_ERRORS, LLM_IN_FLIGHT, LLM_LATENCY, LLM_PROMPT_TOKENS
+)
+from utils.tracing import span
 
 
 class LLMManager:
-    _instance = None
+    # One manager per model, temperature, cache and client options, so each configuration gets its own client
+    _instances = {}  # type: Dict[tuple, LLMManager]
+    _instances_lock = threading.Lock()
 
-    def __init__(self, model_name: str = DEFAULT_MODEL, temperature: float = 0.2):
+    def __init__(
+            self,
+            model_name: str = DEFAULT_MODEL,
+            temperature: float = 0.2,
+            cache: Optional[LLMCache] = None,
+            timeout: Optional[float] = None,
+            max_retries: Optional[int] = None
+    ):
+        """
+        `timeout` bounds each provider request in seconds; `max_retries` overrides the client's own
+        retries (LLMPool sets 0 and retries with its own jittered backoff).
+        """
         if model_name not in SUPPORTED_MODELS:
             raise ValueError(f"Unsupported model: {model_name}")
 
         config = SUPPORTED_MODELS[model_name]
         self.model_name = model_name
+        self.temperature = temperature
         self.model_type = config["type"]
         self.provider = config["provider"]
         self.max_tokens = config.get("max_tokens", 2048)
+        self.cache = cache
+
+        client_options = {}
+        if timeout is not None:
+            client_options["timeout"] = timeout
+        if max_retries is not None:
+            client_options["max_retries"] = max_retries
 
         # Initialize LLM
         if self.model_type == "chat":
             self.llm = ChatOpenAI(
                 model=self.model_name,
                 temperature=temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                **client_options
             )
         elif self.model_type == "completion":
             self.llm = OpenAI(
                 model=self.model_name,
                 temperature=temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                **client_options
             )
         else:
             raise NotImplementedError(f"Model type not supported: {self.model_type}")
 
     @classmethod
-    def get_instance(cls, model_name=None, temperature=0.2):
-        if cls._instance is None:
-            cls._instance = cls(model_name, temperature)
-        return cls._instance
+    def get_instance(cls, model_name=None, temperature=0.2, cache=None, **client_options):
+        """
+        The shared manager for `model_name` (DEFAULT_MODEL when None) with this temperature, cache
+        and client options, created on first use.
+        """
+        # The cache is part of the key by identity; LLMCache does not define equality
+        key = (model_name or DEFAULT_MODEL, temperature, cache, tuple(sorted(client_options.items())))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key[0], temperature, cache, **client_options)
+            return cls._instances[key]
+
+    def generate_response(self, prompt: Union[str, List[str]], bypass_cache: bool = False) -> Union[str, List[str]]:
+        key = self._cache_key(prompt)
+        cached = self._cache_lookup(key, bypass_cache)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        try:
+            with LLM_IN_FLIGHT.track_inprogress(model=self.model_name), \
+                    span("LLMManager.generate_response", "llm", model=self.model_name):
+                if self.model_type == "chat":
+                    response = self.llm.invoke(prompt)
+                elif self.model_type == "completion":
+                    response = self.llm.generate([prompt])
+                else:
+                    raise NotImplementedError("Response generation not implemented for this model type")
+            text = self._extract_text(response)
+        except Exception as e:
+            LLM_ERRORS.inc(model=self.model_name)
+            raise RuntimeError(f"Error during LLM generation: {str(e)}") from e
+        self._record_usage(response, time.perf_counter() - start)
+
+        if key:
+            self.cache.set(key, text)
+        return text
+
+    async def agenerate_response(self, prompt: Union[str, List[str]], bypass_cache: bool = False) -> Union[str, List[str]]:
+        """Async counterpart of generate_response using the LangChain ainvoke/agenerate path."""
+        key = self._cache_key(prompt)
+        cached = self._cache_lookup(key, bypass_cache)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        try:
+            with LLM_IN_FLIGHT.track_inprogress(model=self.model_name), \
+                    span("LLMManager.agenerate_response", "llm", model=self.model_name):
+                if self.model_type == "chat":
+                    response = await self.llm.ainvoke(prompt)
+                elif self.model_type == "completion":
+                    response = await self.llm.agenerate([prompt])
+                else:
+                    raise NotImplementedError("Response generation not implemented for this model type")
+            text = self._extract_text(response)
+        except Exception as e:
+            LLM_ERRORS.inc(model=self.model_name)
+            raise RuntimeError(f"Error during LLM generation: {str(e)}") from e
+        self._record_usage(response, time.perf_counter() - start)
+
+        if key:
+            self.cache.set(key, text)
+        return text
+
+    def stream_response(self, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Yield the completion in chunks as the model produces them.
+        A cached completion is yielded as a single chunk; a streamed one is cached once complete.
+        """
+        key = self._cache_key(prompt)
+        cached = self._cache_lookup(key, bypass_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        start = time.perf_counter()
+        chunks, final = [], None
+        try:
+            with LLM_IN_FLIGHT.track_inprogress(model=self.model_name), \
+                    span("LLMManager.stream_response", "llm", model=self.model_name):
+                for chunk in self.llm.stream(prompt):
+                    final = self._merge_chunk(final, chunk)
+                    text = self._chunk_text(chunk)
+                    chunks.append(text)
+                    yield text
+        except Exception as e:
+            LLM_ERRORS.inc(model=self.model_name)
+            raise RuntimeError(f"Error during LLM generation: {str(e)}") from e
+        self._finish_stream(key, chunks, final, time.perf_counter() - start)
+
+    async def astream_response(self, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async counterpart of stream_response."""
+        key = self._cache_key(prompt)
+        cached = self._cache_lookup(key, bypass_cache)
+        if cached is not None:
+            yield cached
+            return
 
-    def generate_response(self, prompt: Union[str, List[str]]) -> Union[str, List[str]]:
+        start = time.perf_counter()
+        chunks, final = [], None
         try:
-            if self.model_type == "chat":
-                response = self.llm.invoke(prompt)
-                return response.content.strip()
-            elif self.model_type == "completion":
-                response = self.llm.generate([prompt])
-                if not response.generations or not response.generations[0]:
-                    raise ValueError("LLM returned an empty response.")
-                return response.generations[0][0].text.strip()
-            else:
-                raise NotImplementedError("Response generation not implemented for this model type")
+            with LLM_IN_FLIGHT.track_inprogress(model=self.model_name), \
+                    span("LLMManager.astream_response", "llm", model=self.model_name):
+                async for chunk in self.llm.astream(prompt):
+                    final = self._merge_chunk(final, chunk)
+                    text = self._chunk_text(chunk)
+                    chunks.append(text)
+                    yield text
         except Exception as e:
-            raise RuntimeError(f"Error during LLM generation: {str(e)}")
+            LLM_ERRORS.inc(model=self.model_name)
+            raise RuntimeError(f"Error during LLM generation: {str(e)}") from e
+        self._finish_stream(key, chunks, final, time.perf_counter() - start)
+
+    def evict(self, prompt: str) -> None:
+        """
+        Drop the cached completion for `prompt`. Callers evict output that fails to parse or
+        validate, so a truncated or malformed completion is not replayed on the next run.
+        """
+        key = self._cache_key(prompt)
+        if key:
+            self.cache.delete(key)
+
+    def _chunk_text(self, chunk) -> str:
+        return chunk.content if self.model_type == "chat" else chunk
+
+    def _merge_chunk(self, final, chunk):
+        # Chat chunks add up to a message carrying usage metadata; completion chunks are plain text
+        if self.model_type != "chat":
+            return None
+        return chunk if final is None else final + chunk
+
+    def _finish_stream(self, key: Optional[str], chunks: List[str], final, elapsed: float) -> None:
+        self._record_usage(final, elapsed)
+        if key:
+            self.cache.set(key, "".join(chunks).strip())
+
+    def _cache_key(self, prompt) -> Optional[str]:
+        if self.cache is None or not isinstance(prompt, str):
+            return None
+        return LLMCache.make_key(self.model_name, self.temperature, prompt, PROMPT_TEMPLATE_VERSION)
+
+    def _cache_lookup(self, key: Optional[str], bypass_cache: bool) -> Optional[str]:
+        if not key or bypass_cache:
+            return None
+        cached = self.cache.get(key)
+        LLM_CACHE_LOOKUPS.inc(model=self.model_name, result="miss" if cached is None else "hit")
+        return cached
+
+    def _record_usage(self, response, elapsed: float) -> None:
+        """Record latency and, when the provider reports it, prompt/completion token usage."""
+        LLM_LATENCY.observe(elapsed, model=self.model_name)
+        if response is None:
+            return
+        if self.model_type == "chat":
+            usage = getattr(response, "usage_metadata", None) or {}
+            prompt_tokens, completion_tokens = usage.get("input_tokens"), usage.get("output_tokens")
+        else:
+            usage = (response.llm_output or {}).get("token_usage", {})
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+        if prompt_tokens is not None:
+            LLM_PROMPT_TOKENS.observe(prompt_tokens, model=self.model_name)
+        if completion_tokens is not None:
+            LLM_COMPLETION_TOKENS.observe(completion_tokens, model=self.model_name)
+
+    def _extract_text(self, response) -> str:
+        if self.model_type == "chat":
+            return response.content.strip()
+        if not response.generations or not response.generations[0]:
+            raise ValueError("LLM returned an empty response.")
+        return response.generations[0][0].text.strip()
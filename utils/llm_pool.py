@@ -0,0 +1,445 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from utils.constants import (
+    DEFAULT_LLM_BACKOFF_SECONDS,
+    DEFAULT_LLM_MAX_BACKOFF_SECONDS,
+    DEFAULT_LLM_MAX_RETRIES,
+    DEFAULT_LLM_TIMEOUT,
+    DEFAULT_ROUTE_THRESHOLD_TOKENS,
+)
+from utils.llm_cache import LLMCache
+from utils.llm_manager import LLMManager
+from utils.metrics import LLM_HEDGES, LLM_RETRIES, LLM_ROUTED
+from utils.prompt_builder import count_tokens
+from utils.tracing import bind
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: request timeout, rate limit and server errors
+RETRYABLE_STATUS = {408, 429}
+RETRYABLE_ERRORS = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+# Latencies kept per model, and samples needed before percentiles are trusted for hedging
+STATS_WINDOW = 200
+MIN_HEDGE_SAMPLES = 10
+# Models failing more than this share of recent calls are tried after the healthy ones
+UNHEALTHY_ERROR_RATE = 0.5
+
+
+def retry_reason(error: BaseException) -> Optional[str]:
+    """Why `error` (or the error it wraps) is transient, or None when retrying cannot help."""
+    while error is not None:
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+            return "timeout"
+        if isinstance(error, ConnectionError):
+            return "connection"
+        status = getattr(error, "status_code", None)
+        if isinstance(status, int) and (status in RETRYABLE_STATUS or status >= 500):
+            return str(status)
+        if type(error).__name__ in RETRYABLE_ERRORS:
+            return type(error).__name__
+        error = error.__cause__
+    return None
+
+
+class ModelStats:
+    """Recent latencies and outcomes of one model's calls."""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self._outcomes.append(ok)
+            if not ok:
+                self.errors += 1
+            elif latency is not None:
+                self._latencies.append(latency)
+
+    def percentile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < max(1, min_samples):
+            return None
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "recent_error_rate": round(self.error_rate(), 4),
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+        }
+
+
+class _Outcome:
+    """
+    Records one call in its model's stats exactly once: when the call ends, or as a failure when
+    the pool stops waiting for it, whichever comes first.
+    """
+
+    def __init__(self, stats: ModelStats):
+        self._stats = stats
+        self._lock = threading.Lock()
+        self._recorded = False
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        with self._lock:
+            if self._recorded:
+                return
+            self._recorded = True
+        self._stats.record(latency, ok)
+
+
+class _OpenStream:
+    """A started stream and the first chunk already taken from it."""
+
+    def __init__(self, stream: Iterator[str], first: Optional[str]):
+        self.stream = stream
+        self.first = first
+
+
+def _close_stream(future) -> None:
+    """Done callback closing a stream that was started but lost the race or came too late."""
+    if not future.cancelled() and future.exception() is None and isinstance(future.result(), _OpenStream):
+        future.result().stream.close()
+
+
+class LLMPool:
+    """
+    Several LLMManagers behind the LLMManager interface (generate/stream, sync and async).
+
+    Prompts up to `route_threshold_tokens` go to `fast_model`, larger ones to the strong model (the
+    first configured). Each call is bounded by `timeout` seconds; timeouts, 429s and 5xx responses
+    are retried up to `max_retries` times with full-jitter exponential backoff, on the next healthiest
+    model. With `hedge_percentile`, a call still pending after that latency percentile of its model
+    is duplicated on another model and the first answer wins. Streams are bounded by `timeout`,
+    retried and hedged only until their first chunk; after it the member's own client timeout
+    applies. Per-model latency and error stats order the fallbacks.
+    """
+
+    def __init__(
+            self,
+            members: List[LLMManager],
+            fast_model: Optional[str] = None,
+            route_threshold_tokens: int = DEFAULT_ROUTE_THRESHOLD_TOKENS,
+            timeout: float = DEFAULT_LLM_TIMEOUT,
+            max_retries: int = DEFAULT_LLM_MAX_RETRIES,
+            backoff_seconds: float = DEFAULT_LLM_BACKOFF_SECONDS,
+            max_backoff_seconds: float = DEFAULT_LLM_MAX_BACKOFF_SECONDS,
+            hedge_percentile: Optional[float] = None,
+            max_workers: int = 16
+    ):
+        if not members:
+            raise ValueError("LLMPool needs at least one model")
+        self.members = {member.model_name: member for member in members}
+        self.strong = members[0]
+        self.fast = self.members.get(fast_model, self.strong) if fast_model else self.strong
+        self.route_threshold_tokens = route_threshold_tokens
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.hedge_percentile = hedge_percentile
+        self.stats = {name: ModelStats() for name in self.members}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-pool")
+        self._random = random.Random()
+
+    @classmethod
+    def from_config(cls, llm_config: dict, cache: Optional[LLMCache] = None, temperature: float = 0.2) -> "LLMPool":
+        """Build a pool from the `llm` section of config.yaml; the first of `models` is the strong model."""
+        timeout = llm_config.get("timeout_seconds", DEFAULT_LLM_TIMEOUT)
+        members = [
+            LLMManager.get_instance(name, temperature, cache, timeout=timeout, max_retries=0)
+            for name in llm_config["models"]
+        ]
+        return cls(
+            members,
+            fast_model=llm_config.get("fast_model"),
+            route_threshold_tokens=llm_config.get("route_threshold_tokens", DEFAULT_ROUTE_THRESHOLD_TOKENS),
+            timeout=timeout,
+            max_retries=llm_config.get("max_retries", DEFAULT_LLM_MAX_RETRIES),
+            backoff_seconds=llm_config.get("backoff_seconds", DEFAULT_LLM_BACKOFF_SECONDS),
+            max_backoff_seconds=llm_config.get("max_backoff_seconds", DEFAULT_LLM_MAX_BACKOFF_SECONDS),
+            hedge_percentile=llm_config.get("hedge_percentile"),
+        )
+
+    # The strong model's name and the largest completion budget stand in for the pool where a
+    # single model is expected (prompt token counting, rate limiter reservations)
+    @property
+    def model_name(self) -> str:
+        return self.strong.model_name
+
+    @property
+    def max_tokens(self) -> int:
+        return max(member.max_tokens for member in self.members.values())
+
+    def evict(self, prompt: str) -> None:
+        """Drop the cached completion for `prompt` from every member, whichever one answered it."""
+        for member in self.members.values():
+            member.evict(prompt)
+
+    def candidates(self, prompt: str) -> List[LLMManager]:
+        """Members in the order to try them: the routed model first, then the rest by health and speed."""
+        tokens = count_tokens(prompt, self.strong.model_name)
+        preferred = self.fast if tokens <= self.route_threshold_tokens else self.strong
+        others = [member for member in self.members.values() if member is not preferred]
+        others.sort(key=lambda member: (self.stats[member.model_name].error_rate(),
+                                        self.stats[member.model_name].percentile(0.5) or 0.0))
+        ordered = [preferred] + others
+        # A routed model that keeps failing is tried last until its recent calls recover
+        if len(ordered) > 1 and self.stats[preferred.model_name].error_rate() > UNHEALTHY_ERROR_RATE:
+            ordered = others + [preferred]
+        return ordered
+
+    def stats_snapshot(self) -> Dict[str, dict]:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def _hedge_delay(self, member: LLMManager) -> Optional[float]:
+        if self.hedge_percentile is None:
+            return None
+        return self.stats[member.model_name].percentile(self.hedge_percentile, MIN_HEDGE_SAMPLES)
+
+    def _backoff(self, attempt: int) -> float:
+        return self._random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def _attempts(self, prompt: str):
+        """(attempt number, primary member, hedge member) for each try, cycling through the candidates."""
+        ordered = self.candidates(prompt)
+        LLM_ROUTED.inc(model=ordered[0].model_name)
+        for attempt in range(self.max_retries + 1):
+            primary = ordered[attempt % len(ordered)]
+            hedge = ordered[(attempt + 1) % len(ordered)]
+            yield attempt, primary, hedge
+
+    def _should_retry(self, error: Exception, attempt: int, member: LLMManager) -> bool:
+        reason = retry_reason(error)
+        if reason is None or attempt >= self.max_retries:
+            return False
+        LLM_RETRIES.inc(model=member.model_name, reason=reason)
+        logger.warning("LLM call to %s failed (%s), retrying: %s", member.model_name, reason, error)
+        return True
+
+    # -- blocking calls ---------------------------------------------------------------------------
+
+    def _timed_call(self, member: LLMManager, prompt: str, bypass_cache: bool, outcome: _Outcome) -> str:
+        start = time.perf_counter()
+        try:
+            text = member.generate_response(prompt, bypass_cache=bypass_cache)
+        except Exception:
+            outcome.record(None, ok=False)
+            raise
+        outcome.record(time.perf_counter() - start, ok=True)
+        return text
+
+    def generate_response(self, prompt: str, bypass_cache: bool = False) -> str:
+        for attempt, member, hedge_member in self._attempts(prompt):
+            try:
+                return self._call_with_hedge(self._timed_call, member, hedge_member, prompt, bypass_cache)
+            except Exception as e:
+                if not self._should_retry(e, attempt, member):
+                    raise
+                time.sleep(self._backoff(attempt))
+
+    def _call_with_hedge(self, call, member: LLMManager, hedge_member: LLMManager, prompt: str, bypass_cache: bool):
+        """
+        Run `call` on `member`, and on `hedge_member` too once the hedge delay passes; return the
+        first result. Calls still pending after `timeout` are recorded as failed and abandoned.
+        """
+
+        def submit(candidate: LLMManager):
+            outcome = _Outcome(self.stats[candidate.model_name])
+            future = self._executor.submit(bind(call), candidate, prompt, bypass_cache, outcome)
+            futures[future] = (candidate, outcome)
+
+        futures = {}
+        submit(member)
+        deadline = time.monotonic() + self.timeout
+        delay = self._hedge_delay(member)
+        if delay is not None and delay < self.timeout:
+            done, _ = wait(futures, timeout=delay)
+            if not done:
+                LLM_HEDGES.inc(model=hedge_member.model_name)
+                submit(hedge_member)
+
+        error = None
+        while futures:
+            done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                # The late calls keep their workers until the provider's own timeout ends them
+                for future, (_, outcome) in futures.items():
+                    outcome.record(None, ok=False)
+                    future.add_done_callback(_close_stream)
+                raise TimeoutError(f"LLM call to {member.model_name} exceeded {self.timeout}s")
+            for future in done:
+                futures.pop(future)
+                if future.exception() is None:
+                    for other in futures:
+                        if not other.cancel():
+                            other.add_done_callback(_close_stream)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _start_stream(self, member: LLMManager, prompt: str, bypass_cache: bool, outcome: _Outcome):
+        """Open a stream on `member` and wait for its first chunk (None for an empty stream)."""
+        start = time.perf_counter()
+        stream = member.stream_response(prompt, bypass_cache=bypass_cache)
+        try:
+            first = next(stream, None)
+        except Exception:
+            outcome.record(None, ok=False)
+            raise
+        # Time to first chunk is what routing and hedging care about
+        outcome.record(time.perf_counter() - start, ok=True)
+        return _OpenStream(stream, first)
+
+    def stream_response(self, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        for attempt, member, hedge_member in self._attempts(prompt):
+            try:
+                opened = self._call_with_hedge(self._start_stream, member, hedge_member, prompt, bypass_cache)
+            except Exception as e:
+                if not self._should_retry(e, attempt, member):
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            try:
+                if opened.first is not None:
+                    yield opened.first
+                yield from opened.stream
+            finally:
+                opened.stream.close()
+            return
+
+    # -- async calls ------------------------------------------------------------------------------
+
+    async def _atimed_call(self, member: LLMManager, prompt: str, bypass_cache: bool) -> str:
+        start = time.perf_counter()
+        try:
+            text = await member.agenerate_response(prompt, bypass_cache=bypass_cache)
+        except Exception:
+            self.stats[member.model_name].record(None, ok=False)
+            raise
+        self.stats[member.model_name].record(time.perf_counter() - start, ok=True)
+        return text
+
+    async def agenerate_response(self, prompt: str, bypass_cache: bool = False) -> str:
+        for attempt, member, hedge_member in self._attempts(prompt):
+            try:
+                return await asyncio.wait_for(
+                    self._acall_with_hedge(member, hedge_member, prompt, bypass_cache), self.timeout
+                )
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats[member.model_name].record(None, ok=False)
+                if not self._should_retry(e, attempt, member):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+
+    async def _acall_with_hedge(self, member: LLMManager, hedge_member: LLMManager, prompt: str, bypass_cache: bool) -> str:
+        tasks = {asyncio.ensure_future(self._atimed_call(member, prompt, bypass_cache))}
+        delay = self._hedge_delay(member)
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    LLM_HEDGES.inc(model=hedge_member.model_name)
+                    tasks.add(asyncio.ensure_future(self._atimed_call(hedge_member, prompt, bypass_cache)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def astream_response(self, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        for attempt, member, hedge_member in self._attempts(prompt):
+            try:
+                stream, first = await asyncio.wait_for(
+                    self._afirst_chunk(member, hedge_member, prompt, bypass_cache), self.timeout
+                )
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats[member.model_name].record(None, ok=False)
+                if not self._should_retry(e, attempt, member):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            try:
+                if first is not None:
+                    yield first
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        return
+                    yield chunk
+            finally:
+                await stream.aclose()
+
+    async def _afirst_chunk(self, member: LLMManager, hedge_member: LLMManager, prompt: str, bypass_cache: bool):
+        """Start a stream (hedged after the percentile delay) and return the first to produce a chunk."""
+
+        async def start(candidate: LLMManager):
+            began = time.perf_counter()
+            stream = candidate.astream_response(prompt, bypass_cache=bypass_cache)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                self.stats[candidate.model_name].record(None, ok=False)
+                await stream.aclose()
+                raise
+            self.stats[candidate.model_name].record(time.perf_counter() - began, ok=True)
+            return stream, first
+
+        tasks = {asyncio.ensure_future(start(member))}
+        delay = self._hedge_delay(member)
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                LLM_HEDGES.inc(model=hedge_member.model_name)
+                tasks.add(asyncio.ensure_future(start(hedge_member)))
+
+        error, winner = None, None
+        try:
+            while tasks and winner is None:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and winner is None:
+                        winner = task.result()
+                    elif task.exception() is None:
+                        await task.result()[0].aclose()
+                    else:
+                        error = task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+        if winner is None:
+            raise error
+        return winner
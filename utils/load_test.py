@@ -0,0 +1,335 @@
+import csv
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import StringIO
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+from utils.constants import (
+    DEFAULT_LOAD_TEST_CONCURRENCY,
+    DEFAULT_LOAD_TEST_DURATION,
+    DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS,
+    DEFAULT_PER_HOST_LIMIT,
+    LOAD_TEST_PAYLOAD_SEED,
+)
+from utils.models import Endpoint
+from utils.payload_synth import compile_schema
+from utils.utils import HostLimiter, create_session, load_base_url, send_request
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+# "200", "200 OK" or "201 Created"; a leading three-digit code is all the load test needs
+_STATUS_CODE = re.compile(r"\s*(\d{3})\b")
+REPORT_FIELDS = [
+    "operation", "requests", "errors", "error_rate", "throughput_rps",
+    "p50_ms", "p90_ms", "p99_ms", "max_ms", "mean_ms",
+]
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies recorded at microsecond resolution.
+    Buckets are log-linear: every power of two is split into 64 linear sub-buckets, so any
+    recorded value is reported within ~1.6% while memory stays bounded by the value range.
+    """
+
+    SUB_BUCKET_BITS = 6
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _bucket(self, micros: int) -> int:
+        shift = max(0, micros.bit_length() - self.SUB_BUCKET_BITS - 1)
+        return (shift << (self.SUB_BUCKET_BITS + 1)) + (micros >> shift)
+
+    def _highest_equivalent(self, bucket: int) -> int:
+        shift = bucket >> (self.SUB_BUCKET_BITS + 1)
+        sub_bucket = bucket & ((1 << (self.SUB_BUCKET_BITS + 1)) - 1)
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        micros = max(0, int(seconds * 1_000_000))
+        bucket = self._bucket(micros)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += micros
+        self.max = max(self.max, micros)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> float:
+        """Latency in milliseconds at or below which `percentile` percent of values fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._highest_equivalent(bucket), self.max) / 1000
+        return self.max / 1000
+
+    def mean(self) -> float:
+        return self.total / self.count / 1000 if self.count else 0.0
+
+
+class _OperationStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+
+
+def operation_name(test_case: dict) -> str:
+    return test_case.get("Operation ID") or f"{test_case.get('Method', 'GET').upper()} {test_case.get('Endpoint', '')}"
+
+
+def expected_status(test_case: dict) -> Optional[int]:
+    """The case's expected status code (200 when absent), or None when it is not a status code."""
+    expected = test_case.get("Expected Status Code", 200)
+    if isinstance(expected, bool):
+        return None
+    if isinstance(expected, int):
+        return expected
+    match = _STATUS_CODE.match(expected) if isinstance(expected, str) else None
+    return int(match.group(1)) if match else None
+
+
+def happy_path_cases(test_cases: Iterable[dict]) -> List[dict]:
+    """
+    Keep the cases that expect a 2xx response; negative cases are not meaningful under load.
+    Cases whose expected status cannot be parsed are skipped.
+    """
+    cases = []
+    for test_case in test_cases:
+        status = expected_status(test_case)
+        if status is None:
+            logger.warning("Skipping load test case %r: unparseable expected status %r",
+                           test_case.get("Test Case Name"), test_case.get("Expected Status Code"))
+        elif 200 <= status < 300:
+            cases.append(test_case)
+    return cases
+
+
+def payload_variants(
+        test_cases: List[dict],
+        endpoints: List[Endpoint],
+        count: int = DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS,
+        seed: int = LOAD_TEST_PAYLOAD_SEED
+) -> List[Optional[List[Any]]]:
+    """
+    For each case, `count` request bodies synthesized in one batch from its operation's request
+    schema, or None when the operation has no body schema (or `count` < 2) and the case's own
+    body is replayed. Cases of the same operation share one batch.
+    """
+    schemas = {
+        (endpoint.method, endpoint.operation_id): endpoint.request_body.schema_data
+        for endpoint in endpoints if endpoint.request_body and endpoint.request_body.schema_data
+    }
+    batches = {}
+    variants = []
+    for test_case in test_cases:
+        key = (test_case.get("Method", "GET").upper(), test_case.get("Operation ID"))
+        if count < 2 or key not in schemas:
+            variants.append(None)
+            continue
+        if key not in batches:
+            batches[key] = compile_schema(schemas[key]).generate_many(count, seed)
+        variants.append(batches[key])
+    return variants
+
+
+def iter_load_test(
+        test_cases: List[dict],
+        duration_seconds: float = DEFAULT_LOAD_TEST_DURATION,
+        target_rps: Optional[float] = None,
+        concurrency: int = DEFAULT_LOAD_TEST_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        progress_interval: float = 1.0,
+        endpoints: Optional[List[Endpoint]] = None,
+        variants: int = DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS
+) -> Iterator[dict]:
+    """
+    Replay the happy-path test cases round-robin for `duration_seconds`.
+
+    With `target_rps` requests are sent on a fixed schedule (open loop) by up to `concurrency`
+    workers, and latency is measured from each request's scheduled start so a stalled server
+    is not hidden by the load generator backing off. Without it, `concurrency` workers send
+    back to back (closed loop). A request counts as an error when it raises or returns a
+    status other than the case's expected status code.
+
+    With the spec's `endpoints` and `variants` above 1, each case rotates through that many bodies
+    synthesized from its operation's request schema (see payload_variants) instead of resending
+    its own body.
+
+    Yields a progress record every `progress_interval` seconds and the report as the final
+    summary record. Closing the iterator early stops the workers.
+    """
+    cases = happy_path_cases(test_cases)
+    if not cases:
+        raise ValueError("No happy-path (2xx) test cases to replay.")
+
+    base_url = load_base_url()
+    concurrency = max(1, concurrency)
+    host_limiter = HostLimiter(max(per_host_limit, concurrency))
+    stats = {}  # type: Dict[str, _OperationStats]
+    lock = threading.Lock()
+    stop = threading.Event()
+    schedule = itertools.count()
+    bodies = payload_variants(cases, endpoints, variants) if endpoints else [None] * len(cases)
+    # Each case cycles through its own bodies, so a batch shared by several cases is not skipped through
+    next_case = itertools.cycle([
+        (case, expected_status(case), itertools.cycle(batch) if batch else None)
+        for case, batch in zip(cases, bodies)
+    ])
+    interval = 1.0 / target_rps if target_rps else 0.0
+
+    start = time.perf_counter()
+    deadline = start + duration_seconds
+
+    def worker(session: requests.Session) -> None:
+        while not stop.is_set():
+            with lock:
+                test_case, status, case_bodies = next(next_case)
+                body = next(case_bodies) if case_bodies else test_case.get("Request Body", {})
+                sequence = next(schedule)
+            scheduled = start + sequence * interval if interval else time.perf_counter()
+            if scheduled >= deadline:
+                return
+            delay = scheduled - time.perf_counter()
+            if delay > 0 and stop.wait(delay):
+                return
+
+            url = f"{base_url}{test_case.get('Endpoint', '')}"
+            method = test_case.get("Method", "GET").upper()
+            error = False
+            try:
+                with host_limiter.for_url(url):
+                    response = send_request(
+                        method, url, test_case.get("Headers", {}), body, session=session
+                    )
+                error = response.status_code != status
+            except Exception as e:
+                # Besides transport errors, a malformed case (headers, body or upload path) raises
+                # anything from TypeError to AttributeError; it counts as failed instead of ending the worker
+                logger.debug("Load test request %s %s failed: %s", method, url, e)
+                error = True
+            latency = time.perf_counter() - scheduled
+
+            with lock:
+                operation = stats.setdefault(operation_name(test_case), _OperationStats())
+                operation.requests += 1
+                operation.errors += error
+                operation.histogram.record(latency)
+
+    logger.info(
+        "Load test: %d cases for %ss at %s with %d workers",
+        len(cases), duration_seconds, f"{target_rps} rps" if target_rps else "max rate", concurrency
+    )
+    with create_session(host_limiter.limit) as session, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            pending = {executor.submit(worker, session) for _ in range(concurrency)}
+            while pending:
+                done, pending = wait(pending, timeout=progress_interval)
+                for future in done:
+                    future.result()
+                with lock:
+                    requests_sent = sum(operation.requests for operation in stats.values())
+                    errors = sum(operation.errors for operation in stats.values())
+                yield {
+                    "type": "progress",
+                    "elapsed_seconds": round(time.perf_counter() - start, 3),
+                    "requests": requests_sent,
+                    "errors": errors,
+                }
+        finally:
+            stop.set()
+    elapsed = time.perf_counter() - start
+
+    yield {
+        "type": "summary",
+        "config": {
+            "duration_seconds": duration_seconds,
+            "target_rps": target_rps,
+            "concurrency": concurrency,
+            "cases": len(cases),
+            "synthesized_cases": sum(1 for batch in bodies if batch),
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "summary": _summarize("TOTAL", _merge(stats.values()), elapsed),
+        "operations": [_summarize(name, operation, elapsed) for name, operation in sorted(stats.items())],
+    }
+
+
+def collect_load_test_report(records: Iterable[dict]) -> dict:
+    """The report carried by the summary record of iter_load_test."""
+    report = {}
+    for record in records:
+        if record["type"] == "summary":
+            report = {k: v for k, v in record.items() if k != "type"}
+    return report
+
+
+def run_load_test(
+        test_cases: List[dict],
+        duration_seconds: float = DEFAULT_LOAD_TEST_DURATION,
+        target_rps: Optional[float] = None,
+        concurrency: int = DEFAULT_LOAD_TEST_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        endpoints: Optional[List[Endpoint]] = None,
+        variants: int = DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS
+) -> dict:
+    """Run a load test to completion and return its report; see iter_load_test."""
+    return collect_load_test_report(iter_load_test(
+        test_cases, duration_seconds, target_rps, concurrency, per_host_limit, endpoints=endpoints, variants=variants
+    ))
+
+
+def _merge(operations: Iterable[_OperationStats]) -> _OperationStats:
+    total = _OperationStats()
+    for operation in operations:
+        total.requests += operation.requests
+        total.errors += operation.errors
+        total.histogram.merge(operation.histogram)
+    return total
+
+
+def _summarize(name: str, operation: _OperationStats, elapsed: float) -> dict:
+    histogram = operation.histogram
+    summary = {
+        "operation": name,
+        "requests": operation.requests,
+        "errors": operation.errors,
+        "error_rate": round(operation.errors / operation.requests, 4) if operation.requests else 0.0,
+        "throughput_rps": round(operation.requests / elapsed, 2) if elapsed else 0.0,
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_ms"] = round(histogram.percentile(percentile), 3)
+    summary["max_ms"] = round(histogram.max / 1000, 3)
+    summary["mean_ms"] = round(histogram.mean(), 3)
+    return summary
+
+
+def load_test_report_to_csv(report: dict) -> str:
+    """One row per operation followed by the TOTAL row."""
+    output = StringIO()
+    writer = csv.DictWriter(output, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    writer.writerows(report["operations"])
+    writer.writerow(report["summary"])
+    return output.getvalue()
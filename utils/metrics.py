@@ -0,0 +1,190 @@
+import abc
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from fast local calls up to slow LLM completions
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(abc.ABC):
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """The metric's sample lines in the text exposition format."""
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[position] += 1
+            self._series[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# LLM calls (LLMManager.generate_response / agenerate_response)
+LLM_LATENCY = REGISTRY.histogram("testrogue_llm_request_duration_seconds", "LLM completion latency.", ["model"])
+LLM_PROMPT_TOKENS = REGISTRY.histogram(
+    "testrogue_llm_prompt_tokens", "Prompt tokens per LLM call.", ["model"], TOKEN_BUCKETS)
+LLM_COMPLETION_TOKENS = REGISTRY.histogram(
+    "testrogue_llm_completion_tokens", "Completion tokens per LLM call.", ["model"], TOKEN_BUCKETS)
+LLM_ERRORS = REGISTRY.counter("testrogue_llm_errors_total", "Failed LLM calls.", ["model"])
+LLM_CACHE_LOOKUPS = REGISTRY.counter("testrogue_llm_cache_lookups_total", "LLM cache lookups.", ["model", "result"])
+LLM_IN_FLIGHT = REGISTRY.gauge("testrogue_llm_requests_in_flight", "LLM calls currently in flight.", ["model"])
+LLM_OUTPUT_PARSE = REGISTRY.counter(
+    "testrogue_llm_output_parse_total",
+    "LLM output JSON parses by result (direct, repaired, streamed, element_skipped or failed).",
+    ["model", "result"]
+)
+LLM_ROUTED = REGISTRY.counter("testrogue_llm_routed_total", "LLM pool calls by the model they were routed to.", ["model"])
+LLM_RETRIES = REGISTRY.counter("testrogue_llm_retries_total", "LLM pool retries by failed model and reason.", ["model", "reason"])
+LLM_HEDGES = REGISTRY.counter("testrogue_llm_hedges_total", "Hedged LLM pool calls by the model hedged to.", ["model"])
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "testrogue_log_records_dropped_total", "Log records dropped because the logging queue was full.")
+
+# Spec extraction (extract_endpoints_from_swagger)
+SPEC_FETCH_LATENCY = REGISTRY.histogram(
+    "testrogue_spec_fetch_duration_seconds", "Time to fetch or read a Swagger document.", ["source", "result"])
+SPEC_PARSE_LATENCY = REGISTRY.histogram("testrogue_spec_parse_duration_seconds", "Time to parse a Swagger document.")
+
+# Test execution (send_request)
+HTTP_LATENCY = REGISTRY.histogram(
+    "testrogue_http_request_duration_seconds", "Latency of test case requests.", ["host", "method"])
+HTTP_RESPONSES = REGISTRY.counter("testrogue_http_responses_total", "Test case responses by status code.", ["host", "status"])
+HTTP_ERRORS = REGISTRY.counter("testrogue_http_errors_total", "Test case requests that raised.", ["host", "error"])
+HTTP_IN_FLIGHT = REGISTRY.gauge("testrogue_http_requests_in_flight", "Test case requests currently in flight.", ["host"])
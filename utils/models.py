@@ -43,6 +43,8 @@ class Endpoint(BaseModel):
     request_body: Optional[RequestBody] = RequestBody()
     responses: Dict[str, Response] = {}
     security: Optional[List[Dict[str, Any]]] = []
+    security_schemes: Dict[str, Dict[str, Any]] = {}  # securityDefinitions entries named in `security`
+    fingerprint: Optional[str] = ""  # structural hash, see utils.spec_diff.compute_fingerprint
 
 
 class ExtractedSwagger(BaseModel):
@@ -50,6 +52,14 @@ class ExtractedSwagger(BaseModel):
     definitions: Dict[str, Any] = {}
 
 
+class SpecDiff(BaseModel):
+    """Operations (keyed as "METHOD path") that differ between two versions of a spec."""
+    added: List[str] = []
+    removed: List[str] = []
+    changed: List[str] = []
+    unchanged: List[str] = []
+
+
 class TestCase(BaseModel):
     Test_Case_Name: str = Field(..., alias="Test Case Name")
     Description: str
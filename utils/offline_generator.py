@@ -0,0 +1,239 @@
+import base64
+import copy
+import logging
+import random
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote, urlencode
+
+from utils.constants import OFFLINE_GENERATOR_SEED
+from utils.models import Endpoint, Parameter
+from utils.payload_synth import PayloadSynthesizer, compile_schema
+
+logger = logging.getLogger(__name__)
+
+# Negative cases generated per rule and endpoint, so wide schemas do not explode the suite
+MAX_CASES_PER_RULE = 3
+INVALID_ENUM_VALUE = "INVALID_ENUM_VALUE"
+WRONG_TYPE_VALUES = {"integer": "not-a-number", "number": "not-a-number", "boolean": "not-a-boolean"}
+# Placeholder credentials; the cases only need the request to carry them where the scheme expects
+API_KEY_PLACEHOLDER = "test-api-key"
+BEARER_TOKEN_PLACEHOLDER = "test-token"
+BASIC_CREDENTIALS_PLACEHOLDER = "test-user:test-password"
+
+
+def parameter_schema(param: Parameter) -> dict:
+    """The schema of a non-body parameter, built from its Swagger 2.0 type fields."""
+    schema = {"type": param.type or "string", "format": param.format, "enum": param.enum, "items": param.items}
+    return {key: value for key, value in schema.items() if value}
+
+
+def success_status(endpoint: Endpoint) -> int:
+    codes = sorted(int(code) for code in endpoint.responses if code.isdigit() and code.startswith("2"))
+    return codes[0] if codes else 200
+
+
+def credentials(endpoint: Endpoint) -> List[Tuple[str, str, str]]:
+    """
+    The (location, name, value) credentials satisfying the endpoint's first security requirement,
+    from the securityDefinitions it names. A scheme without a definition is sent as a bearer token.
+    """
+    if not endpoint.security:
+        return []
+    sent = []
+    for name in endpoint.security[0]:
+        scheme = endpoint.security_schemes.get(name, {})
+        if scheme.get("type") == "apiKey":
+            location = "query" if scheme.get("in") == "query" else "header"
+            sent.append((location, scheme.get("name") or name, API_KEY_PLACEHOLDER))
+        elif scheme.get("type") == "basic":
+            token = base64.b64encode(BASIC_CREDENTIALS_PLACEHOLDER.encode()).decode()
+            sent.append(("header", "Authorization", f"Basic {token}"))
+        else:
+            sent.append(("header", "Authorization", f"Bearer {BEARER_TOKEN_PLACEHOLDER}"))
+    return sent
+
+
+def client_error_status(endpoint: Endpoint) -> int:
+    """The documented status for invalid input: 400 or 422 when declared, else any other 4xx, else 400."""
+    declared = [code for code in endpoint.responses if code.isdigit() and code.startswith("4")]
+    for code in ("400", "422"):
+        if code in declared:
+            return int(code)
+    other = sorted(code for code in declared if code not in ("401", "403", "404"))
+    return int(other[0]) if other else 400
+
+
+class _Request:
+    """The parts of one request; test cases are derived from a valid request by changing one part."""
+
+    def __init__(self, endpoint: Endpoint, rnd: random.Random):
+        self.path_params, self.query, self.headers = {}, {}, {}
+        for param in endpoint.parameters:
+            if param.in_ not in ("path", "query", "header") or (param.in_ != "path" and not param.required):
+                continue
+            # Built per call, so compiled directly rather than filling the compile_schema cache
+            value = PayloadSynthesizer(parameter_schema(param)).generate(rnd)
+            if param.in_ == "path":
+                self.path_params[param.name] = value
+            elif param.in_ == "query":
+                self.query[param.name] = value
+            else:
+                self.headers[param.name] = str(value)
+        self.credentials = credentials(endpoint)
+        for location, name, value in self.credentials:
+            (self.query if location == "query" else self.headers)[name] = value
+
+        schema = (endpoint.request_body.schema_data if endpoint.request_body else None) or {}
+        self.body_schema = schema
+        self.body = {}  # type: Any
+        if "properties" in schema or (schema.get("type") == "array" and "properties" in schema.get("items", {})):
+            self.body = compile_schema(schema).generate(rnd)
+
+    def copy(self) -> "_Request":
+        clone = copy.copy(self)
+        clone.path_params, clone.query, clone.headers = dict(self.path_params), dict(self.query), dict(self.headers)
+        clone.body = copy.deepcopy(self.body)
+        return clone
+
+    def without_credentials(self) -> "_Request":
+        clone = self.copy()
+        for location, name, _ in self.credentials:
+            (clone.query if location == "query" else clone.headers).pop(name, None)
+        return clone
+
+    def url(self, path: str) -> str:
+        for name, value in self.path_params.items():
+            path = path.replace("{%s}" % name, quote(str(value), safe=""))
+        if self.query:
+            path += "?" + urlencode(self.query, doseq=True)
+        return path
+
+
+def _body_properties(request: _Request) -> Tuple[Dict[str, Any], List[str]]:
+    schema = request.body_schema
+    if schema.get("type") == "array":
+        schema = schema.get("items", {})
+    return schema.get("properties", {}), list(schema.get("required", []))
+
+
+def _body_fields(request: _Request) -> Dict[str, Any]:
+    # Negative body cases edit the first element when the body is an array of objects
+    if isinstance(request.body, list):
+        return request.body[0] if request.body else {}
+    return request.body
+
+
+def _boundary_violations(prop: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    violations = []
+    if prop.get("type") in ("integer", "number"):
+        if "minimum" in prop:
+            violations.append((f"below minimum {prop['minimum']}", prop["minimum"] - 1))
+        if "maximum" in prop:
+            violations.append((f"above maximum {prop['maximum']}", prop["maximum"] + 1))
+    elif prop.get("type") == "string":
+        if prop.get("minLength"):
+            violations.append((f"shorter than minLength {prop['minLength']}", ""))
+        if "maxLength" in prop:
+            violations.append((f"longer than maxLength {prop['maxLength']}", "x" * (prop["maxLength"] + 1)))
+    return violations
+
+
+def generate_offline_test_cases(endpoint: Endpoint, max_cases_per_rule: int = MAX_CASES_PER_RULE) -> List[dict]:
+    """
+    Derive deterministic test cases for an endpoint from its parameters and resolved request schema:
+    a happy path, then one-change-each negative cases (missing required parameters and fields,
+    wrong types, enum violations, boundary values, empty body, missing credentials).
+    Every case but "missing credentials" carries the credentials the endpoint's security requires.
+    The output uses the TestCase aliases, like validated LLM output.
+    """
+    valid = _Request(endpoint, random.Random(OFFLINE_GENERATOR_SEED))
+    label = endpoint.operation_id or f"{endpoint.method} {endpoint.path}"
+    invalid_status = client_error_status(endpoint)
+    cases = []
+
+    def add(name: str, description: str, request: _Request, expected: int) -> None:
+        cases.append({
+            "Test Case Name": f"{label}: {name}",
+            "Description": description,
+            "Endpoint": request.url(endpoint.path),
+            "Method": endpoint.method,
+            "Operation ID": endpoint.operation_id,
+            "Summary": endpoint.summary or "",
+            "Request Body": request.body,
+            "Expected Status Code": expected,
+            "Headers": request.headers,
+        })
+
+    add("happy path", "Valid request with all required parameters and a schema-conformant body.",
+        valid, success_status(endpoint))
+
+    params = {p.in_: [] for p in endpoint.parameters}
+    for param in endpoint.parameters:
+        params[param.in_].append(param)
+
+    for param in [p for p in params.get("query", []) if p.required][:max_cases_per_rule]:
+        request = valid.copy()
+        request.query.pop(param.name, None)
+        add(f"missing required query parameter '{param.name}'", f"Omits the required query parameter {param.name}.",
+            request, invalid_status)
+
+    for param in [p for p in params.get("header", []) if p.required][:max_cases_per_rule]:
+        request = valid.copy()
+        request.headers.pop(param.name, None)
+        add(f"missing required header '{param.name}'", f"Omits the required header {param.name}.",
+            request, invalid_status)
+
+    typed = [p for p in params.get("path", []) + params.get("query", []) if p.type in WRONG_TYPE_VALUES]
+    for param in typed[:max_cases_per_rule]:
+        request = valid.copy()
+        target = request.path_params if param.in_ == "path" else request.query
+        target[param.name] = WRONG_TYPE_VALUES[param.type]
+        add(f"wrong type for {param.in_} parameter '{param.name}'",
+            f"Sends a non-{param.type} value for the {param.type} {param.in_} parameter {param.name}.",
+            request, invalid_status)
+
+    enums = [p for p in params.get("path", []) + params.get("query", []) if p.enum]
+    for param in enums[:max_cases_per_rule]:
+        request = valid.copy()
+        target = request.path_params if param.in_ == "path" else request.query
+        target[param.name] = INVALID_ENUM_VALUE
+        add(f"invalid enum value for '{param.name}'", f"Sends a value outside {param.enum} for {param.name}.",
+            request, invalid_status)
+
+    properties, required = _body_properties(valid)
+    if endpoint.method in ("POST", "PUT", "PATCH") and properties:
+        if required or (endpoint.request_body and endpoint.request_body.required):
+            request = valid.copy()
+            request.body = {}
+            add("empty request body", "Sends an empty body where a body with required fields is expected.",
+                request, invalid_status)
+
+        for name in [n for n in required if n in _body_fields(valid)][:max_cases_per_rule]:
+            request = valid.copy()
+            _body_fields(request).pop(name)
+            add(f"missing required field '{name}'", f"Omits the required body field {name}.", request, invalid_status)
+
+        wrong_type = [(n, p) for n, p in properties.items() if p.get("type") in WRONG_TYPE_VALUES]
+        for name, prop in wrong_type[:max_cases_per_rule]:
+            request = valid.copy()
+            _body_fields(request)[name] = WRONG_TYPE_VALUES[prop["type"]]
+            add(f"wrong type for field '{name}'", f"Sends a non-{prop['type']} value for the body field {name}.",
+                request, invalid_status)
+
+        enum_fields = [(n, p) for n, p in properties.items() if p.get("enum")]
+        for name, prop in enum_fields[:max_cases_per_rule]:
+            request = valid.copy()
+            _body_fields(request)[name] = INVALID_ENUM_VALUE
+            add(f"invalid enum value for field '{name}'", f"Sends a value outside {prop['enum']} for {name}.",
+                request, invalid_status)
+
+        boundaries = [(n, v) for n, p in properties.items() for v in _boundary_violations(p)]
+        for name, (violation, value) in boundaries[:max_cases_per_rule]:
+            request = valid.copy()
+            _body_fields(request)[name] = value
+            add(f"field '{name}' {violation}", f"Sends {name} {violation}.", request, invalid_status)
+
+    if endpoint.security:
+        add("missing credentials", "Sends the valid request without any credentials.", valid.without_credentials(), 401)
+
+    return cases
@@ -0,0 +1,294 @@
+import base64
+import copy
+import datetime
+import logging
+import random
+import string
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from faker.providers.lorem.en_US import Provider as LoremProvider
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# A compiled generator turns a random source into one value for its schema
+Generator = Callable[[random.Random], Any]
+
+# Placeholder sent for binary uploads; execution treats file-like paths as multipart files
+BINARY_PLACEHOLDER = "/path/to/cat.jpg"
+DEFAULT_INTEGER_RANGE = (1, 9999)
+DEFAULT_NUMBER_RANGE = (0.0, 1000.0)
+# Extra repetitions allowed for open-ended regex quantifiers (`*`, `+`, `{n,}`)
+MAX_PATTERN_REPEAT = 3
+MAX_SCHEMA_DEPTH = 16
+# Compiled synthesizers kept by compile_schema, least recently used evicted first
+MAX_COMPILED_SCHEMAS = 1024
+
+_WORDS = tuple(LoremProvider.word_list)
+_EPOCH = datetime.datetime(2020, 1, 1)
+_PRINTABLE = string.ascii_letters + string.digits + "_-."
+_CATEGORIES = {
+    sre_parse.CATEGORY_DIGIT: string.digits,
+    sre_parse.CATEGORY_NOT_DIGIT: string.ascii_letters + "_-",
+    sre_parse.CATEGORY_WORD: string.ascii_letters + string.digits + "_",
+    sre_parse.CATEGORY_NOT_WORD: " -.",
+    sre_parse.CATEGORY_SPACE: " ",
+    sre_parse.CATEGORY_NOT_SPACE: string.ascii_letters + string.digits,
+}
+
+
+def _constant(value: Any) -> Generator:
+    if isinstance(value, (dict, list)):
+        return lambda rnd: copy.deepcopy(value)
+    return lambda rnd: value
+
+
+def _word(rnd: random.Random) -> str:
+    return rnd.choice(_WORDS)
+
+
+def _datetime(rnd: random.Random) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(seconds=rnd.randrange(10 * 365 * 86400))
+
+
+STRING_FORMATS = {
+    "date": lambda rnd: _datetime(rnd).date().isoformat(),
+    "date-time": lambda rnd: _datetime(rnd).isoformat() + "Z",
+    "email": lambda rnd: f"{_word(rnd)}.{_word(rnd)}@example.com",
+    "uuid": lambda rnd: str(uuid.UUID(int=rnd.getrandbits(128), version=4)),
+    "uri": lambda rnd: f"https://example.com/{_word(rnd)}",
+    "url": lambda rnd: f"https://example.com/{_word(rnd)}",
+    "hostname": lambda rnd: f"{_word(rnd)}.example.com",
+    "ipv4": lambda rnd: ".".join(str(rnd.randint(1, 254)) for _ in range(4)),
+    "ipv6": lambda rnd: ":".join("%x" % rnd.getrandbits(16) for _ in range(8)),
+    "byte": lambda rnd: base64.b64encode(_word(rnd).encode()).decode(),
+    "binary": _constant(BINARY_PLACEHOLDER),
+    "password": lambda rnd: f"{_word(rnd).capitalize()}{rnd.randint(100, 999)}!",
+}
+
+
+def _compile_pattern(pattern: str) -> Generator:
+    """Compile a regex into a generator of matching strings, using the stdlib regex parser."""
+    return _compile_regex_nodes(sre_parse.parse(pattern))
+
+
+def _compile_regex_nodes(nodes) -> Generator:
+    parts = [_compile_regex_node(op, value) for op, value in nodes]
+    return lambda rnd: "".join(part(rnd) for part in parts)
+
+
+def _compile_regex_node(op, value) -> Generator:
+    if op == sre_parse.LITERAL:
+        return _constant(chr(value))
+    if op == sre_parse.NOT_LITERAL:
+        alphabet = _PRINTABLE.replace(chr(value), "")
+        return lambda rnd: rnd.choice(alphabet)
+    if op == sre_parse.ANY:
+        return lambda rnd: rnd.choice(_PRINTABLE)
+    if op == sre_parse.IN:
+        return _compile_regex_set(value)
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        low, high, nodes = value
+        if high == sre_parse.MAXREPEAT:
+            high = low + MAX_PATTERN_REPEAT
+        inner = _compile_regex_nodes(nodes)
+        return lambda rnd: "".join(inner(rnd) for _ in range(rnd.randint(low, high)))
+    if op == sre_parse.SUBPATTERN:
+        return _compile_regex_nodes(value[-1])
+    if op == sre_parse.BRANCH:
+        branches = [_compile_regex_nodes(branch) for branch in value[1]]
+        return lambda rnd: rnd.choice(branches)(rnd)
+    if op == sre_parse.AT:
+        return _constant("")
+    raise ValueError(f"unsupported regex construct {op}")
+
+
+def _compile_regex_set(items) -> Generator:
+    negate = False
+    chars = []
+    for op, value in items:
+        if op == sre_parse.NEGATE:
+            negate = True
+        elif op == sre_parse.LITERAL:
+            chars.append(chr(value))
+        elif op == sre_parse.RANGE:
+            chars.extend(chr(code) for code in range(value[0], value[1] + 1))
+        elif op == sre_parse.CATEGORY:
+            chars.extend(_CATEGORIES.get(value, ""))
+        else:
+            raise ValueError(f"unsupported regex set member {op}")
+    alphabet = "".join(c for c in _PRINTABLE if c not in chars) if negate else "".join(dict.fromkeys(chars))
+    if not alphabet:
+        raise ValueError("regex set matches no printable character")
+    return lambda rnd: rnd.choice(alphabet)
+
+
+def _compile_string(schema: dict) -> Generator:
+    if schema.get("format") in STRING_FORMATS:
+        return STRING_FORMATS[schema["format"]]
+
+    if schema.get("pattern"):
+        try:
+            return _compile_pattern(schema["pattern"])
+        except (ValueError, TypeError, IndexError, sre_parse.error) as e:
+            logger.warning("Cannot generate strings for pattern %r (%s); using words", schema["pattern"], e)
+
+    min_length = schema.get("minLength") or 0
+    max_length = schema.get("maxLength")
+
+    def generate(rnd: random.Random) -> str:
+        text = _word(rnd)
+        while len(text) < min_length:
+            text += _word(rnd)
+        return text[:max_length] if max_length is not None else text
+
+    return generate
+
+
+def _bounds(schema: dict, default: tuple, step: float) -> tuple:
+    low, high = schema.get("minimum"), schema.get("maximum")
+    if low is not None and schema.get("exclusiveMinimum") is True:
+        low += step
+    if high is not None and schema.get("exclusiveMaximum") is True:
+        high -= step
+    if low is None and high is None:
+        return default
+    if low is None:
+        low = min(default[0], high)
+    if high is None:
+        high = max(default[1], low)
+    return low, high
+
+
+def _compile_integer(schema: dict) -> Generator:
+    low, high = _bounds(schema, DEFAULT_INTEGER_RANGE, 1)
+    low, high = int(low), int(high)
+    multiple = schema.get("multipleOf")
+    if multiple:
+        multiple = int(multiple)
+        first, last = -(-low // multiple), high // multiple
+        return lambda rnd: rnd.randint(first, max(first, last)) * multiple
+    return lambda rnd: rnd.randint(low, max(low, high))
+
+
+def _compile_number(schema: dict) -> Generator:
+    low, high = _bounds(schema, DEFAULT_NUMBER_RANGE, 0.01)
+    multiple = schema.get("multipleOf")
+    if multiple:
+        first, last = int(-(-low // multiple)), int(high // multiple)
+        return lambda rnd: round(rnd.randint(first, max(first, last)) * multiple, 10)
+    return lambda rnd: round(rnd.uniform(low, high), 2)
+
+
+def _compile_array(schema: dict, depth: int) -> Generator:
+    item = _compile(schema.get("items") or {"type": "string"}, depth + 1)
+    count = max(schema.get("minItems") or 1, 1)
+    if schema.get("maxItems") is not None:
+        count = min(count, schema["maxItems"])
+    return lambda rnd: [item(rnd) for _ in range(count)]
+
+
+def _compile_object(schema: dict, depth: int) -> Generator:
+    properties = [(name, _compile(prop, depth + 1)) for name, prop in (schema.get("properties") or {}).items()]
+    return lambda rnd: {name: generate(rnd) for name, generate in properties}
+
+
+def _schema_type(schema: dict) -> Optional[str]:
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):  # OpenAPI 3.1 style ["string", "null"]
+        schema_type = next((t for t in schema_type if t != "null"), None)
+    if schema_type:
+        return schema_type
+    if "properties" in schema:
+        return "object"
+    if "items" in schema:
+        return "array"
+    return None
+
+
+def _compile(schema: Any, depth: int = 0) -> Generator:
+    if not isinstance(schema, dict):
+        return _constant(None)
+    if schema.get("enum"):
+        return _constant(schema["enum"][0])
+    for key in ("example", "default"):
+        if key in schema:
+            return _constant(schema[key])
+    for key in ("oneOf", "anyOf"):
+        if schema.get(key):
+            return _compile(schema[key][0], depth)
+
+    schema_type = _schema_type(schema)
+    if depth >= MAX_SCHEMA_DEPTH or "x-circular-ref" in schema:
+        # Recursive models stop at an empty container instead of expanding forever
+        return _constant({} if schema_type == "object" else [] if schema_type == "array" else None)
+
+    if schema_type == "string":
+        return _compile_string(schema)
+    if schema_type == "file":
+        return _constant(BINARY_PLACEHOLDER)
+    if schema_type == "integer":
+        return _compile_integer(schema)
+    if schema_type == "number":
+        return _compile_number(schema)
+    if schema_type == "boolean":
+        return lambda rnd: rnd.random() < 0.5
+    if schema_type == "array":
+        return _compile_array(schema, depth)
+    if schema_type == "object":
+        return _compile_object(schema, depth)
+    return _constant(None)
+
+
+class PayloadSynthesizer:
+    """
+    A resolved schema compiled once into a generator of sample values.
+
+    The schema is walked only at compile time; generating a payload just calls the compiled
+    closures with a `random.Random`, so the same seed always yields the same payloads.
+    Covers string formats, patterns, length and numeric bounds, multipleOf, enums, examples,
+    booleans, nested objects and (nested) arrays. Schemas must already have their `$ref`s resolved.
+    """
+
+    def __init__(self, schema: dict):
+        self.schema = schema
+        self._generate = _compile(schema)
+
+    def generate(self, rnd: Optional[random.Random] = None, seed: int = 0) -> Any:
+        return self._generate(rnd or random.Random(seed))
+
+    def generate_many(self, count: int, seed: int = 0) -> List[Any]:
+        """`count` payloads from one seeded random source, so each differs but the batch is reproducible."""
+        rnd = random.Random(seed)
+        return [self._generate(rnd) for _ in range(count)]
+
+
+# id(schema) -> (schema, synthesizer); holding the schema keeps its id from being reused
+_compiled = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def compile_schema(schema: Dict[str, Any]) -> PayloadSynthesizer:
+    """
+    The synthesizer for `schema`, compiled once per schema object. Resolved schemas are shared
+    and never modified, so their identity is the cache key; do not mutate a schema once compiled.
+    """
+    key = id(schema)
+    with _compiled_lock:
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key][1]
+
+    synthesizer = PayloadSynthesizer(schema)
+    with _compiled_lock:
+        _compiled[key] = (schema, synthesizer)
+        if len(_compiled) > MAX_COMPILED_SCHEMAS:
+            _compiled.popitem(last=False)
+    return synthesizer
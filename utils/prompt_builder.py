@@ -0,0 +1,431 @@
+import json
+import logging
+import textwrap
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from langchain.prompts import PromptTemplate
+
+from utils.constants import (
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_PROMPT_TOKENS,
+    DEFAULT_MAX_SCHEMA_DEPTH,
+    DEFAULT_MODEL,
+    PROMPT_EXAMPLE_SEED,
+)
+from utils.models import Endpoint
+from utils.payload_synth import compile_schema
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Dedented so the template's source indentation is not paid for in tokens on every call
+TEST_CASE_PROMPT = PromptTemplate.from_template(textwrap.dedent("""
+        You are an expert API tester. For the following API endpoint, generate multiple test cases:
+        - Happy path (valid inputs)
+        - Missing or invalid required parameters
+        - Security and authorization checks **only if** the endpoint requires authentication (see Security Requirements section below). Skip these tests if `Security Requirements` is empty. include auth related testcase only if the security requirement section have auth keys
+        - Edge cases (boundary values, empty input, etc.)
+        
+        Use the parameters and request body schema exactly as provided below. If the request body schema includes `properties`, construct valid request bodies using only those properties. 
+        Do not add fields not present in the schema. 
+
+        Authorization headers should **only** be included in test cases if `Security Requirements` is non-empty.
+ 
+        Refer to the example Request Body for constructing valid and edge case inputs.
+        If no request body is present or required, leave it empty `{{}}` but still include the field in the test case.
+        
+        
+        Always follow the structure below **exactly** for each test case:
+        Test Case ID: <number>
+        Test Case Name: <clear title>
+        Description: <purpose of the test>
+        Endpoint: {endpoint_path}
+        Method: {method}
+        Operation ID: {operation_id}
+        Summary: {summary}
+        Request Body:
+        {request_body}
+        Expected Status Code: <code>
+        Headers:
+        {headers}
+        
+        --- Endpoint Metadata ---
+        Parameters:
+        {parameters}
+        
+        Request Body Schema:
+        {request_schema}
+        
+        Response Codes:
+        {responses}
+        
+        Security Requirements:
+        {security}
+        
+        Generate at least 5 test cases using this data.
+        Do NOT invent fields outside the provided metadata.
+        
+        Generate test cases in valid JSON format only. Escape all quotes properly. Avoid programming expressions (like .repeat()) and keep long strings under 100 characters. 
+        Do NOT include:
+        - Markdown formatting (no triple backticks)
+        - Explanatory text
+        - Comments
+        
+        Your output must look like:
+        
+        [
+          {{
+            "Test Case ID": 1,
+            "Test Case Name": "Descriptive name",
+            "Description": "Purpose of the test",
+            "Endpoint": "/example",
+            "Method": "POST",
+            "Operation ID": "addExample",
+            "Summary": "Brief summary from spec",
+            "Request Body": {{"field": "value" }},
+            "Expected Status Code": 200,
+            "Headers": {{}}
+          }}
+        ]
+
+""").strip())
+
+# Shares the instructions of TEST_CASE_PROMPT once across several small endpoints
+BATCH_TEST_CASE_PROMPT = PromptTemplate.from_template(textwrap.dedent("""
+    You are an expert API tester. For EACH API endpoint listed below, generate multiple test cases:
+    - Happy path (valid inputs)
+    - Missing or invalid required parameters
+    - Security and authorization checks **only if** the endpoint's Security Requirements are non-empty. Include auth related test cases only if the security requirement section has auth keys
+    - Edge cases (boundary values, empty input, etc.)
+
+    Use each endpoint's parameters and request body schema exactly as provided. If a request body schema includes `properties`, construct valid request bodies using only those properties.
+    Do not add fields not present in the schema.
+    Authorization headers should **only** be included in test cases if `Security Requirements` is non-empty.
+    Refer to the example Request Body for constructing valid and edge case inputs.
+    If no request body is present or required, leave it empty `{{}}` but still include the field in the test case.
+
+    --- Endpoints ---
+    {endpoints}
+
+    Generate at least 5 test cases per endpoint using this data.
+    Do NOT invent fields outside the provided metadata.
+
+    Generate valid JSON only. Escape all quotes properly. Avoid programming expressions (like .repeat()) and keep long strings under 100 characters.
+    Do NOT include:
+    - Markdown formatting (no triple backticks)
+    - Explanatory text
+    - Comments
+
+    Your output must be one JSON object whose keys are the Operation IDs above and whose values are arrays of test cases:
+
+    {{
+      "addExample": [
+        {{
+          "Test Case ID": 1,
+          "Test Case Name": "Descriptive name",
+          "Description": "Purpose of the test",
+          "Endpoint": "/example",
+          "Method": "POST",
+          "Operation ID": "addExample",
+          "Summary": "Brief summary from spec",
+          "Request Body": {{"field": "value" }},
+          "Expected Status Code": 200,
+          "Headers": {{}}
+        }}
+      ]
+    }}
+""").strip())
+
+ENDPOINT_BLOCK = textwrap.dedent("""
+    ### Operation ID: {operation_id}
+    Endpoint: {endpoint_path}
+    Method: {method}
+    Summary: {summary}
+    Example Request Body: {request_body}
+    Parameters: {parameters}
+    Request Body Schema: {request_schema}
+    Response Codes: {responses}
+    Security Requirements: {security}
+""").strip()
+
+# Output size assumed until completions have been measured: a pretty-printed test case is roughly
+# 120 tokens, and the prompts ask for at least 5 test cases per endpoint
+DEFAULT_TOKENS_PER_TEST_CASE = 120
+MIN_TEST_CASES_PER_ENDPOINT = 5
+
+# Schema keywords the model needs to build valid and invalid inputs; titles, xml hints, etc. are dropped
+SCHEMA_KEYS = (
+    "type", "format", "enum", "required", "properties", "items", "additionalProperties",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "minLength", "maxLength",
+    "pattern", "minItems", "maxItems", "default", "example", "x-circular-ref",
+)
+
+PARAMETER_KEYS = ("name", "in", "required", "type", "format", "enum", "items", "description")
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model_name: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # Encodings are downloaded on first use and may be unavailable offline
+        logger.warning("Token counting falls back to an estimate, tiktoken unavailable: %s", e)
+        return None
+
+
+def count_tokens(text: str, model_name: str = DEFAULT_MODEL) -> int:
+    """Count tokens with the model's tokenizer, or estimate them at ~4 characters per token."""
+    encoding = _encoding_for(model_name)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def prune_schema(schema: Any, max_depth: int, depth: int = 0) -> Any:
+    """Keep only SCHEMA_KEYS, drop empty values and collapse nesting beyond `max_depth`."""
+    if not isinstance(schema, dict):
+        return schema
+
+    if depth >= max_depth and ("properties" in schema or "items" in schema):
+        return {"type": schema.get("type", "object"), "x-truncated": True}
+
+    pruned = {}
+    for key in SCHEMA_KEYS:
+        value = schema.get(key)
+        if is_empty(value):
+            continue
+        if key == "properties" and isinstance(value, dict):
+            value = {name: prune_schema(prop, max_depth, depth + 1) for name, prop in value.items()}
+        elif key in ("items", "additionalProperties") and isinstance(value, dict):
+            value = prune_schema(value, max_depth, depth + 1)
+        pruned[key] = value
+    return pruned
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    baseline_tokens: Optional[int] = None  # tokens the legacy indented metadata would have used
+
+    @property
+    def tokens_saved(self) -> Optional[int]:
+        if self.baseline_tokens is None:
+            return None
+        return self.baseline_tokens - self.tokens
+
+
+class PromptBuilder:
+    """
+    Renders TEST_CASE_PROMPT from compact, pruned endpoint metadata.
+    Schemas are collapsed to shallower depths, and response schemas finally dropped,
+    until the prompt fits `max_prompt_tokens`.
+
+    With a `batch_token_budget`, small endpoints are packed into shared BATCH_TEST_CASE_PROMPT
+    requests of up to `max_batch_size` endpoints; see plan_batches. Batch sizes follow the output
+    size measured by record_output on earlier completions.
+
+    `report_savings` also renders and counts the uncompacted metadata to report tokens_saved on each
+    prompt; it doubles the tokenizer work, so it is meant for diagnostics and benchmarks.
+    """
+
+    def __init__(
+            self,
+            model_name: str = DEFAULT_MODEL,
+            max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
+            max_schema_depth: int = DEFAULT_MAX_SCHEMA_DEPTH,
+            report_savings: bool = False,
+            batch_token_budget: Optional[int] = None,
+            max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ):
+        self.model_name = model_name
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_schema_depth = max(1, max_schema_depth)
+        self.report_savings = report_savings
+        self.batch_token_budget = batch_token_budget
+        self.max_batch_size = max_batch_size
+        self._output = [0, 0, 0]  # completion tokens, test cases and endpoints measured so far
+        self._output_lock = threading.Lock()
+
+    def build(self, endpoint: Endpoint) -> BuiltPrompt:
+        request_schema = (endpoint.request_body.schema_data or {}) if endpoint.request_body else {}
+        request_body_prompt = self._example_body(endpoint, request_schema)
+
+        text, tokens, metadata = "", 0, {}
+        attempts = [(depth, True) for depth in range(self.max_schema_depth, 0, -1)] + [(1, False)]
+        for depth, include_response_schemas in attempts:
+            metadata = self._metadata(endpoint, request_schema, depth, include_response_schemas)
+            text = TEST_CASE_PROMPT.format(
+                endpoint_path=endpoint.path,
+                method=endpoint.method,
+                operation_id=endpoint.operation_id,
+                summary=endpoint.summary,
+                request_body=request_body_prompt,
+                headers="{}",
+                **metadata
+            )
+            tokens = count_tokens(text, self.model_name)
+            if tokens <= self.max_prompt_tokens:
+                break
+        else:
+            logger.warning(
+                "Prompt for %s %s is %d tokens, over the %d token budget even after truncation",
+                endpoint.method, endpoint.path, tokens, self.max_prompt_tokens
+            )
+
+        built = BuiltPrompt(text=text, tokens=tokens)
+        if self.report_savings:
+            compact_tokens = count_tokens("\n".join(metadata.values()), self.model_name)
+            legacy_tokens = count_tokens(self._legacy_metadata(endpoint, request_schema), self.model_name)
+            built.baseline_tokens = tokens - compact_tokens + legacy_tokens
+            logger.info(
+                "Prompt for %s %s: %d tokens (%d saved)",
+                endpoint.method, endpoint.path, built.tokens, built.tokens_saved
+            )
+        return built
+
+    def record_output(self, text: str, test_cases: int, endpoints: int = 1) -> None:
+        """Measure a completion that produced `test_cases` test cases for `endpoints` endpoints."""
+        if not self.batch_token_budget or test_cases <= 0:
+            return  # Only batch planning uses the measurements
+        tokens = count_tokens(text, self.model_name)
+        with self._output_lock:
+            self._output[0] += tokens
+            self._output[1] += test_cases
+            self._output[2] += endpoints
+
+    def expected_endpoint_tokens(self) -> float:
+        """Expected completion tokens for one endpoint's test cases, from the measured output so far."""
+        with self._output_lock:
+            tokens, test_cases, endpoints = self._output
+        if not test_cases:
+            return DEFAULT_TOKENS_PER_TEST_CASE * MIN_TEST_CASES_PER_ENDPOINT
+        return tokens / test_cases * max(MIN_TEST_CASES_PER_ENDPOINT, test_cases / endpoints)
+
+    def plan_batches(self, endpoints: List[Endpoint], completion_tokens: int) -> List[Tuple[List[int], Optional[BuiltPrompt]]]:
+        """
+        Group endpoint indices into LLM requests, preserving endpoint order.
+        Each group of two or more endpoints comes with its rendered batch prompt; single endpoints
+        come with None and are prompted individually. An endpoint is batched only if its metadata
+        fits in half of the budget left after the shared instructions, and batches are capped so
+        the expected output (see expected_endpoint_tokens) fits `completion_tokens`.
+        """
+        if not self.batch_token_budget or self.max_batch_size < 2:
+            return [([index], None) for index in range(len(endpoints))]
+
+        max_size = min(self.max_batch_size, max(1, int(completion_tokens // self.expected_endpoint_tokens())))
+        overhead = count_tokens(BATCH_TEST_CASE_PROMPT.format(endpoints=""), self.model_name)
+        room = self.batch_token_budget - overhead
+
+        plan = []
+        current, blocks, used = [], [], 0
+
+        def flush():
+            if len(current) == 1:
+                plan.append((list(current), None))
+            elif current:
+                text = BATCH_TEST_CASE_PROMPT.format(endpoints="\n\n".join(blocks))
+                plan.append((list(current), BuiltPrompt(text=text, tokens=overhead + used)))
+            current.clear()
+            blocks.clear()
+
+        for index, endpoint in enumerate(endpoints):
+            block = self._endpoint_block(endpoint)
+            tokens = count_tokens(block, self.model_name)
+            if tokens > room // 2:
+                flush()
+                used = 0
+                plan.append(([index], None))
+                continue
+
+            duplicate_id = any(endpoints[i].operation_id == endpoint.operation_id for i in current)
+            if len(current) >= max_size or used + tokens > room or duplicate_id:
+                flush()
+                used = 0
+            current.append(index)
+            blocks.append(block)
+            used += tokens
+
+        flush()
+        return plan
+
+    def _endpoint_block(self, endpoint: Endpoint) -> str:
+        request_schema = (endpoint.request_body.schema_data or {}) if endpoint.request_body else {}
+        return ENDPOINT_BLOCK.format(
+            operation_id=endpoint.operation_id,
+            endpoint_path=endpoint.path,
+            method=endpoint.method,
+            summary=endpoint.summary,
+            request_body=self._example_body(endpoint, request_schema),
+            **self._metadata(endpoint, request_schema, self.max_schema_depth, True)
+        )
+
+    def _metadata(self, endpoint: Endpoint, request_schema: dict, depth: int, include_response_schemas: bool) -> dict:
+        return {
+            "parameters": compact_json(self._parameters(endpoint, depth)),
+            "request_schema": compact_json(prune_schema(request_schema, depth)),
+            "responses": compact_json(self._responses(endpoint, depth, include_response_schemas)),
+            "security": compact_json(endpoint.security or []),
+        }
+
+    @staticmethod
+    def _parameters(endpoint: Endpoint, depth: int) -> list:
+        parameters = []
+        for param in endpoint.parameters:
+            dumped = param.model_dump(by_alias=True)
+            compact = {key: dumped[key] for key in PARAMETER_KEYS if not is_empty(dumped.get(key))}
+            # Body schemas are already rendered once as the request body schema
+            if param.in_ != "body" and not is_empty(param.schema_data):
+                compact["schema"] = prune_schema(param.schema_data, depth)
+            parameters.append(compact)
+        return parameters
+
+    @staticmethod
+    def _responses(endpoint: Endpoint, depth: int, include_schemas: bool) -> dict:
+        responses = {}
+        for code, response in endpoint.responses.items():
+            entry = {}
+            if response.description:
+                entry["description"] = response.description
+            if include_schemas and not is_empty(response.schema_data):
+                entry["schema"] = prune_schema(response.schema_data, depth)
+            responses[code] = entry
+        return responses
+
+    @staticmethod
+    def _example_body(endpoint: Endpoint, request_schema: dict) -> str:
+        if endpoint.method in ["POST", "PUT", "PATCH"] and request_schema:
+            if "properties" in request_schema:
+                # Seeded so the rendered prompt (and therefore its cache key) is stable across runs
+                return compact_json(compile_schema(request_schema).generate(seed=PROMPT_EXAMPLE_SEED))
+            return compact_json(prune_schema(request_schema, DEFAULT_MAX_SCHEMA_DEPTH))
+        return "{}"
+
+    @staticmethod
+    def _legacy_metadata(endpoint: Endpoint, request_schema: dict) -> str:
+        """The metadata as it was rendered before compaction, used only to report savings."""
+        return "\n".join([
+            json.dumps([param.model_dump(by_alias=True) for param in endpoint.parameters], indent=2),
+            json.dumps(request_schema, indent=2),
+            json.dumps({k: v.model_dump() for k, v in endpoint.responses.items()}, indent=2),
+            json.dumps(endpoint.security or [], indent=2),
+        ])
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `rate_per_minute / 60` tokens per second."""
+
+    def __init__(self, rate_per_minute: float):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.capacity = float(rate_per_minute)
+        self.fill_rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, amount: float, now: float) -> float:
+        """
+        Reserve `amount` tokens and return how long the caller must wait before using them.
+        The balance may go negative; later callers queue up behind the debt.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.fill_rate
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by LLM calls.
+    Thread-safe, so one instance can be used across event loops and worker threads.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._requests:
+                delay = max(delay, self._requests.take(1, now))
+            if self._tokens:
+                delay = max(delay, self._tokens.take(tokens, now))
+            return delay
+
+    async def acquire(self, tokens: int = 0) -> None:
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, tokens: int = 0) -> None:
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
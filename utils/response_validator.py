@@ -0,0 +1,190 @@
+import json
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.models import Endpoint
+from utils.spec_diff import OperationMatcher
+
+logger = logging.getLogger(__name__)
+
+# A compiled validator appends one {"path", "error"} entry per mismatch found under `path`
+Validator = Callable[[Any, str, List[dict]], None]
+
+# Mismatches reported per response; the rest are summarised in a final entry
+MAX_SCHEMA_ERRORS = 20
+
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+
+def _json_type(value: Any) -> str:
+    return "null" if value is None else _JSON_TYPES.get(type(value), type(value).__name__)
+
+
+def _error(path: str, message: str) -> dict:
+    return {"path": path, "error": message}
+
+
+def _compile(schema: Any) -> Optional[Validator]:
+    """Compile a resolved schema into a validator, or None when it constrains nothing."""
+    if not isinstance(schema, dict) or not schema:
+        return None
+
+    checks = []  # type: List[Validator]
+    schema_type = schema.get("type") or ("object" if "properties" in schema else "array" if "items" in schema else None)
+    nullable = schema.get("x-nullable") or schema.get("nullable")
+
+    if schema_type in _TYPE_CHECKS:
+        type_check = _TYPE_CHECKS[schema_type]
+
+        def check_type(value, path, errors):
+            if not type_check(value):
+                errors.append(_error(path, f"expected {schema_type}, got {_json_type(value)}"))
+                return False
+            return True
+    else:
+        def check_type(value, path, errors):
+            return True
+
+    if schema.get("enum"):
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(_error(path, f"{value!r} is not one of {allowed}"))
+        checks.append(check_enum)
+
+    if schema_type in ("integer", "number"):
+        low, high = schema.get("minimum"), schema.get("maximum")
+        exclusive_low, exclusive_high = schema.get("exclusiveMinimum") is True, schema.get("exclusiveMaximum") is True
+        if low is not None or high is not None:
+            def check_range(value, path, errors):
+                if low is not None and (value < low or (exclusive_low and value == low)):
+                    errors.append(_error(path, f"{value} is below the minimum {low}"))
+                if high is not None and (value > high or (exclusive_high and value == high)):
+                    errors.append(_error(path, f"{value} is above the maximum {high}"))
+            checks.append(check_range)
+
+    if schema_type == "string":
+        min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+        if min_length is not None or max_length is not None:
+            def check_length(value, path, errors):
+                if min_length is not None and len(value) < min_length:
+                    errors.append(_error(path, f"length {len(value)} is below minLength {min_length}"))
+                if max_length is not None and len(value) > max_length:
+                    errors.append(_error(path, f"length {len(value)} is above maxLength {max_length}"))
+            checks.append(check_length)
+        if schema.get("pattern"):
+            try:
+                pattern = re.compile(schema["pattern"])
+            except re.error as e:
+                logger.warning("Ignoring invalid response schema pattern %r: %s", schema["pattern"], e)
+            else:
+                def check_pattern(value, path, errors):
+                    if not pattern.search(value):
+                        errors.append(_error(path, f"{value!r} does not match {pattern.pattern!r}"))
+                checks.append(check_pattern)
+
+    if schema_type == "array":
+        item_validator = _compile(schema.get("items"))
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+
+        def check_items(value, path, errors):
+            if min_items is not None and len(value) < min_items:
+                errors.append(_error(path, f"{len(value)} items, fewer than minItems {min_items}"))
+            if max_items is not None and len(value) > max_items:
+                errors.append(_error(path, f"{len(value)} items, more than maxItems {max_items}"))
+            if item_validator is not None:
+                for index, item in enumerate(value):
+                    item_validator(item, f"{path}[{index}]", errors)
+                    if len(errors) > MAX_SCHEMA_ERRORS:
+                        return
+        checks.append(check_items)
+
+    if schema_type == "object":
+        required = list(schema.get("required") or [])
+        properties = [(name, _compile(prop)) for name, prop in (schema.get("properties") or {}).items()]
+        properties = [(name, validator) for name, validator in properties if validator is not None]
+        closed = schema.get("additionalProperties") is False
+        known = set((schema.get("properties") or {}).keys())
+
+        def check_object(value, path, errors):
+            for name in required:
+                if name not in value:
+                    errors.append(_error(f"{path}.{name}", "required property is missing"))
+            for name, validator in properties:
+                if name in value:
+                    validator(value[name], f"{path}.{name}", errors)
+            if closed:
+                for name in value.keys() - known:
+                    errors.append(_error(f"{path}.{name}", "property is not allowed by the schema"))
+        checks.append(check_object)
+
+    def validate(value, path, errors):
+        if value is None and nullable:
+            return
+        if check_type(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+
+    return validate
+
+
+class ResponseValidator:
+    """
+    Validates response bodies against the resolved response schemas of a spec's endpoints.
+
+    Test cases are matched to their operation by operation ID, falling back to the method and path
+    template. Schemas are compiled into validators the first time an (operation, status) pair is
+    seen and reused afterwards, so validation costs one JSON decode and a walk of the body.
+    """
+
+    def __init__(self, endpoints: List[Endpoint]):
+        self.matcher = OperationMatcher(endpoints)
+        self.endpoints = self.matcher.endpoints
+        self._validators = {}  # type: Dict[Tuple[str, str], Optional[Validator]]
+        self._lock = threading.Lock()
+
+    def _validator(self, key: str, status_code: int) -> Optional[Validator]:
+        cache_key = (key, str(status_code))
+        validator = self._validators.get(cache_key)
+        if validator is not None or cache_key in self._validators:
+            return validator
+
+        responses = self.endpoints[key].responses
+        response = responses.get(str(status_code)) or responses.get("default")
+        validator = _compile(response.schema_data) if response is not None else None
+        with self._lock:
+            self._validators[cache_key] = validator
+        return validator
+
+    def validate(self, test_case: dict, status_code: int, body: bytes) -> Optional[List[dict]]:
+        """
+        Mismatches between `body` and the schema documented for `status_code`, as a list of
+        {"path", "error"} entries ([] when the body conforms), or None when there is no schema to check.
+        """
+        key = self.matcher.operation_for(test_case)
+        validator = self._validator(key, status_code) if key else None
+        if validator is None:
+            return None
+
+        try:
+            value = json.loads(body) if body else None
+        except ValueError as e:
+            return [_error("$", f"response body is not valid JSON: {e}")]
+
+        errors = []
+        validator(value, "$", errors)
+        if len(errors) > MAX_SCHEMA_ERRORS:
+            errors = errors[:MAX_SCHEMA_ERRORS] + [_error("$", "further mismatches omitted")]
+        return errors
@@ -0,0 +1,226 @@
+import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import quote, urlsplit, urlunsplit
+
+import requests
+
+from utils.constants import DEFAULT_EXECUTION_WORKERS, DEFAULT_PER_HOST_LIMIT
+from utils.models import Endpoint
+from utils.response_validator import ResponseValidator
+from utils.spec_diff import OperationMatcher
+from utils.tracing import bind, span
+from utils.utils import HostLimiter, build_result, create_session, load_base_url, run_test_case
+
+logger = logging.getLogger(__name__)
+
+_PATH_PARAM = re.compile(r"\{([^}/]+)\}")
+
+# Order of the stages within a resource chain
+CREATE, USE, DELETE = 0, 1, 2
+
+
+def resource_of(path: str) -> str:
+    """The collection a path belongs to: everything before its first path parameter (/pet/{petId}/x -> /pet)."""
+    match = _PATH_PARAM.search(path)
+    collection = path[:match.start()] if match else path
+    return collection.rstrip("/") or "/"
+
+
+def stage_of(endpoint: Endpoint) -> int:
+    """Create on the collection first, then reads and updates, then deletes."""
+    method = endpoint.method.upper()
+    if method == "DELETE":
+        return DELETE
+    if method == "POST" and not _PATH_PARAM.search(endpoint.path):
+        return CREATE
+    return USE
+
+
+def _expects_success(test_case: dict) -> bool:
+    expected = test_case.get("Expected Status Code", 200)
+    return isinstance(expected, int) and 200 <= expected < 300
+
+
+class ResourceChain:
+    """
+    The test cases of one resource in execution order, with the IDs captured from its create
+    responses. Path parameters of later happy-path cases are replaced by the captured IDs.
+    """
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        self.steps = []  # (stage, index, test case, endpoint or None)
+        self.captured = {}  # type: Dict[str, Any]
+
+    @property
+    def id_param(self) -> Optional[str]:
+        """The first path parameter of the resource, which a bare `id` in a create response fills."""
+        for _, _, _, endpoint in self.steps:
+            match = _PATH_PARAM.search(endpoint.path) if endpoint else None
+            if match:
+                return match.group(1)
+        return None
+
+    def ordered(self) -> List[tuple]:
+        # sorted() is stable, so suite order is kept within a stage
+        return sorted(self.steps, key=lambda step: step[0])
+
+    def capture(self, response: requests.Response) -> None:
+        if not response.ok:
+            return
+        try:
+            body = response.json()
+        except ValueError:
+            return
+        if not isinstance(body, dict):
+            return
+        params = {name for _, _, _, ep in self.steps if ep for name in _PATH_PARAM.findall(ep.path)}
+        for name in params:
+            if body.get(name) is not None:
+                self.captured[name] = body[name]
+        id_param = self.id_param
+        if id_param and id_param not in self.captured and body.get("id") is not None:
+            self.captured[id_param] = body["id"]
+
+    def resolve(self, test_case: dict, endpoint: Optional[Endpoint]) -> dict:
+        """`test_case` with captured IDs in its path, for cases that expect the resource to exist."""
+        if endpoint is None or not self.captured or not _expects_success(test_case):
+            return test_case
+
+        url = urlsplit(test_case.get("Endpoint", ""))
+        segments = url.path.split("/")
+        template = endpoint.path.split("/")
+        if len(segments) != len(template):
+            return test_case
+        changed = False
+        for position, part in enumerate(template):
+            match = _PATH_PARAM.fullmatch(part)
+            if match and match.group(1) in self.captured:
+                segments[position] = quote(str(self.captured[match.group(1)]), safe="")
+                changed = True
+        if not changed:
+            return test_case
+        return {**test_case, "Endpoint": urlunsplit(url._replace(path="/".join(segments)))}
+
+
+def build_chains(test_cases: List[dict], endpoints: List[Endpoint]) -> List[ResourceChain]:
+    """
+    Group test cases into independent resource chains (the dependency DAG is a set of linear chains).
+    Operations are grouped by the path before their first parameter, so nested resources share
+    their parent's chain. Cases that match no operation each run on their own.
+    """
+    matcher = OperationMatcher(endpoints)
+    chains = {}  # type: Dict[str, ResourceChain]
+    standalone = []
+    for index, test_case in enumerate(test_cases):
+        key = matcher.operation_for(test_case)
+        if key is None:
+            chain = ResourceChain(test_case.get("Endpoint", ""))
+            chain.steps.append((USE, index, test_case, None))
+            standalone.append(chain)
+            continue
+        endpoint = matcher.endpoints[key]
+        resource = resource_of(endpoint.path)
+        chain = chains.setdefault(resource, ResourceChain(resource))
+        chain.steps.append((stage_of(endpoint), index, test_case, endpoint))
+    return list(chains.values()) + standalone
+
+
+def iter_scheduled_test_results(
+        test_cases: Iterable[dict],
+        endpoints: List[Endpoint],
+        max_workers: int = DEFAULT_EXECUTION_WORKERS,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        response_validator: Optional[ResponseValidator] = None,
+        base_url: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Execute test cases in dependency order and yield the same records as iter_test_results.
+
+    Each resource chain runs its creates, then its reads and updates, then its deletes, one case
+    at a time, and IDs returned by its creates are substituted into the later happy-path cases.
+    Independent chains run concurrently on `max_workers` threads. Records whose path was rewritten
+    carry the URL actually requested in `resolved_endpoint`. If a chain stops on an unexpected
+    error, its remaining cases are reported as ERROR.
+    """
+    test_cases = list(test_cases)
+    chains = build_chains(test_cases, endpoints)
+    base_url = base_url or load_base_url()
+    host_limiter = HostLimiter(per_host_limit)
+    records = queue.Queue()
+    stop = threading.Event()
+    total_cases, passed_cases, failed_cases = 0, 0, 0
+    start_time = time.time()
+    logger.info("Scheduling %d test cases in %d resource chains", len(test_cases), len(chains))
+
+    def run_chain(chain: ResourceChain, session: requests.Session) -> None:
+        steps = chain.ordered()
+        finished = 0
+        try:
+            with span("resource_chain", "execution", resource=chain.resource, cases=len(steps)):
+                for step in steps:
+                    if stop.is_set():
+                        return
+                    records.put(run_step(chain, step, session))
+                    finished += 1
+        except Exception as e:
+            # Every case still gets a record, so the summary counts the whole suite
+            logger.exception("Resource chain %s stopped", chain.resource)
+            for _, index, test_case, _ in steps[finished:]:
+                result = build_result("ERROR", None, error=f"Resource chain {chain.resource} stopped: {e}")
+                records.put({
+                    "type": "result", "index": index, "test_case_name": test_case.get("Test Case Name", "Unnamed"),
+                    **result
+                })
+        finally:
+            records.put(None)
+
+    def run_step(chain: ResourceChain, step: tuple, session: requests.Session) -> dict:
+        stage, index, test_case, endpoint = step
+        resolved = chain.resolve(test_case, endpoint)
+        # Only creates that are meant to succeed provide IDs for the rest of the chain
+        on_response = chain.capture if stage == CREATE and _expects_success(test_case) else None
+        test_name, result = run_test_case(
+            resolved, base_url, session, host_limiter, response_validator, on_response
+        )
+        record = {"type": "result", "index": index, "test_case_name": test_name, **result}
+        if resolved is not test_case:
+            record["resolved_endpoint"] = resolved["Endpoint"]
+        return record
+
+    with create_session(host_limiter.limit) as session:
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        try:
+            run = bind(run_chain)  # Keeps worker spans in the current trace, if any
+            for chain in chains:
+                executor.submit(run, chain, session)
+
+            running = len(chains)
+            while running:
+                record = records.get()
+                if record is None:
+                    running -= 1
+                    continue
+                total_cases += 1
+                if record["status"] == "PASSED":
+                    passed_cases += 1
+                else:
+                    failed_cases += 1
+                yield record
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    yield {
+        "type": "summary",
+        "total_cases": total_cases,
+        "passed_cases": passed_cases,
+        "failed_cases": failed_cases,
+        "total_time": time.time() - start_time,
+        "chains": len(chains),
+    }
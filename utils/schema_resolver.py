@@ -0,0 +1,192 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# References followed inside a cycle before it is cut with a placeholder
+DEFAULT_MAX_CYCLE_DEPTH = 1
+
+
+class SchemaResolver:
+    """
+    Resolves `$ref` objects in Swagger 2.0 schemas against the definitions of a single spec.
+
+    Definitions are grouped into the strongly connected components of their reference graph.
+    A definition reached from outside its component is resolved once and the result is shared by
+    every schema that refers to it, so resolved schemas must be treated as read-only. Input
+    schemas are never mutated. Inside a component (self-referencing or mutually recursive models)
+    references are followed up to `max_cycle_depth` definitions deep and never to a definition
+    already on the path; beyond that they become a placeholder carrying `x-circular-ref`. Each
+    definition therefore resolves the same way whichever schema reaches it first, in time bounded
+    by the spec size and the cycle depth.
+    """
+
+    def __init__(
+            self,
+            definitions: Optional[Dict[str, Any]] = None,
+            parameters: Optional[Dict[str, Any]] = None,
+            max_cycle_depth: int = DEFAULT_MAX_CYCLE_DEPTH
+    ):
+        self.definitions = definitions or {}
+        self.parameters = parameters or {}
+        self.max_cycle_depth = max_cycle_depth
+        self._resolved = {}  # definition name -> resolved schema, for definitions entered from outside their component
+        self._components = None  # type: Optional[Dict[str, int]]
+        self._expanding = []  # (component, names on the path inside it) of each component being expanded
+
+    def resolve(self, schema: Any) -> Any:
+        if not isinstance(schema, dict):
+            return schema
+
+        if "$ref" in schema:
+            return self._resolve_ref(schema["$ref"])
+
+        if not schema:
+            return {}
+
+        resolved = dict(schema)
+        if "items" in schema:
+            resolved["items"] = self.resolve(schema["items"])
+
+        if "properties" in schema and isinstance(schema["properties"], dict):
+            resolved["properties"] = {prop: self.resolve(val) for prop, val in schema["properties"].items()}
+
+        if isinstance(schema.get("additionalProperties"), dict):
+            resolved["additionalProperties"] = self.resolve(schema["additionalProperties"])
+
+        if isinstance(schema.get("allOf"), list):
+            resolved = self._merge_all_of(resolved, [self.resolve(part) for part in schema["allOf"]])
+
+        return resolved
+
+    def resolve_parameter(self, parameter: dict) -> dict:
+        """Resolve a parameter-level `$ref` such as `#/parameters/limitParam`."""
+        if isinstance(parameter, dict) and "$ref" in parameter:
+            name = parameter["$ref"].split("/")[-1]
+            if name not in self.parameters:
+                logger.warning("Unresolved parameter reference: %s", parameter["$ref"])
+            return self.parameters.get(name, {})
+        return parameter
+
+    def _resolve_ref(self, ref: str) -> dict:
+        name = ref.split("/")[-1]
+        definition = self.definitions.get(name, {})
+        component = self._component_of(name)
+
+        if self._expanding and self._expanding[-1][0] == component:
+            # A reference back into the cycle being expanded
+            path = self._expanding[-1][1]
+            if name in path or len(path) > self.max_cycle_depth:
+                return {"type": definition.get("type", "object"), "x-circular-ref": name}
+            path.append(name)
+            try:
+                return self.resolve(definition)
+            finally:
+                path.pop()
+
+        # Entered from outside its component, a definition resolves the same way from anywhere
+        if name in self._resolved:
+            return self._resolved[name]
+        self._expanding.append((component, [name]))
+        try:
+            resolved = self.resolve(definition)
+        finally:
+            self._expanding.pop()
+        self._resolved[name] = resolved
+        return resolved
+
+    def _component_of(self, name: str) -> int:
+        if self._components is None:
+            self._components = _strongly_connected_components(
+                {name: _references(definition) for name, definition in self.definitions.items()}
+            )
+        return self._components.get(name, -1)
+
+    @staticmethod
+    def _merge_all_of(schema: dict, parts: list) -> dict:
+        """Flatten `allOf` into one object schema, combining properties and required fields."""
+        merged = {key: value for key, value in schema.items() if key != "allOf"}
+        properties = dict(merged.get("properties", {}))
+        required = list(merged.get("required", []))
+
+        for part in parts:
+            if not isinstance(part, dict):
+                continue
+            properties.update(part.get("properties", {}))
+            required.extend(name for name in part.get("required", []) if name not in required)
+            for key, value in part.items():
+                if key not in ("properties", "required"):
+                    merged.setdefault(key, value)
+
+        if properties:
+            merged["properties"] = properties
+            merged.setdefault("type", "object")
+        if required:
+            merged["required"] = required
+        return merged
+
+
+def _references(schema: Any) -> List[str]:
+    """Names of the definitions `schema` refers to through the keys SchemaResolver follows."""
+    names = []
+    pending = [schema]
+    while pending:
+        schema = pending.pop()
+        if not isinstance(schema, dict):
+            continue
+        if "$ref" in schema:
+            names.append(str(schema["$ref"]).split("/")[-1])
+            continue
+        pending.append(schema.get("items"))
+        if isinstance(schema.get("properties"), dict):
+            pending.extend(schema["properties"].values())
+        pending.append(schema.get("additionalProperties"))
+        if isinstance(schema.get("allOf"), list):
+            pending.extend(schema["allOf"])
+    return names
+
+
+def _strongly_connected_components(graph: Dict[str, List[str]]) -> Dict[str, int]:
+    """Component number of every node, by an iterative Tarjan's algorithm (specs can nest deeply)."""
+    index, lowlink, component = {}, {}, {}
+    stack, on_stack = [], set()
+    counter = 0
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in graph:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component[member] = index[node]
+                    if member == node:
+                        break
+    return component
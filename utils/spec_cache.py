@@ -0,0 +1,102 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.models import ExtractedSwagger
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpecCacheEntry:
+    """A parsed spec together with the validators needed to tell whether its source changed."""
+    extracted: ExtractedSwagger
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    mtime: Optional[float] = None
+
+
+class SpecCache:
+    """
+    Parsed Swagger specs keyed by URL or path.
+    Entries live in an in-memory LRU of `max_entries` specs and, when `cache_dir` is given,
+    are also written to disk so they survive restarts.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 32):
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source: str) -> Optional[SpecCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is not None:
+                self._entries.move_to_end(source)
+                return entry
+
+        entry = self._load_from_disk(source)
+        if entry is not None:
+            self._remember(source, entry)
+        return entry
+
+    def put(self, source: str, entry: SpecCacheEntry) -> None:
+        self._remember(source, entry)
+        self._save_to_disk(source, entry)
+
+    def _remember(self, source: str, entry: SpecCacheEntry) -> None:
+        with self._lock:
+            self._entries[source] = entry
+            self._entries.move_to_end(source)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, source: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, hashlib.sha256(source.encode("utf-8")).hexdigest() + ".json")
+
+    def _load_from_disk(self, source: str) -> Optional[SpecCacheEntry]:
+        path = self._disk_path(source)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+            return SpecCacheEntry(
+                extracted=ExtractedSwagger.model_validate(stored["extracted"]),
+                etag=stored.get("etag"),
+                last_modified=stored.get("last_modified"),
+                mtime=stored.get("mtime"),
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable spec cache entry %s: %s", path, e)
+            return None
+
+    def _save_to_disk(self, source: str, entry: SpecCacheEntry) -> None:
+        path = self._disk_path(source)
+        if not path:
+            return
+        stored = {
+            "source": source,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "mtime": entry.mtime,
+            "extracted": entry.extracted.model_dump(by_alias=True),
+        }
+        try:
+            # Write then rename so a crash never leaves a half-written entry behind
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not persist spec cache entry for %s: %s", source, e)
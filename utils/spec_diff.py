@@ -0,0 +1,94 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from utils.models import Endpoint, SpecDiff
+
+# Endpoint fields that change what a correct test suite looks like; docs-only fields are left out.
+# The resolved request and response schemas are hashed from the resolver's shared objects.
+FINGERPRINT_FIELDS = {"path", "method", "parameters", "security"}
+
+
+def operation_key(endpoint: Endpoint) -> str:
+    """Stable identifier for an operation that survives operationId renames."""
+    return f"{endpoint.method.upper()} {endpoint.path}"
+
+
+def path_regex(path_template: str) -> "re.Pattern":
+    """Regex matching concrete paths of a template such as /pet/{petId}."""
+    parts = re.split(r"(\{[^}/]+\})", path_template)
+    return re.compile("".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts) + "$")
+
+
+class OperationMatcher:
+    """Maps test cases to the operation key of the endpoint they exercise."""
+
+    def __init__(self, endpoints: List[Endpoint]):
+        self.endpoints = {operation_key(ep): ep for ep in endpoints}
+        self._by_operation_id = {ep.operation_id: key for key, ep in self.endpoints.items() if ep.operation_id}
+        # Literal paths are tried before templated ones, so /pet/findByStatus never matches /pet/{petId}
+        templates = sorted(self.endpoints.items(), key=lambda item: item[1].path.count("{"))
+        self._templates = [(ep.method.upper(), path_regex(ep.path), key) for key, ep in templates]
+
+    def operation_for(self, test_case: dict) -> Optional[str]:
+        """The operation key by operation ID, falling back to the method and path template; None if unknown."""
+        operation_id = test_case.get("Operation ID")
+        if operation_id in self._by_operation_id:
+            return self._by_operation_id[operation_id]
+        method = test_case.get("Method", "GET").upper()
+        path = urlsplit(test_case.get("Endpoint", "")).path
+        for template_method, regex, key in self._templates:
+            if template_method == method and regex.match(path):
+                return key
+        return None
+
+
+def compute_fingerprint(endpoint: Endpoint, digests: Optional[Dict[int, tuple]] = None) -> str:
+    """
+    Hash the structural parts of an endpoint, including its resolved schemas. `digests` memoizes
+    the hash of every schema object by identity; pass one dict for all endpoints of a spec so
+    subtrees shared through the resolver are hashed once, however often they are reached.
+    """
+    structure = endpoint.model_dump(by_alias=True, include=FINGERPRINT_FIELDS)
+    request_body = endpoint.request_body
+    structure["request_body"] = {
+        "required": request_body.required, "schema": request_body.schema_data
+    } if request_body else None
+    structure["responses"] = {
+        code: {"description": response.description, "schema": response.schema_data}
+        for code, response in endpoint.responses.items()
+    }
+    return _digest(structure, {} if digests is None else digests)
+
+
+def _digest(value: Any, digests: Dict[int, tuple]) -> str:
+    """Canonical hash of a JSON-like value: key order never matters, equal values hash equally."""
+    if not isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    cached = digests.get(id(value))
+    if cached is not None:
+        return cached[1]
+    if isinstance(value, dict):
+        items = sorted((str(key), _digest(item, digests)) for key, item in value.items())
+        canonical = "{" + ",".join(f"{json.dumps(key)}:{digest}" for key, digest in items) + "}"
+    else:
+        canonical = "[" + ",".join(_digest(item, digests) for item in value) + "]"
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    digests[id(value)] = (value, digest)  # Holding the value keeps its id from being reused
+    return digest
+
+
+def endpoint_fingerprints(endpoints: List[Endpoint]) -> Dict[str, str]:
+    return {operation_key(ep): ep.fingerprint or compute_fingerprint(ep) for ep in endpoints}
+
+
+def diff_fingerprints(old: Dict[str, str], new: Dict[str, str]) -> SpecDiff:
+    """Compare two {operation key: fingerprint} maps."""
+    return SpecDiff(
+        added=[key for key in new if key not in old],
+        removed=[key for key in old if key not in new],
+        changed=[key for key in new if key in old and old[key] != new[key]],
+        unchanged=[key for key in new if key in old and old[key] == new[key]],
+    )
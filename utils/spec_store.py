@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from utils.models import Endpoint, ExtractedSwagger
+from utils.response_validator import ResponseValidator
+from utils.spec_diff import endpoint_fingerprints, operation_key
+
+logger = logging.getLogger(__name__)
+
+# Execution result fields copied onto a test case under its CSV column name
+RESULT_COLUMNS = {
+    "actual_status_code": "Actual Status Code",
+    "status": "Status",
+    "error": "Error",
+    "response_time": "Response Time",
+    "schema_errors": "Schema Errors",
+}
+
+
+def _case_key(test_case: dict) -> tuple:
+    # Names are only unique per operation, so results are keyed by operation and name
+    return test_case.get("Method", "GET").upper(), test_case.get("Endpoint", ""), test_case.get("Test Case Name")
+
+
+class StoredSpec:
+    """
+    An extracted spec held server side, together with the suites generated for its operations
+    and the latest execution result of each test case. Operations are addressed by their
+    operation key ("METHOD path").
+    """
+
+    def __init__(self, spec_id: str, source: str, extracted: ExtractedSwagger):
+        self.spec_id = spec_id
+        self.source = source
+        self.definitions = extracted.definitions or {}
+        self.endpoints = OrderedDict((operation_key(ep), ep) for ep in extracted.endpoints)
+        self._suites = {}  # type: Dict[str, List[dict]]
+        self._results = {}  # type: Dict[tuple, dict]
+        self._lock = threading.Lock()
+        self._response_validator = None
+
+    @property
+    def response_validator(self) -> ResponseValidator:
+        """Response schema validator for this spec, kept so compiled validators are reused across runs."""
+        with self._lock:
+            if self._response_validator is None:
+                self._response_validator = ResponseValidator(list(self.endpoints.values()))
+            return self._response_validator
+
+    def select(self, operation_keys: Optional[Iterable[str]] = None) -> List[Endpoint]:
+        """The endpoints for `operation_keys` (all of them when None); raises LookupError for unknown keys."""
+        if operation_keys is None:
+            return list(self.endpoints.values())
+        unknown = [key for key in operation_keys if key not in self.endpoints]
+        if unknown:
+            raise LookupError(f"Unknown operations: {', '.join(unknown)}")
+        return [self.endpoints[key] for key in operation_keys]
+
+    def test_cases(self, operation_keys: Optional[Iterable[str]] = None, with_results: bool = False) -> List[dict]:
+        """Stored test cases of the selected operations in spec order, optionally merged with their results."""
+        return list(self.iter_test_cases(operation_keys, with_results))
+
+    def iter_test_cases(self, operation_keys: Optional[Iterable[str]] = None, with_results: bool = False) -> Iterator[dict]:
+        """
+        Like test_cases, but merges results one case at a time so exports of large suites stay flat.
+        Unknown operation keys raise LookupError immediately, not on first iteration.
+        """
+        keys = [operation_key(ep) for ep in self.select(operation_keys)]
+        with self._lock:
+            suites = [self._suites.get(key, []) for key in keys]
+        return self._merge_results(suites) if with_results else (case for suite in suites for case in suite)
+
+    def _merge_results(self, suites: List[List[dict]]) -> Iterator[dict]:
+        for suite in suites:
+            for case in suite:
+                with self._lock:
+                    result = self._results.get(_case_key(case), {})
+                yield {**case, **{column: result[field] for field, column in RESULT_COLUMNS.items() if field in result}}
+
+    def remember_suites(self, endpoints: List[Endpoint], records: Iterable[dict]) -> Iterator[dict]:
+        """Pass generation records through, storing each successful endpoint's suite."""
+        for record in records:
+            if record["type"] == "endpoint" and not record["error"]:
+                with self._lock:
+                    self._suites[operation_key(endpoints[record["index"]])] = record["test_cases"]
+            yield record
+
+    def remember_results(self, test_cases: List[dict], records: Iterable[dict]) -> Iterator[dict]:
+        """Pass execution records for `test_cases` through, storing each test case's latest result."""
+        for record in records:
+            if record["type"] == "result":
+                with self._lock:
+                    self._results[_case_key(test_cases[record["index"]])] = {
+                        k: v for k, v in record.items() if k not in ("type", "index", "test_case_name")
+                    }
+            yield record
+
+
+class SpecStore:
+    """
+    In-memory LRU of extracted specs keyed by spec ID, so clients can reference operations and
+    suites by ID instead of re-posting endpoint JSON and definitions on every call.
+    The spec ID is derived from the source and the endpoint fingerprints, so re-extracting an
+    unchanged spec returns the same handle and keeps its generated suites.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_id(source: str, extracted: ExtractedSwagger) -> str:
+        fingerprints = sorted(endpoint_fingerprints(extracted.endpoints).items())
+        payload = source + "\n" + "\n".join(f"{key} {value}" for key, value in fingerprints)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def put(self, source: str, extracted: ExtractedSwagger) -> StoredSpec:
+        spec_id = self.make_id(source, extracted)
+        with self._lock:
+            stored = self._specs.get(spec_id)
+            if stored is None:
+                stored = self._specs[spec_id] = StoredSpec(spec_id, source, extracted)
+            self._specs.move_to_end(spec_id)
+            while len(self._specs) > self.max_entries:
+                evicted, _ = self._specs.popitem(last=False)
+                logger.info("Evicted spec %s from the spec store", evicted)
+        return stored
+
+    def get(self, spec_id: str) -> Optional[StoredSpec]:
+        with self._lock:
+            stored = self._specs.get(spec_id)
+            if stored is not None:
+                self._specs.move_to_end(spec_id)
+            return stored
@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+class SuiteStore:
+    """
+    SQLite store of generated test suites, one row per operation of a spec.
+    Each row remembers the endpoint fingerprint it was generated from, so the stored
+    fingerprints double as the snapshot of the last generated version of the spec.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS suites ("
+            " spec_key TEXT NOT NULL,"
+            " operation_key TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " test_cases TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (spec_key, operation_key))"
+        )
+        self._conn.commit()
+
+    def load_fingerprints(self, spec_key: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT operation_key, fingerprint FROM suites WHERE spec_key = ?", (spec_key,)
+            ).fetchall()
+        return dict(rows)
+
+    def load_suite(self, spec_key: str, operation_key: str) -> Optional[List[dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT test_cases FROM suites WHERE spec_key = ? AND operation_key = ?", (spec_key, operation_key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_suite(self, spec_key: str, operation_key: str, fingerprint: str, test_cases: List[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO suites (spec_key, operation_key, fingerprint, test_cases, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (spec_key, operation_key, fingerprint, json.dumps(test_cases), time.time())
+            )
+            self._conn.commit()
+
+    def delete_suites(self, spec_key: str, operation_keys: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM suites WHERE spec_key = ? AND operation_key = ?",
+                [(spec_key, key) for key in operation_keys]
+            )
+            self._conn.commit()
@@ -0,0 +1,232 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional
+
+from utils.constants import DEFAULT_TRACE_MAX_EVENTS, DEFAULT_TRACE_MAX_RUNS
+
+# The recorder of the run being traced in this context; None (the default) makes every span a no-op
+_current = contextvars.ContextVar("trace_recorder", default=None)
+_NOOP = contextlib.nullcontext()
+
+
+class TraceRecorder:
+    """
+    The spans of one run, kept as Chrome trace "complete" events. Spans land on one lane (track)
+    per thread, or per asyncio task when recorded inside one, so concurrent work does not overlap.
+    Beyond `max_events` spans are counted but not kept.
+    """
+
+    def __init__(self, run_id: str, max_events: int = DEFAULT_TRACE_MAX_EVENTS):
+        self.run_id = run_id
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self._origin = time.perf_counter()
+        self._lanes = {}  # lane key -> (tid, name)
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Microseconds since the run started."""
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _lane(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # No running event loop in this thread
+            task = None
+        key = ("task", id(task)) if task is not None else ("thread", threading.get_ident())
+        lane = self._lanes.get(key)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.get(key)
+                if lane is None:
+                    name = task.get_name() if task is not None else threading.current_thread().name
+                    lane = self._lanes[key] = (len(self._lanes) + 1, name)
+        return lane[0]
+
+    def add(self, name: str, category: str, start: float, end: float, args: Optional[dict] = None) -> None:
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        event = {"name": name, "cat": category, "ph": "X", "ts": start, "dur": end - start,
+                 "pid": os.getpid(), "tid": self._lane()}
+        if args:
+            event["args"] = args
+        self.events.append(event)  # list.append is atomic, no lock needed
+
+    def to_chrome(self) -> dict:
+        """The run in Chrome trace / Perfetto JSON (trace event format)."""
+        pid = os.getpid()
+        lanes = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._lanes.values())
+        ]
+        return {
+            "traceEvents": lanes + list(self.events),
+            "displayTimeUnit": "ms",
+            "otherData": {"run_id": self.run_id, "dropped_events": self.dropped},
+        }
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "category", "args", "start")
+
+    def __init__(self, recorder: TraceRecorder, name: str, category: str, args: dict):
+        self.recorder = recorder
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = self.recorder.now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.recorder.add(self.name, self.category, self.start, self.recorder.now(), self.args)
+
+
+def span(name: str, category: str = "app", **args):
+    """Context manager timing a block as a span of the current run; free when no run is traced."""
+    recorder = _current.get()
+    if recorder is None:
+        return _NOOP
+    return _Span(recorder, name, category, args)
+
+
+def traced(name: str, category: str = "app") -> Callable:
+    """Decorator recording each call of a function or coroutine function as a span."""
+
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, category):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def bind(func: Callable) -> Callable:
+    """
+    `func` carrying the current run into another thread (executor pools do not copy contextvars).
+    Returns `func` itself when nothing is being traced.
+    """
+    recorder = _current.get()
+    if recorder is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current.set(recorder)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+class TraceStore:
+    """In-memory LRU of finished and running traces keyed by run ID."""
+
+    def __init__(self, max_runs: int = DEFAULT_TRACE_MAX_RUNS):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, recorder: TraceRecorder) -> None:
+        with self._lock:
+            self._runs[recorder.run_id] = recorder
+            self._runs.move_to_end(recorder.run_id)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+
+    def get(self, run_id: str) -> Optional[TraceRecorder]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+
+# Tracing is off until configure_tracing enables it
+_settings = {"enabled": False, "max_events": DEFAULT_TRACE_MAX_EVENTS}
+TRACES = TraceStore()
+
+
+def configure_tracing(trace_config: Optional[dict] = None) -> None:
+    """Apply the `tracing` section of config.yaml."""
+    trace_config = trace_config or {}
+    _settings["enabled"] = bool(trace_config.get("enabled", False))
+    _settings["max_events"] = trace_config.get("max_events_per_run", DEFAULT_TRACE_MAX_EVENTS)
+    TRACES.max_runs = trace_config.get("max_runs", DEFAULT_TRACE_MAX_RUNS)
+
+
+def start_run(run_id: Optional[str] = None) -> Optional[TraceRecorder]:
+    """A new recorder registered in TRACES, or None when tracing is disabled."""
+    if not _settings["enabled"]:
+        return None
+    recorder = TraceRecorder(run_id or uuid.uuid4().hex, _settings["max_events"])
+    TRACES.put(recorder)
+    return recorder
+
+
+@contextlib.contextmanager
+def recording(recorder: Optional[TraceRecorder], name: str = "run"):
+    """Trace the block into `recorder` (nothing happens for None), as one span named `name`."""
+    if recorder is None:
+        yield
+        return
+    token = _current.set(recorder)
+    try:
+        with span(name, "run"):
+            yield
+    finally:
+        _current.reset(token)
+
+
+def iter_traced(recorder: Optional[TraceRecorder], records: Iterator[Any], name: str = "run") -> Iterator[Any]:
+    """
+    Consume `records` with `recorder` as the current run, without leaking it to the consumer
+    between items, and record the whole iteration as one span. Returns `records` for None.
+    """
+    if recorder is None:
+        return records
+    records = iter(records)
+
+    def generate():
+        start = recorder.now()
+        try:
+            while True:
+                token = _current.set(recorder)
+                try:
+                    record = next(records)
+                except StopIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield record
+        finally:
+            close = getattr(records, "close", None)
+            if close is not None:
+                token = _current.set(recorder)
+                try:
+                    close()
+                finally:
+                    _current.reset(token)
+            recorder.add(name, "run", start, recorder.now())
+
+    return generate()
@@ -1,5 +1,5 @@
+import asyncio
 import os
-import re
 
 from faker import Faker
 import contextlib
@@ -7,136 +7,248 @@ import yaml
 from langchain_core.language_models import BaseChatModel
 from pydantic import ValidationError
 
-from logger_config import logger
-from langchain.prompts import PromptTemplate
+from logger_config import truncate_body
 import time
 
 import requests
 import json
 import logging
-from typing import List, Optional
-
-from utils.constants import HTTP_METHODS
-from utils.models import ExtractedSwagger, Endpoint, Parameter, RequestBody, Response, TestCase
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from requests.adapters import HTTPAdapter
+
+from utils.constants import (
+    GENERATION_MODES,
+    HTTP_METHODS,
+    DEFAULT_GENERATION_CONCURRENCY,
+    DEFAULT_EXECUTION_WORKERS,
+    DEFAULT_PER_HOST_LIMIT,
+)
+from utils.metrics import (
+    HTTP_ERRORS, HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_RESPONSES, LLM_OUTPUT_PARSE, SPEC_FETCH_LATENCY, SPEC_PARSE_LATENCY
+)
+from utils.json_stream import JsonArrayStream, repair_json
+from utils.offline_generator import generate_offline_test_cases
+from utils.payload_synth import compile_schema
+from utils.models import ExtractedSwagger, Endpoint, Parameter, RequestBody, Response, SpecDiff, TestCase
+from utils.prompt_builder import BuiltPrompt, PromptBuilder
+from utils.rate_limiter import RateLimiter
+from utils.response_validator import ResponseValidator
+from utils.schema_resolver import SchemaResolver
+from utils.spec_cache import SpecCache, SpecCacheEntry
+from utils.spec_diff import compute_fingerprint, diff_fingerprints, endpoint_fingerprints, operation_key
+from utils.suite_store import SuiteStore
+from utils.tracing import bind, span, traced
 
 logger = logging.getLogger(__name__)
 
 
-def extract_endpoints_from_swagger(swagger_url: str) -> ExtractedSwagger:
+def _local_spec_path(source: str) -> Optional[str]:
+    """Return the filesystem path for file:// URLs and plain paths, or None for remote URLs."""
+    parsed = urlparse(source)
+    if parsed.scheme == "file":
+        return url2pathname(parsed.path)
+    if parsed.scheme in ("http", "https"):
+        return None
+    return source
+
+
+def is_remote_spec(source: str) -> bool:
+    """Whether `source` is an http(s) URL rather than a file:// URL or local path."""
+    return _local_spec_path(source) is None
+
+
+def _load_local_spec(path: str) -> dict:
+    with open(path, "r") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+@traced("extract_endpoints_from_swagger", "spec")
+def extract_endpoints_from_swagger(
+        swagger_url: str,
+        spec_cache: Optional[SpecCache] = None,
+        allow_local: bool = False
+) -> ExtractedSwagger:
+    """
+    Extract endpoints from a Swagger 2.0 document at an http(s) URL or, with `allow_local`, a
+    file:// URL or local path. Only trusted callers such as the CLI allow local paths; the web app
+    must not read files off the server on behalf of a request. With a spec cache, unchanged documents are served without being re-parsed: remote specs are
+    revalidated with If-None-Match / If-Modified-Since, local files by modification time.
+    """
     try:
-        response = requests.get(swagger_url)
-        response.raise_for_status()
-        swagger_data = response.json()
-        swagger_version = swagger_data.get("swagger")  # Safely get the 'swagger' key
-
-        if swagger_version != "2.0":
-            logger.error("Unsupported Swagger version: %s", swagger_version)
-            raise ValueError("Only Swagger 2.0 definitions are currently supported.")
+        cached = spec_cache.get(swagger_url) if spec_cache else None
+        local_path = _local_spec_path(swagger_url)
+
+        if local_path is not None:
+            if not allow_local:
+                raise ValueError(f"Local spec paths are not allowed here: {swagger_url}")
+            mtime = os.path.getmtime(local_path)
+            if cached and cached.mtime == mtime:
+                logger.info("Spec %s unchanged on disk, using cached extraction.", swagger_url)
+                return cached.extracted
+            with SPEC_FETCH_LATENCY.time(source="local", result="read"), span("fetch_spec", "spec"):
+                swagger_data = _load_local_spec(local_path)
+            with SPEC_PARSE_LATENCY.time(), span("parse_swagger", "spec"):
+                extracted = parse_swagger(swagger_data)
+            entry = SpecCacheEntry(extracted=extracted, mtime=mtime)
         else:
-            # If it's 2.0, proceed with your extraction logic
-            # For demonstration, let's just indicate success
-            logger.info("Swagger version 2.0 detected. Proceeding with extraction.")
-
-        endpoints = []
-        base_path = swagger_data.get("basePath", "")
-        definitions = swagger_data.get("definitions", {})
-
-        for path, methods in list(swagger_data.get("paths", {}).items()):
-            for method, details in methods.items():
-                if method.lower() not in ["get", "post", "put", "delete", "patch"]:
-                    continue
-
-                params = [
-                    Parameter(
-                        name=param.get("name"),
-                        in_=param.get("in"),
-                        description=param.get("description", ""),
-                        required=param.get("required", False),
-                        type=param.get("type"),
-                        format=param.get("format"),
-                        schema_data=param.get("schema"),
-                        enum=param.get("enum", []),
-                        items=param.get("items", {})
-                    )
-                    for param in details.get("parameters", [])
-                ]
-
-                body_param = next((param for param in details.get("parameters", []) if param.get("in") == "body"), None)
-                form_data_params = [param for param in details.get("parameters", []) if param.get("in") == "formData"]
-
-                if body_param:
-                    raw_schema = body_param.get("schema", {})
-                    resolved_schema = resolve_schema_refs(raw_schema, definitions)
-                    request_body = RequestBody(
-                        required=body_param.get("required", False),
-                        schema_data=resolved_schema
-                    )
-                elif form_data_params:
-                    # Combine formData fields into a synthetic schema
-                    form_schema = {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-
-                    for param in form_data_params:
-                        name = param["name"]
-                        is_required = param.get("required", False)
-                        param_type = param.get("type", "string")
-
-                        if param_type == "file":
-                            form_schema["properties"][name] = {
-                                "type": "string",  # Note: you will treat this as a file in request step
-                                "format": "binary",
-                                "description": param.get("description", "")
-                            }
-                        else:
-                            form_schema["properties"][name] = {
-                                "type": param_type,
-                                "description": param.get("description", ""),
-                                "enum": param.get("enum", []),
-                                "format": param.get("format", None)
-                            }
-
-                        if is_required:
-                            form_schema["required"].append(name)
-                    request_body = RequestBody(
-                        required=True,
-                        schema_data=form_schema
-                    )
-                else:
-                    request_body = RequestBody()
-
-                responses = {
-                    str(code): Response(
-                        description=resp.get("description", ""),
-                        schema_data=resolve_schema_refs(resp.get("schema", {}), definitions)
-                    )
-                    for code, resp in details.get("responses", {}).items()
-                }
-
-                endpoint = Endpoint(
-                    full_path=base_path + path,
-                    path=path,
-                    method=method.upper(),
-                    operation_id=details.get("operationId", f"{method}_{path.replace('/', '_')}"),
-                    summary=details.get("summary", ""),
-                    description=details.get("description", ""),
-                    tags=details.get("tags", []),
-                    parameters=params,
-                    request_body=request_body,
-                    responses=responses,
-                    security=details.get("security", [])
-                )
-                endpoints.append(endpoint)
+            headers = {}
+            if cached and cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached and cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+            start = time.perf_counter()
+            with span("fetch_spec", "spec"):
+                response = requests.get(swagger_url, headers=headers, timeout=30)
+            not_modified = response.status_code == 304 and cached
+            SPEC_FETCH_LATENCY.observe(
+                time.perf_counter() - start, source="remote", result="not_modified" if not_modified else "fetched"
+            )
+            if not_modified:
+                logger.info("Spec %s not modified, using cached extraction.", swagger_url)
+                return cached.extracted
+            response.raise_for_status()
+            with SPEC_PARSE_LATENCY.time(), span("parse_swagger", "spec"):
+                extracted = parse_swagger(response.json())
+            entry = SpecCacheEntry(
+                extracted=extracted,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
 
-        return ExtractedSwagger(endpoints=endpoints, definitions=definitions)
+        if spec_cache and (entry.etag or entry.last_modified or entry.mtime is not None):
+            spec_cache.put(swagger_url, entry)
+        return entry.extracted
 
     except Exception as e:
         logger.error(f"Error extracting endpoints: {e}")
         return ExtractedSwagger(endpoints=[], definitions={})
 
 
+def parse_swagger(swagger_data: dict) -> ExtractedSwagger:
+    """Build the Endpoint models for every operation in a Swagger 2.0 document."""
+    swagger_version = swagger_data.get("swagger")  # Safely get the 'swagger' key
+
+    if swagger_version != "2.0":
+        logger.error("Unsupported Swagger version: %s", swagger_version)
+        raise ValueError("Only Swagger 2.0 definitions are currently supported.")
+    else:
+        logger.info("Swagger version 2.0 detected. Proceeding with extraction.")
+
+    endpoints = []
+    base_path = swagger_data.get("basePath", "")
+    definitions = swagger_data.get("definitions", {})
+    security_definitions = swagger_data.get("securityDefinitions", {})
+    # One resolver per spec, so each definition is resolved once and shared across endpoints
+    resolver = SchemaResolver(definitions, swagger_data.get("parameters", {}))
+    digests = {}  # Fingerprint hashes of the resolver's shared schema objects
+
+    for path, methods in list(swagger_data.get("paths", {}).items()):
+        for method, details in methods.items():
+            if method.lower() not in ["get", "post", "put", "delete", "patch"]:
+                continue
+
+            raw_params = [resolver.resolve_parameter(param) for param in details.get("parameters", [])]
+            params = [
+                Parameter(
+                    name=param.get("name"),
+                    in_=param.get("in"),
+                    description=param.get("description", ""),
+                    required=param.get("required", False),
+                    type=param.get("type"),
+                    format=param.get("format"),
+                    schema_data=param.get("schema"),
+                    enum=param.get("enum", []),
+                    items=param.get("items", {})
+                )
+                for param in raw_params
+            ]
+
+            body_param = next((param for param in raw_params if param.get("in") == "body"), None)
+            form_data_params = [param for param in raw_params if param.get("in") == "formData"]
+
+            if body_param:
+                raw_schema = body_param.get("schema", {})
+                resolved_schema = resolver.resolve(raw_schema)
+                request_body = RequestBody(
+                    required=body_param.get("required", False),
+                    schema_data=resolved_schema
+                )
+            elif form_data_params:
+                # Combine formData fields into a synthetic schema
+                form_schema = {
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+
+                for param in form_data_params:
+                    name = param["name"]
+                    is_required = param.get("required", False)
+                    param_type = param.get("type", "string")
+
+                    if param_type == "file":
+                        form_schema["properties"][name] = {
+                            "type": "string",  # Note: you will treat this as a file in request step
+                            "format": "binary",
+                            "description": param.get("description", "")
+                        }
+                    else:
+                        form_schema["properties"][name] = {
+                            "type": param_type,
+                            "description": param.get("description", ""),
+                            "enum": param.get("enum", []),
+                            "format": param.get("format", None)
+                        }
+
+                    if is_required:
+                        form_schema["required"].append(name)
+                request_body = RequestBody(
+                    required=True,
+                    schema_data=form_schema
+                )
+            else:
+                request_body = RequestBody()
+
+            responses = {
+                str(code): Response(
+                    description=resp.get("description", ""),
+                    schema_data=resolver.resolve(resp.get("schema", {}))
+                )
+                for code, resp in details.get("responses", {}).items()
+            }
+
+            endpoint = Endpoint(
+                full_path=base_path + path,
+                path=path,
+                method=method.upper(),
+                operation_id=details.get("operationId", f"{method}_{path.replace('/', '_')}"),
+                summary=details.get("summary", ""),
+                description=details.get("description", ""),
+                tags=details.get("tags", []),
+                parameters=params,
+                request_body=request_body,
+                responses=responses,
+                security=details.get("security", []),
+                security_schemes={
+                    name: security_definitions[name]
+                    for requirement in details.get("security", []) for name in requirement
+                    if name in security_definitions
+                }
+            )
+            endpoint.fingerprint = compute_fingerprint(endpoint, digests)
+            endpoints.append(endpoint)
+
+    return ExtractedSwagger(endpoints=endpoints, definitions=definitions)
+
+
 def print_endpoints(endpoints: list):
     if not endpoints:
         logger.warning("No endpoints to print.")
@@ -149,148 +261,482 @@ def print_endpoints(endpoints: list):
     print("Endpoints printed successfully.")
 
 
-def generate_test_cases(
-        endpoints: List[Endpoint],
-        llm: BaseChatModel,
-        swagger_definitions: Optional[dict] = None
-) -> List[dict]:
+def parse_test_cases(raw: str, endpoint: Endpoint, model_name: str = "") -> List[dict]:
     """
-    Generate structured test cases using LLM for a list of Pydantic-defined endpoints.
+    Extract and validate the test cases in one LLM completion.
+    Raises ValueError if the output cannot be parsed; invalid individual cases are skipped.
     """
+    return validate_test_cases(extract_json_array(raw, model_name), endpoint)
 
-    if not endpoints:
-        logger.info("No endpoints to generate test cases for.")
+
+def validate_test_cases(cases: list, endpoint: Endpoint) -> List[dict]:
+    """Validate raw test case dicts against TestCase, skipping invalid ones."""
+    if not cases:
         return []
+    with span("validate_test_cases", "parse", cases=len(cases)):
+        return _validate_test_cases(cases, endpoint)
 
-    prompt_template = PromptTemplate.from_template("""
-        You are an expert API tester. For the following API endpoint, generate multiple test cases:
-        - Happy path (valid inputs)
-        - Missing or invalid required parameters
-        - Security and authorization checks **only if** the endpoint requires authentication (see Security Requirements section below). Skip these tests if `Security Requirements` is empty. include auth related testcase only if the security requirement section have auth keys
-        - Edge cases (boundary values, empty input, etc.)
-        
-        Use the parameters and request body schema exactly as provided below. If the request body schema includes `properties`, construct valid request bodies using only those properties. 
-        Do not add fields not present in the schema. 
-
-        Authorization headers should **only** be included in test cases if `Security Requirements` is non-empty.
- 
-        Refer to the example Request Body for constructing valid and edge case inputs.
-        If no request body is present or required, leave it empty `{{}}` but still include the field in the test case.
-        
-        
-        Always follow the structure below **exactly** for each test case:
-        Test Case ID: <number>
-        Test Case Name: <clear title>
-        Description: <purpose of the test>
-        Endpoint: {endpoint_path}
-        Method: {method}
-        Operation ID: {operation_id}
-        Summary: {summary}
-        Request Body:
-        {request_body}
-        Expected Status Code: <code>
-        Headers:
-        {headers}
-        
-        --- Endpoint Metadata ---
-        Parameters:
-        {parameters}
-        
-        Request Body Schema:
-        {request_schema}
-        
-        Response Codes:
-        {responses}
-        
-        Security Requirements:
-        {security}
-        
-        Generate at least 5 test cases using this data.
-        Do NOT invent fields outside the provided metadata.
-        
-        Generate test cases in valid JSON format only. Escape all quotes properly. Avoid programming expressions (like .repeat()) and keep long strings under 100 characters. 
-        Do NOT include:
-        - Markdown formatting (no triple backticks)
-        - Explanatory text
-        - Comments
-        
-        Your output must look like:
-        
-        [
-          {{
-            "Test Case ID": 1,
-            "Test Case Name": "Descriptive name",
-            "Description": "Purpose of the test",
-            "Endpoint": "/example",
-            "Method": "POST",
-            "Operation ID": "addExample",
-            "Summary": "Brief summary from spec",
-            "Request Body": {{"field": "value" }},
-            "Expected Status Code": 200,
-            "Headers": {{}}
-          }}
-        ]
-
-""")
-
-    raw_test_cases = []
-    for endpoint in endpoints:
+
+def _validate_test_cases(cases: list, endpoint: Endpoint) -> List[dict]:
+    validated_cases = []
+    for case in cases:
+        if not isinstance(case, dict):
+            logger.warning(f"Skipping non-object test case on {endpoint.path}: {case!r}")
+            continue
         try:
-            parameters_repr = json.dumps([param.dict(by_alias=True) for param in endpoint.parameters], indent=2)
-            responses_repr = json.dumps({k: v.dict() for k, v in endpoint.responses.items()}, indent=2)
-            security_repr = json.dumps(endpoint.security or [], indent=2)
-            definitions_repr = json.dumps(swagger_definitions or {}, indent=2)
-            raw_schema = endpoint.request_body.schema_data or {}
-            resolved_schema = raw_schema
-
-            # Final check
-            if endpoint.method in ["POST", "PUT", "PATCH"] and resolved_schema:
-                if "properties" in resolved_schema:
-                    request_body_example = build_sample_payload(resolved_schema)
-                    request_body_prompt = json.dumps(request_body_example, indent=2)
-                else:
-                    request_body_prompt = json.dumps(resolved_schema, indent=2)
-            else:
-                request_body_prompt = "{}"
-
-            prompt = prompt_template.format(
-                endpoint_path=endpoint.path,
-                method=endpoint.method,
-                operation_id=endpoint.operation_id,
-                summary=endpoint.summary,
-                parameters=parameters_repr,
-                request_schema=json.dumps(resolved_schema, indent=2),
-                responses=responses_repr,
-                security=security_repr,
-                request_body=request_body_prompt,
-                headers="{}",
-                # definitions=definitions_repr # Can pass schema def if context need more info
-            )
+            validated = TestCase(**case)
+            validated_cases.append(validated.dict(by_alias=True))
+        except ValidationError as ve:
+            logger.warning(f"Validation failed for test case on {endpoint.path}: {ve}")
+    return validated_cases
+
 
-            raw = llm.generate_response(prompt)
+class TestCaseStream:
+    """
+    Collects the test cases of a streamed completion, validating each one against TestCase as
+    soon as its object closes instead of waiting for the whole output.
+    """
+
+    def __init__(self, endpoint: Endpoint, model_name: str = ""):
+        self.endpoint = endpoint
+        self.model_name = model_name
+        self.test_cases = []
+        # Set by close() when test cases were salvaged from output that ended mid-array
+        self.truncated = False
+        self._parser = JsonArrayStream()
+        self._chunks = []
+
+    @property
+    def text(self) -> str:
+        """The raw output received so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        self.test_cases.extend(validate_test_cases(self._parser.feed(chunk), self.endpoint))
+
+    def close(self) -> List[dict]:
+        """
+        Return the validated test cases. Output whose array could not be taken as the answer
+        (never opened, closed without elements, or followed by another array) is parsed again as
+        a whole. Raises ValueError if that fails too, or if no valid test case remains.
+        """
+        parser = self._parser
+        if parser.skipped:
+            LLM_OUTPUT_PARSE.inc(parser.skipped, model=self.model_name, result="element_skipped")
+        if parser.finished and parser.elements and not parser.trailing_array:
+            LLM_OUTPUT_PARSE.inc(model=self.model_name, result="streamed")
+            test_cases = self.test_cases
+        elif self.test_cases and not parser.finished:
+            logger.warning(f"Truncated LLM output for {self.endpoint.path}, kept {len(self.test_cases)} test cases")
+            self.truncated = True
+            LLM_OUTPUT_PARSE.inc(model=self.model_name, result="streamed")
+            test_cases = self.test_cases
+        else:
+            test_cases = parse_test_cases(self.text, self.endpoint, self.model_name)
+        if not test_cases:
+            raise ValueError("LLM output contains no valid test cases")
+        return test_cases
+
+
+def build_generation_record(
+        index: int,
+        endpoint: Endpoint,
+        test_cases: List[dict],
+        error: str = None,
+        prompt: Optional[BuiltPrompt] = None,
+        generator: str = "llm"
+) -> dict:
+    """Create the per-endpoint record produced by test generation."""
+    return {
+        "type": "endpoint",
+        "index": index,
+        "path": endpoint.path,
+        "method": endpoint.method,
+        "operation_id": endpoint.operation_id,
+        "test_cases": test_cases,
+        "error": error,
+        "generator": generator,
+        "prompt_tokens": prompt.tokens if prompt else None,
+        "prompt_tokens_saved": prompt.tokens_saved if prompt else None,
+    }
+
+
+def _offline_record(index: int, endpoint: Endpoint) -> dict:
+    try:
+        test_cases = validate_test_cases(generate_offline_test_cases(endpoint), endpoint)
+        return build_generation_record(index, endpoint, test_cases, generator="offline")
+    except Exception as e:
+        logger.exception(f"Offline generation failed for {endpoint.path}: {e}")
+        return build_generation_record(index, endpoint, [], f"Offline generation failed: {e}", generator="offline")
+
+
+def _generate_for_endpoint(
+        index: int,
+        endpoint: Endpoint,
+        llm: BaseChatModel,
+        limiter: RateLimiter,
+        prompt_builder: PromptBuilder,
+        bypass_cache: bool = False
+) -> dict:
+    prompt = None
+    try:
+        with span("generate_endpoint", "generation", method=endpoint.method, path=endpoint.path):
+            with span("build_prompt", "generation"):
+                prompt = prompt_builder.build(endpoint)
+            with span("rate_limiter", "generation"):
+                limiter.acquire_sync(prompt.tokens + llm.max_tokens)
+            stream = TestCaseStream(endpoint, llm.model_name)
+            for chunk in llm.stream_response(prompt.text, bypass_cache=bypass_cache):
+                stream.feed(chunk)
 
             try:
-                test_cases = extract_json_array(raw)
+                test_cases = stream.close()
             except ValueError as ve:
                 logger.error(f"LLM output parse error for {endpoint.path}: {ve}")
-                continue
+                llm.evict(prompt.text)
+                return build_generation_record(index, endpoint, [], f"LLM output parse error: {ve}", prompt)
+            if stream.truncated:
+                llm.evict(prompt.text)
+            prompt_builder.record_output(stream.text, len(test_cases))
+
+        logger.info(f"Generated test cases for {endpoint.method} {endpoint.path}")
+        return build_generation_record(index, endpoint, test_cases, prompt=prompt)
+
+    except Exception as e:
+        logger.exception(f"Error generating test cases for {endpoint.path}: {e}")
+        return build_generation_record(index, endpoint, [], str(e), prompt)
+
+
+async def _agenerate_for_endpoint(
+        index: int,
+        endpoint: Endpoint,
+        llm: BaseChatModel,
+        semaphore: asyncio.Semaphore,
+        limiter: RateLimiter,
+        prompt_builder: PromptBuilder,
+        bypass_cache: bool = False
+) -> dict:
+    async with semaphore:
+        prompt = None
+        try:
+            with span("generate_endpoint", "generation", method=endpoint.method, path=endpoint.path):
+                with span("build_prompt", "generation"):
+                    prompt = prompt_builder.build(endpoint)
+                with span("rate_limiter", "generation"):
+                    await limiter.acquire(prompt.tokens + llm.max_tokens)
+                stream = TestCaseStream(endpoint, llm.model_name)
+                async for chunk in llm.astream_response(prompt.text, bypass_cache=bypass_cache):
+                    stream.feed(chunk)
 
-            for case in test_cases:
                 try:
-                    validated = TestCase(**case)
-                    raw_test_cases.append(validated.dict(by_alias=True))
-                except ValidationError as ve:
-                    logger.warning(f"Validation failed for test case on {endpoint.path}: {ve}")
+                    test_cases = stream.close()
+                except ValueError as ve:
+                    logger.error(f"LLM output parse error for {endpoint.path}: {ve}")
+                    llm.evict(prompt.text)
+                    return build_generation_record(index, endpoint, [], f"LLM output parse error: {ve}", prompt)
+                if stream.truncated:
+                    llm.evict(prompt.text)
+                prompt_builder.record_output(stream.text, len(test_cases))
 
             logger.info(f"Generated test cases for {endpoint.method} {endpoint.path}")
+            return build_generation_record(index, endpoint, test_cases, prompt=prompt)
 
         except Exception as e:
             logger.exception(f"Error generating test cases for {endpoint.path}: {e}")
-            continue
+            return build_generation_record(index, endpoint, [], str(e), prompt)
+
+
+def _split_batch_output(outputs: dict, indices: List[int], endpoints: List[Endpoint]) -> Tuple[List[dict], List[int]]:
+    """Turn a batched completion keyed by operation ID into records, listing endpoints that need a retry."""
+    records, fallback = [], []
+    for index in indices:
+        endpoint = endpoints[index]
+        cases = outputs.get(endpoint.operation_id)
+        test_cases = validate_test_cases(cases, endpoint) if isinstance(cases, list) else []
+        if test_cases:
+            logger.info(f"Generated test cases for {endpoint.method} {endpoint.path} (batched)")
+            records.append(build_generation_record(index, endpoint, test_cases))
+        else:
+            fallback.append(index)
+    return records, fallback
+
+
+def _generate_unit(
+        indices: List[int],
+        prompt: Optional[BuiltPrompt],
+        endpoints: List[Endpoint],
+        llm: BaseChatModel,
+        limiter: RateLimiter,
+        prompt_builder: PromptBuilder,
+        bypass_cache: bool = False
+) -> List[dict]:
+    """Generate one planned unit: a single endpoint, or a batch that falls back to single calls."""
+    if prompt is None:
+        return [_generate_for_endpoint(indices[0], endpoints[indices[0]], llm, limiter, prompt_builder, bypass_cache)]
+
+    outputs = {}
+    try:
+        limiter.acquire_sync(prompt.tokens + llm.max_tokens)
+        raw = llm.generate_response(prompt.text, bypass_cache=bypass_cache)
+        outputs = extract_json_object(raw, llm.model_name)
+    except Exception as e:
+        logger.warning(f"Batched generation for {len(indices)} endpoints failed, falling back to single calls: {e}")
+
+    records, fallback = _split_batch_output(outputs, indices, endpoints)
+    if fallback:
+        llm.evict(prompt.text)
+    if records:
+        prompt_builder.record_output(raw, sum(len(r["test_cases"]) for r in records), len(records))
+    records.extend(
+        _generate_for_endpoint(index, endpoints[index], llm, limiter, prompt_builder, bypass_cache)
+        for index in fallback
+    )
+    return records
+
+
+async def _agenerate_unit(
+        indices: List[int],
+        prompt: Optional[BuiltPrompt],
+        endpoints: List[Endpoint],
+        llm: BaseChatModel,
+        semaphore: asyncio.Semaphore,
+        limiter: RateLimiter,
+        prompt_builder: PromptBuilder,
+        bypass_cache: bool = False
+) -> List[dict]:
+    if prompt is None:
+        index = indices[0]
+        return [await _agenerate_for_endpoint(
+            index, endpoints[index], llm, semaphore, limiter, prompt_builder, bypass_cache
+        )]
+
+    outputs = {}
+    async with semaphore:
+        try:
+            await limiter.acquire(prompt.tokens + llm.max_tokens)
+            raw = await llm.agenerate_response(prompt.text, bypass_cache=bypass_cache)
+            outputs = extract_json_object(raw, llm.model_name)
+        except Exception as e:
+            logger.warning(f"Batched generation for {len(indices)} endpoints failed, falling back to single calls: {e}")
+
+    # Fallback calls acquire the semaphore themselves, so they only start once it is released above
+    records, fallback = _split_batch_output(outputs, indices, endpoints)
+    if fallback:
+        llm.evict(prompt.text)
+    if records:
+        prompt_builder.record_output(raw, sum(len(r["test_cases"]) for r in records), len(records))
+    records.extend(await asyncio.gather(*(
+        _agenerate_for_endpoint(index, endpoints[index], llm, semaphore, limiter, prompt_builder, bypass_cache)
+        for index in fallback
+    )))
+    return records
+
+
+async def agenerate_records(
+        endpoints: List[Endpoint],
+        llm: BaseChatModel,
+        swagger_definitions: Optional[dict] = None,
+        max_concurrency: int = DEFAULT_GENERATION_CONCURRENCY,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        limiter: Optional[RateLimiter] = None,
+        bypass_cache: bool = False,
+        prompt_builder: Optional[PromptBuilder] = None
+) -> AsyncIterator[dict]:
+    """
+    Generate test cases for all endpoints concurrently, with at most `max_concurrency` LLM calls
+    in flight and optional requests/tokens-per-minute limits.
+    Small endpoints are packed into batched prompts when the prompt builder has a batch budget.
+    Yields one per-endpoint record in completion order; each record carries its endpoint index.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    limiter = limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+    prompt_builder = prompt_builder or PromptBuilder(llm.model_name)
+    tasks = [
+        asyncio.ensure_future(_agenerate_unit(
+            indices, prompt, endpoints, llm, semaphore, limiter, prompt_builder, bypass_cache
+        ))
+        for indices, prompt in prompt_builder.plan_batches(endpoints, llm.max_tokens)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for record in await next_done:
+                yield record
+    finally:
+        # Stop outstanding LLM calls if the consumer goes away early
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _drain_async_iterator(async_iterator: AsyncIterator[dict]) -> Iterator[dict]:
+    """Consume an async iterator from synchronous code on a private event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_iterator.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(async_iterator.aclose())
+        loop.close()
+
+
+def iter_generated_test_cases(
+        endpoints: List[Endpoint],
+        llm: BaseChatModel,
+        swagger_definitions: Optional[dict] = None,
+        max_concurrency: int = DEFAULT_GENERATION_CONCURRENCY,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        bypass_cache: bool = False,
+        prompt_builder: Optional[PromptBuilder] = None,
+        generation_mode: str = "llm",
+        offline_fallback: bool = False
+) -> Iterator[dict]:
+    """
+    Generate test cases and yield each endpoint's validated batch as soon as it is ready.
+    Failed endpoints are reported inline through the record's `error` field, unless
+    `offline_fallback` replaces them with rule-based test cases. In "offline" mode every
+    endpoint is generated from its schemas without calling the LLM.
+    The stream ends with a summary record.
+    """
+    if generation_mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode: {generation_mode}")
+    total_cases, failed_endpoints, fallback_endpoints = 0, 0, 0
+
+    if generation_mode == "offline":
+        records = (_offline_record(index, endpoint) for index, endpoint in enumerate(endpoints))
+    elif max_concurrency > 1 and len(endpoints) > 1:
+        records = _drain_async_iterator(agenerate_records(
+            endpoints,
+            llm,
+            swagger_definitions,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            bypass_cache=bypass_cache,
+            prompt_builder=prompt_builder
+        ))
+    else:
+        # Sequential generation honours the same requests/tokens-per-minute limits as the async path
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        prompt_builder = prompt_builder or PromptBuilder(llm.model_name)
+        records = (
+            record
+            for indices, prompt in prompt_builder.plan_batches(endpoints, llm.max_tokens)
+            for record in _generate_unit(indices, prompt, endpoints, llm, limiter, prompt_builder, bypass_cache)
+        )
+
+    for record in records:
+        if record["error"] and offline_fallback and record["generator"] != "offline":
+            logger.warning(f"Falling back to offline generation for {record['path']}: {record['error']}")
+            record = _offline_record(record["index"], endpoints[record["index"]])
+            fallback_endpoints += 1
+        total_cases += len(record["test_cases"])
+        if record["error"]:
+            failed_endpoints += 1
+        yield record
+
+    yield {
+        "type": "summary",
+        "total_endpoints": len(endpoints),
+        "failed_endpoints": failed_endpoints,
+        "fallback_endpoints": fallback_endpoints,
+        "total_test_cases": total_cases,
+    }
+
+
+@traced("generate_test_cases", "generation")
+def generate_test_cases(
+        endpoints: List[Endpoint],
+        llm: BaseChatModel,
+        swagger_definitions: Optional[dict] = None,
+        max_concurrency: int = DEFAULT_GENERATION_CONCURRENCY,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        bypass_cache: bool = False,
+        prompt_builder: Optional[PromptBuilder] = None,
+        generation_mode: str = "llm",
+        offline_fallback: bool = False
+) -> List[dict]:
+    """
+    Generate structured test cases using LLM for a list of Pydantic-defined endpoints.
+    With `max_concurrency` > 1 the endpoints are fanned out over the async LLM path.
+    `bypass_cache` forces fresh completions even when a cached one exists.
+    `generation_mode` and `offline_fallback` select the rule-based generator, see iter_generated_test_cases.
+    `swagger_definitions` is accepted for compatibility; endpoints already carry resolved schemas.
+    """
+
+    if not endpoints:
+        logger.info("No endpoints to generate test cases for.")
+        return []
+
+    raw_test_cases = collect_generated_test_cases(iter_generated_test_cases(
+        endpoints,
+        llm,
+        swagger_definitions,
+        max_concurrency=max_concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        bypass_cache=bypass_cache,
+        prompt_builder=prompt_builder,
+        generation_mode=generation_mode,
+        offline_fallback=offline_fallback
+    ))
 
     logger.info(f"Generated {len(raw_test_cases)} total test cases.")
     return raw_test_cases
 
+
+def collect_generated_test_cases(records: Iterable[dict]) -> List[dict]:
+    """Flatten generation records into one list of test cases in endpoint order."""
+    # Keep the output in endpoint order rather than completion order
+    endpoint_records = sorted((r for r in records if r["type"] == "endpoint"), key=lambda r: r["index"])
+    return [case for record in endpoint_records for case in record["test_cases"]]
+
+
+def regenerate_changed_test_cases(
+        spec_key: str,
+        endpoints: List[Endpoint],
+        llm: BaseChatModel,
+        suite_store: SuiteStore,
+        swagger_definitions: Optional[dict] = None,
+        **generation_options
+) -> Tuple[SpecDiff, List[dict]]:
+    """
+    Diff the endpoints against the suites last stored for `spec_key` and re-prompt only for
+    added or changed operations. Stored suites are reused for unchanged operations and dropped
+    for removed ones. Returns the diff and the full suite in endpoint order.
+    """
+    new_fingerprints = endpoint_fingerprints(endpoints)
+    diff = diff_fingerprints(suite_store.load_fingerprints(spec_key), new_fingerprints)
+    stale = set(diff.added) | set(diff.changed)
+    to_generate = [ep for ep in endpoints if operation_key(ep) in stale]
+
+    logger.info(
+        "Spec %s: %d added, %d changed, %d removed, %d unchanged operations",
+        spec_key, len(diff.added), len(diff.changed), len(diff.removed), len(diff.unchanged)
+    )
+
+    if to_generate:
+        for record in iter_generated_test_cases(to_generate, llm, swagger_definitions, **generation_options):
+            if record["type"] != "endpoint" or record["error"]:
+                # Failed operations keep their previous fingerprint, so they are retried next run
+                continue
+            key = operation_key(to_generate[record["index"]])
+            suite_store.save_suite(spec_key, key, new_fingerprints[key], record["test_cases"])
+
+    suite_store.delete_suites(spec_key, diff.removed)
+
+    test_cases = []
+    for endpoint in endpoints:
+        test_cases.extend(suite_store.load_suite(spec_key, operation_key(endpoint)) or [])
+    return diff, test_cases
+
+
 def is_multipart_request(body) -> bool:
     """Detect if request body has file-like values indicating multipart/form-data."""
     if isinstance(body, (dict, list)):
@@ -298,91 +744,246 @@ def is_multipart_request(body) -> bool:
         return any(contains_file(v) for v in values)
     return False
 
-def send_request(method: str, url: str, headers: dict, body) -> requests.Response:
+def create_session(pool_size: int = DEFAULT_PER_HOST_LIMIT) -> requests.Session:
+    """Create a requests.Session whose connection pools keep `pool_size` connections per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostLimiter:
+    """Hands out one semaphore per host so no target receives more than `limit` concurrent requests."""
+
+    def __init__(self, limit: int = DEFAULT_PER_HOST_LIMIT):
+        self.limit = max(1, limit)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[host]
+
+
+def send_request(method: str, url: str, headers: dict, body, session: Optional[requests.Session] = None) -> requests.Response:
     """
     Send an HTTP request, auto-detecting if multipart/form-data is needed for file uploads.
+    When a session is given its pooled connections are reused.
     """
+    host = urlparse(url).netloc
+    start = time.perf_counter()
+    try:
+        with HTTP_IN_FLIGHT.track_inprogress(host=host), span("send_request", "http", method=method, url=url):
+            response = _send_request(method, url, headers, body, session)
+    except Exception as e:
+        HTTP_ERRORS.inc(host=host, error=type(e).__name__)
+        raise
+    HTTP_LATENCY.observe(time.perf_counter() - start, host=host, method=method)
+    HTTP_RESPONSES.inc(host=host, status=str(response.status_code))
+    return response
+
+
+def _send_request(method: str, url: str, headers: dict, body, session: Optional[requests.Session] = None) -> requests.Response:
     if method == "POST" and is_multipart_request(body):
         data, files = extract_form_data_and_files(body)
         with contextlib.ExitStack() as stack:
             opened_files = {k: stack.enter_context(open(v, "rb")) for k, v in files.items()}
-            return requests.post(url, data=data, files=opened_files, headers=headers)
+            return (session or requests).post(url, data=data, files=opened_files, headers=headers)
+
+    if session is not None:
+        return session.request(method if method in HTTP_METHODS else "GET", url, json=body, headers=headers, timeout=10)
 
     request_func = HTTP_METHODS.get(method, requests.get)
     return request_func(url, json=body, headers=headers, timeout=10)
 
 
-def build_result(status: str, response_time: float, code: int = None, error: str = None) -> dict:
+def build_result(
+        status: str, response_time: float, code: int = None, error: str = None, schema_errors: list = None
+) -> dict:
     """Create a standardized result object for each test case."""
     return {
         "status": status,
         "response_time": response_time,
         "actual_status_code": code,
         "error": error,
+        "schema_errors": schema_errors,
     }
 
 
-def load_base_url() -> str:
-    """Safely load API base URL from config, with fallback."""
+def load_config(config_path: str = "config.yaml") -> dict:
+    """Load config.yaml (or `config_path`), returning an empty dict if it is missing or invalid."""
     try:
-        config_path = os.path.abspath("config.yaml")
+        config_path = os.path.abspath(config_path)
         with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-            return config.get("api", {}).get("base_url", "https://petstore.swagger.io/v2")
-    except (FileNotFoundError, KeyError, yaml.YAMLError) as e:
-        logger.error("Error loading configuration: %s. Using default base URL.", e)
-        return "https://petstore.swagger.io/v2"
-
-
-def execute_test_cases(test_cases: list) -> dict:
-    """
-    Executes a list of test cases and returns a detailed report including summary.
-    """
-    results = {}
-    total_cases, passed_cases, failed_cases = 0, 0, 0
-    start_time = time.time()
-    base_url = load_base_url()
+            return yaml.safe_load(f) or {}
+    except (FileNotFoundError, yaml.YAMLError) as e:
+        logger.error("Error loading configuration: %s.", e)
+        return {}
 
-    for test_case in test_cases:
-        total_cases += 1
 
-        test_name = test_case.get("Test Case Name", "Unnamed")
-        request_body = test_case.get("Request Body", {})
-        expected_status = test_case.get("Expected Status Code", 200)
-        headers = test_case.get("Headers", {})
-        method = test_case.get("Method", "GET").upper()
-        endpoint = test_case.get("Endpoint", "")
-        url = f"{base_url}{endpoint}"
+def load_base_url() -> str:
+    """Safely load API base URL from config, with fallback."""
+    return load_config().get("api", {}).get("base_url", "https://petstore.swagger.io/v2")
 
-        logger.info("Executing: [%s] %s %s", test_name, method, url)
-        logger.debug("Payload: %s | Headers: %s", request_body, headers)
 
+def run_test_case(
+        test_case: dict,
+        base_url: str,
+        session: Optional[requests.Session] = None,
+        host_limiter: Optional[HostLimiter] = None,
+        response_validator: Optional[ResponseValidator] = None,
+        on_response: Optional[Callable[[requests.Response], None]] = None
+) -> Tuple[str, dict]:
+    """
+    Execute a single test case and return its name together with its result object.
+    With a `response_validator`, a response whose body does not match its documented schema fails.
+    `on_response` is called with the raw response, e.g. to capture IDs for later requests.
+    """
+    test_name = test_case.get("Test Case Name", "Unnamed")
+    request_body = test_case.get("Request Body", {})
+    expected_status = test_case.get("Expected Status Code", 200)
+    headers = test_case.get("Headers", {})
+    method = test_case.get("Method", "GET").upper()
+    endpoint = test_case.get("Endpoint", "")
+    url = f"{base_url}{endpoint}"
+
+    logger.info("Executing: [%s] %s %s", test_name, method, url)
+    logger.debug("Payload: %s | Headers: %s", request_body, headers)
+
+    with span("run_test_case", "execution", test_case=test_name):
+        limit = host_limiter.for_url(url) if host_limiter else contextlib.nullcontext()
         try:
-            start = time.time()
-            response = send_request(method, url, headers, request_body)
-            duration = time.time() - start
+            with limit:
+                start = time.time()
+                response = send_request(method, url, headers, request_body, session=session)
+                duration = time.time() - start
+
+            if on_response is not None:
+                on_response(response)
+            schema_errors = response_validator.validate(test_case, response.status_code, response.content) if response_validator else None
+            if schema_errors:
+                logger.error(
+                    "Test Case: %s - FAILED - Response body does not match the schema: %s", test_name, schema_errors,
+                    extra={"test_case": test_name, "sample_key": ("schema", method, test_case.get("Operation ID") or endpoint)}
+                )
+                return test_name, build_result("FAILED", duration, response.status_code, schema_errors=schema_errors)
 
             if response.status_code == expected_status:
-                passed_cases += 1
-                results[test_name] = build_result("PASSED", duration, response.status_code)
-                logger.info(f"Test Case: {test_name} - PASSED - Status Code: {response.status_code} - Time: {duration:.4f}s")
-            else:
-                failed_cases += 1
-                results[test_name] = build_result("FAILED", duration, response.status_code)
-                logger.error(f"Test Case: {test_name} - FAILED - Expected: {expected_status}, Got: {response.status_code} - Response: {response.text}")
+                logger.info("Test Case: %s - PASSED - Status Code: %s - Time: %.4fs", test_name, response.status_code, duration)
+                return test_name, build_result("PASSED", duration, response.status_code, schema_errors=schema_errors)
+
+            # Repeated failures of one operation with the same status are sampled, and bodies truncated
+            logger.error(
+                "Test Case: %s - FAILED - Expected: %s, Got: %s - Response: %s",
+                test_name, expected_status, response.status_code, truncate_body(response.text),
+                extra={"test_case": test_name, "status_code": response.status_code,
+                       "sample_key": ("status", method, test_case.get("Operation ID") or endpoint, response.status_code)}
+            )
+            return test_name, build_result("FAILED", duration, response.status_code, schema_errors=schema_errors)
 
         except requests.exceptions.RequestException as e:
-            failed_cases += 1
-            results[test_name] = build_result("ERROR", None, error=str(e))
-            logger.error("ERROR [%s] - Exception: %s", test_name, str(e), exc_info=True)
-
-    total_time = time.time() - start_time
-    results["summary"] = {
+            logger.error("ERROR [%s] - Exception: %s", test_name, str(e), exc_info=True,
+                         extra={"test_case": test_name, "sample_key": ("error", method, type(e).__name__)})
+            return test_name, build_result("ERROR", None, error=str(e))
+
+
+def iter_test_results(
+        test_cases: Iterable[dict],
+        max_workers: int = DEFAULT_EXECUTION_WORKERS,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        response_validator: Optional[ResponseValidator] = None,
+        base_url: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Execute test cases and yield one result record per case as soon as it completes,
+    followed by a final summary record. Only a bounded window of cases is in flight,
+    so memory stays flat regardless of suite size.
+    Response bodies are checked against their schemas when a `response_validator` is given.
+    `base_url` defaults to api.base_url from config.yaml.
+    """
+    total_cases, passed_cases, failed_cases = 0, 0, 0
+    start_time = time.time()
+    base_url = base_url or load_base_url()
+    host_limiter = HostLimiter(per_host_limit)
+    max_workers = max(1, max_workers)
+    cases = enumerate(test_cases)
+    run_case = bind(run_test_case)  # Keeps worker spans in the current trace, if any
+
+    with create_session(host_limiter.limit) as session:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            def submit(index, test_case):
+                future = executor.submit(run_case, test_case, base_url, session, host_limiter, response_validator)
+                pending[future] = index
+
+            pending = {}
+            for index, test_case in itertools.islice(cases, max_workers * 2):
+                submit(index, test_case)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    test_name, result = future.result()
+                    total_cases += 1
+                    if result["status"] == "PASSED":
+                        passed_cases += 1
+                    else:
+                        failed_cases += 1
+                    yield {"type": "result", "index": index, "test_case_name": test_name, **result}
+
+                    next_case = next(cases, None)
+                    if next_case is not None:
+                        submit(*next_case)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    yield {
+        "type": "summary",
         "total_cases": total_cases,
         "passed_cases": passed_cases,
         "failed_cases": failed_cases,
-        "total_time": total_time,
+        "total_time": time.time() - start_time,
     }
+
+
+@traced("execute_test_cases", "execution")
+def execute_test_cases(
+        test_cases: list,
+        max_workers: int = DEFAULT_EXECUTION_WORKERS,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        response_validator: Optional[ResponseValidator] = None,
+        base_url: Optional[str] = None
+) -> dict:
+    """
+    Executes a list of test cases and returns a detailed report including summary.
+    Test cases run on `max_workers` threads sharing one pooled session, with at most
+    `per_host_limit` requests in flight against any single host.
+    """
+    return collect_test_results(iter_test_results(test_cases, max_workers, per_host_limit, response_validator, base_url))
+
+
+def collect_test_results(records: Iterable[dict]) -> dict:
+    """Build the execute_test_cases report (results by test name plus "summary") from result records."""
+    results_records = []
+    summary = {}
+    for record in records:
+        if record["type"] == "summary":
+            summary = {k: v for k, v in record.items() if k != "type"}
+        else:
+            results_records.append(record)
+
+    # Keep the report in test case order rather than completion order
+    results = {}
+    for record in sorted(results_records, key=lambda r: r["index"]):
+        results[record["test_case_name"]] = {
+            k: v for k, v in record.items() if k not in ("type", "index", "test_case_name")
+        }
+    results["summary"] = summary
     return results
 
 def contains_file(value):
@@ -412,10 +1013,23 @@ def extract_form_data_and_files(body):
     return data, files
 
 
-def extract_json_array(llm_output: str) -> List[dict]:
+@traced("extract_json_array", "parse")
+def extract_json_array(llm_output: str, model_name: str = "") -> List[dict]:
     """
     Tries to robustly extract a JSON array from the LLM output, even if it's slightly malformed.
     """
+    return _parse_llm_json(llm_output, list, "JSON array", model_name)
+
+
+@traced("extract_json_object", "parse")
+def extract_json_object(llm_output: str, model_name: str = "") -> dict:
+    """
+    Tries to robustly extract a JSON object from the LLM output, even if it's slightly malformed.
+    """
+    return _parse_llm_json(llm_output, dict, "JSON object", model_name)
+
+
+def _parse_llm_json(llm_output: str, expected_type: type, structure: str, model_name: str = ""):
     llm_output = llm_output.strip()
 
     # Remove markdown fencing if any
@@ -427,93 +1041,44 @@ def extract_json_array(llm_output: str) -> List[dict]:
     # First try direct JSON parse
     try:
         parsed = json.loads(llm_output)
-        if isinstance(parsed, list):
+        if isinstance(parsed, expected_type):
+            LLM_OUTPUT_PARSE.inc(model=model_name, result="direct")
             return parsed
         else:
-            raise ValueError("Top-level structure is not a JSON array.")
+            LLM_OUTPUT_PARSE.inc(model=model_name, result="failed")
+            raise ValueError(f"Top-level structure is not a {structure}.")
     except json.JSONDecodeError as e:
         pass  # Proceed to fallback
 
     # Attempt to fix common issues:
     fixed = None
     try:
-        # Replace single quotes with double quotes
-        fixed = re.sub(r"(?<!\\)'", '"', llm_output)
-
-        # Remove trailing commas
-        fixed = re.sub(r",(\s*[}\]])", r"\1", fixed)
-
-        # Remove comments if any (// or # style)
-        fixed = re.sub(r"(?m)^\s*(//|#).*$", "", fixed)
-
-        # Fix some missing commas between string-ending and next key
-        fixed = re.sub(r'(":[^"]*")(\s*")', r'\1,\2', fixed)  # "...": "val" "next"
-        fixed = re.sub(r'(\}|\])\s*{', r'\1, {', fixed)  # } { → }, {
+        fixed = repair_json(llm_output)
 
         # Retry parsing
         parsed = json.loads(fixed)
-        if not isinstance(parsed, list):
-            raise ValueError("Fixed structure is not a JSON array.")
+        if not isinstance(parsed, expected_type):
+            raise ValueError(f"Fixed structure is not a {structure}.")
+        LLM_OUTPUT_PARSE.inc(model=model_name, result="repaired")
         return parsed
     except Exception as e:
+        LLM_OUTPUT_PARSE.inc(model=model_name, result="failed")
         logger.error("Failed to parse LLM JSON output. Output:\n%s", fixed)
         raise ValueError(f"LLM response is not valid JSON even after fixing: {e}")
 
 
 def resolve_schema_refs(schema: dict, definitions: dict) -> dict:
     """
-    Recursively resolve $ref objects in a Swagger schema using provided definitions.
+    Resolve $ref objects in a Swagger schema using provided definitions.
+    Prefer a shared SchemaResolver when resolving many schemas from the same spec.
     """
-    if not isinstance(schema, dict):
-        return schema
-
-    if "$ref" in schema:
-        ref_path = schema["$ref"]
-        ref_key = ref_path.split("/")[-1]
-        resolved = definitions.get(ref_key, {})
-        return resolve_schema_refs(resolved, definitions)
-
-    if "items" in schema:
-        schema["items"] = resolve_schema_refs(schema["items"], definitions)
+    return SchemaResolver(definitions).resolve(schema)
 
-    if "properties" in schema:
-        for prop, val in schema["properties"].items():
-            schema["properties"][prop] = resolve_schema_refs(val, definitions)
 
-    if not schema or schema == {}:
-        return {}
-
-    return schema
-
-
-def build_sample_payload(schema: dict) -> dict:
-    fake = Faker()
-    result = {}
-
-    properties = schema.get("properties", {})
-
-    for key, value in properties.items():
-        if value.get("type") == "string" and value.get("format") == "binary":
-            result[key] = "/path/to/cat.jpg"
-
-        elif value.get("type") == "string":
-            if "enum" in value and value["enum"]:
-                result[key] = value["enum"][0]
-            elif "example" in value:
-                result[key] = value["example"]
-            else:
-                result[key] = fake.word()
-        elif value.get("type") == "integer":
-            result[key] = fake.random_int()
-        elif value.get("type") == "array":
-            item = value.get("items", {})
-            if item.get("type") == "string":
-                result[key] = [fake.word()]
-            elif item.get("type") == "object":
-                result[key] = [build_sample_payload(item)]
-        elif value.get("type") == "object":
-            result[key] = build_sample_payload(value)
-        else:
-            result[key] = None
-
-    return result
+def build_sample_payload(schema: dict, fake: Optional[Faker] = None) -> dict:
+    """
+    Sample request body for a resolved object schema, drawn from `fake`'s random source when given.
+    Prefer compiling the schema once with utils.payload_synth.compile_schema when generating many payloads.
+    """
+    payload = compile_schema(schema).generate(fake.random if fake else None)
+    return payload if payload is not None else {}
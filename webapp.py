@@ -1,23 +1,274 @@
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, render_template, make_response
+from flask import Flask, Response, g, request, jsonify, render_template, make_response, stream_with_context
 
-from utils.constants import DEFAULT_MODEL
+from logger_config import setup_logging
+from utils.constants import (
+    DEFAULT_MODEL,
+    DEFAULT_GENERATION_CONCURRENCY,
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_EXECUTION_WORKERS,
+    DEFAULT_MAX_PROMPT_TOKENS,
+    DEFAULT_MAX_SCHEMA_DEPTH,
+    DEFAULT_PER_HOST_LIMIT,
+    DEFAULT_SPEC_STORE_ENTRIES,
+    EXECUTION_SCHEDULES,
+    GENERATION_MODES,
+    DEFAULT_JOB_WORKERS,
+    DEFAULT_LOAD_TEST_CONCURRENCY,
+    DEFAULT_LOAD_TEST_DURATION,
+    DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS,
+    MAX_LOAD_TEST_DURATION,
+    JOB_STORE_PATH,
+    LLM_CACHE_PATH,
+    SPEC_CACHE_DIR,
+    SUPPORTED_MODELS,
+    SUITE_STORE_PATH,
+)
+from utils.export import EXPORT_FORMATS, export_test_cases
+from utils.jobs import FINISHED_STATUSES, SUCCEEDED, JobQueue, JobStore
+from utils.llm_cache import LLMCache
 from utils.llm_manager import LLMManager
+from utils.llm_pool import LLMPool
+from utils.load_test import collect_load_test_report, happy_path_cases, iter_load_test, load_test_report_to_csv
+from utils.metrics import REGISTRY
+from utils.prompt_builder import PromptBuilder
+from utils.response_validator import ResponseValidator
+from utils.scheduler import iter_scheduled_test_results
+from utils.tracing import TRACES, TraceRecorder, configure_tracing, iter_traced, recording, start_run
+from utils.spec_cache import SpecCache
+from utils.spec_diff import diff_fingerprints, endpoint_fingerprints
+from utils.spec_store import SpecStore, StoredSpec
+from utils.suite_store import SuiteStore
 from utils.models import Endpoint
-from utils.utils import extract_endpoints_from_swagger, generate_test_cases, execute_test_cases
+from utils.utils import (
+    collect_generated_test_cases,
+    collect_test_results,
+    extract_endpoints_from_swagger,
+    is_remote_spec,
+    iter_generated_test_cases,
+    iter_test_results,
+    load_config,
+    regenerate_changed_test_cases,
+)
 import os
-import csv
-from io import StringIO
+import itertools
 import json
+import math
+from typing import Optional, Tuple
 
 app = Flask(__name__)
 load_dotenv()
 
-# Check for API key at startup
-if not os.getenv("OPENAI_API_KEY"):
+config = load_config()
+setup_logging(config.get("logging"))
+configure_tracing(config.get("tracing"))
+llm_config = config.get("llm", {})
+llm_models = llm_config.get("models") or [DEFAULT_MODEL]
+
+# Check for API key at startup, unless every configured model runs locally
+if not os.getenv("OPENAI_API_KEY") and any(
+        SUPPORTED_MODELS.get(name, {}).get("provider") == "openai" for name in llm_models):
     raise ValueError("OPENAI_API_KEY environment variable not set. Please set it before running the application.")
 
-llm = LLMManager.get_instance(DEFAULT_MODEL)
+generation_config = config.get("generation", {})
+cache_config = config.get("cache", {})
+execution_config = config.get("execution", {})
+prompt_config = config.get("prompt", {})
+
+llm_cache = None
+if cache_config.get("enabled", True):
+    max_age_days = cache_config.get("max_age_days")
+    llm_cache = LLMCache(
+        cache_config.get("path", LLM_CACHE_PATH),
+        max_entries=cache_config.get("max_entries", 10000),
+        max_age_seconds=max_age_days * 86400 if max_age_days else None
+    )
+# One model is used directly; several are pooled with routing, retries and hedging
+llm_pool = LLMPool.from_config({**llm_config, "models": llm_models}, llm_cache) if len(llm_models) > 1 else None
+llm = llm_pool or LLMManager.get_instance(llm_models[0], cache=llm_cache, timeout=llm_config.get("timeout_seconds"))
+prompt_builder = PromptBuilder(
+    model_name=llm.model_name,
+    max_prompt_tokens=prompt_config.get("max_prompt_tokens", DEFAULT_MAX_PROMPT_TOKENS),
+    max_schema_depth=prompt_config.get("max_schema_depth", DEFAULT_MAX_SCHEMA_DEPTH),
+    report_savings=prompt_config.get("report_savings", False),
+    batch_token_budget=prompt_config.get("batch_token_budget"),
+    max_batch_size=prompt_config.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE)
+)
+
+spec_cache_config = config.get("spec_cache", {})
+spec_cache = SpecCache(
+    cache_dir=spec_cache_config.get("dir", SPEC_CACHE_DIR),
+    max_entries=spec_cache_config.get("max_entries", 32)
+)
+suite_store = SuiteStore(config.get("suite_store", {}).get("path", SUITE_STORE_PATH))
+
+jobs_config = config.get("jobs", {})
+spec_store = SpecStore(config.get("spec_store", {}).get("max_entries", DEFAULT_SPEC_STORE_ENTRIES))
+
+job_queue = JobQueue(
+    JobStore(jobs_config.get("path", JOB_STORE_PATH)),
+    max_workers=jobs_config.get("max_workers", DEFAULT_JOB_WORKERS)
+)
+
+
+def generation_options() -> dict:
+    """Concurrency, rate limits and prompt building for generate_test_cases, taken from config.yaml."""
+    return {
+        "prompt_builder": prompt_builder,
+        "max_concurrency": generation_config.get("max_concurrency", DEFAULT_GENERATION_CONCURRENCY),
+        "requests_per_minute": generation_config.get("requests_per_minute"),
+        "tokens_per_minute": generation_config.get("tokens_per_minute"),
+        "generation_mode": generation_config.get("mode", "llm"),
+        "offline_fallback": generation_config.get("offline_fallback", False),
+    }
+
+
+def execution_options() -> dict:
+    """Worker pool size and per-host concurrency for execute_test_cases, taken from config.yaml."""
+    return {
+        "max_workers": execution_config.get("max_workers", DEFAULT_EXECUTION_WORKERS),
+        "per_host_limit": execution_config.get("per_host_limit", DEFAULT_PER_HOST_LIMIT),
+    }
+
+
+# Supported values for the "stream" flag of streaming routes
+STREAM_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def request_run() -> Optional[TraceRecorder]:
+    """Start tracing this request as a run, reported in the X-Run-Id header; None when tracing is off."""
+    recorder = start_run()
+    if recorder is not None:
+        g.run_id = recorder.run_id
+    return recorder
+
+
+@app.after_request
+def add_run_id(response):
+    run_id = g.get("run_id")
+    if run_id:
+        response.headers["X-Run-Id"] = run_id
+    return response
+
+
+def stream_records(records, stream_format: str):
+    """Serialize records one per line (NDJSON) or one per event (SSE) as they are produced."""
+    for record in records:
+        line = json.dumps(record)
+        yield f"data: {line}\n\n" if stream_format == "sse" else line + "\n"
+
+
+def streaming_response(records, stream_format: str) -> Response:
+    response = Response(stream_with_context(stream_records(records, stream_format)), mimetype=STREAM_MIMETYPES[stream_format])
+    # Stop reverse proxies from buffering the stream until it completes
+    response.headers["X-Accel-Buffering"] = "no"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def parse_endpoints(endpoints) -> list:
+    # Ensure endpoints is a list of dictionaries, even if it's just one
+    if not isinstance(endpoints, list):
+        endpoints = [endpoints]
+    return [Endpoint(**ep) for ep in endpoints]
+
+
+def stored_spec_for(data: dict) -> Optional[StoredSpec]:
+    """The spec referenced by the request's `spec_id`, or None when the request posts its data in full."""
+    spec_id = data.get("spec_id")
+    if not spec_id:
+        return None
+    stored = spec_store.get(spec_id)
+    if stored is None:
+        raise LookupError(f"Unknown or expired spec_id {spec_id}; extract the spec again")
+    return stored
+
+
+def generation_request(data: dict, operations=None) -> Tuple[list, Optional[StoredSpec]]:
+    """
+    Endpoints to generate for, referenced by `spec_id` plus operation keys or posted in full.
+    Raises LookupError for unknown handles and ValueError for invalid endpoint data.
+    """
+    if data.get("mode") and data["mode"] not in GENERATION_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(GENERATION_MODES)}")
+    stored = stored_spec_for(data)
+    if stored is not None:
+        return stored.select(operations), stored
+
+    endpoints = data.get("endpoints") or data.get("endpoint")
+    if not endpoints:
+        raise ValueError("No endpoints provided")
+    try:
+        return parse_endpoints(endpoints), None
+    except Exception as e:
+        raise ValueError(f"Invalid endpoint data: {str(e)}")
+
+
+def iter_generation(endpoints: list, stored: Optional[StoredSpec], data: dict):
+    options = generation_options()
+    if data.get("mode"):
+        options["generation_mode"] = data["mode"]
+    records = iter_generated_test_cases(
+        endpoints,
+        llm=llm,
+        swagger_definitions=stored.definitions if stored else data.get("definitions", {}),
+        bypass_cache=bool(data.get("force", False)),
+        **options
+    )
+    # Suites generated for a stored spec are kept so later calls can reference them by ID
+    return stored.remember_suites(endpoints, records) if stored else records
+
+
+def execution_request(data: dict) -> Tuple[list, Optional[StoredSpec]]:
+    """Test cases to run: the stored suites of `spec_id` (optionally narrowed to `operations`) or posted in full."""
+    if data.get("schedule") and data["schedule"] not in EXECUTION_SCHEDULES:
+        raise ValueError(f"schedule must be one of: {', '.join(EXECUTION_SCHEDULES)}")
+    stored = stored_spec_for(data)
+    if stored is not None:
+        test_cases = stored.test_cases(data.get("operations"))
+    else:
+        test_cases = data.get("test_cases", [])
+    if not test_cases:
+        raise ValueError("No test cases provided")
+    return test_cases, stored
+
+
+def spec_endpoints_for(data: dict, stored: Optional[StoredSpec]) -> Optional[list]:
+    """Endpoints of the spec the test cases came from: the stored spec or the posted `endpoints`."""
+    if stored is not None:
+        return stored.select()
+    if data.get("endpoints"):
+        return parse_endpoints(data["endpoints"])
+    return None
+
+
+def response_validator_for(data: dict, stored: Optional[StoredSpec]) -> Optional[ResponseValidator]:
+    """
+    Validator for response bodies when validation is enabled (config or the request's
+    `validate_responses` flag), built from the stored spec or the posted `endpoints`.
+    """
+    if not data.get("validate_responses", execution_config.get("validate_responses", False)):
+        return None
+    if stored is not None:
+        return stored.response_validator
+    endpoints = spec_endpoints_for(data, stored)
+    return ResponseValidator(endpoints) if endpoints else None
+
+
+def iter_execution(test_cases: list, stored: Optional[StoredSpec], data: dict):
+    validator = response_validator_for(data, stored)
+    schedule = data.get("schedule", execution_config.get("schedule", "parallel"))
+    endpoints = spec_endpoints_for(data, stored) if schedule == "dependencies" else None
+    if endpoints:
+        # Resource chains run in create/use/delete order with captured IDs; chains run concurrently
+        records = iter_scheduled_test_results(test_cases, endpoints, response_validator=validator, **execution_options())
+    else:
+        records = iter_test_results(test_cases, response_validator=validator, **execution_options())
+    return stored.remember_results(test_cases, records) if stored else records
+
 
 @app.route('/')
 def index():
@@ -29,35 +280,41 @@ def extract_endpoints():
     swagger_url = data.get("swagger_url")
     if not swagger_url:
         return jsonify({"error": "Swagger URL is required"}), 400
+    if not is_remote_spec(swagger_url):
+        return jsonify({"error": "Swagger URL must be an http(s) URL"}), 400
 
-    extracted_data = extract_endpoints_from_swagger(swagger_url)
+    with recording(request_run(), "extract_endpoints"):
+        extracted_data = extract_endpoints_from_swagger(swagger_url, spec_cache=spec_cache)
     if not extracted_data.endpoints:
         return jsonify({"error": "No endpoints found or error extracting from URL"}), 404
 
+    stored = spec_store.put(swagger_url, extracted_data)
     return jsonify({
         "title": "Extracted Endpoints",
-        "endpoints": [ep.model_dump(by_alias=True) for ep in extracted_data.endpoints],
+        "spec_id": stored.spec_id,
+        "endpoints": [
+            {"operation_key": key, **ep.model_dump(by_alias=True)} for key, ep in stored.endpoints.items()
+        ],
         "definitions": extracted_data.definitions or {},
     })
 
 @app.route('/generate_tests', methods=['POST'])
 def generate_tests():
     data = request.get_json()
-    endpoints = data.get("endpoints", [])
-    definitions = data.get("definitions", {})
-    if not endpoints:
-        return jsonify({"error": "No endpoints provided"}), 400
-
-    # Ensure endpoints is a list of dictionaries, even if it's just one
-    if not isinstance(endpoints, list):
-        endpoints = [endpoints]
-
     try:
-        parsed_endpoints = [Endpoint(**ep) for ep in endpoints]
-    except Exception as e:
-        return jsonify({"error": f"Invalid endpoint data: {str(e)}"}), 400
+        parsed_endpoints, stored = generation_request(data, data.get("operations"))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    records = iter_traced(request_run(), iter_generation(parsed_endpoints, stored, data), "generate_tests")
+    stream_format = data.get("stream")
+    if stream_format in STREAM_MIMETYPES:
+        # One record per endpoint as soon as its batch is validated, then a final summary record
+        return streaming_response(records, stream_format)
 
-    test_cases = generate_test_cases(parsed_endpoints, llm=llm, swagger_definitions=definitions)
+    test_cases = collect_generated_test_cases(records)
     if not test_cases:
         return jsonify({"error": "Failed to generate any test cases"}), 500
     return jsonify({"test_cases": test_cases})
@@ -66,79 +323,268 @@ def generate_tests():
 @app.route('/generate_single_test', methods=['POST'])
 def generate_single_test():
     data = request.get_json()
-    endpoint = data.get("endpoint")
-    definitions = data.get("definitions", {})
-    parsed_endpoints = [Endpoint(**endpoint)]
-    if not endpoint:
-        return jsonify({"error": "No endpoint provided"}), 400
-
-    # generate_test_cases expects a list, so wrap the single endpoint
-    test_cases = generate_test_cases(parsed_endpoints, llm=llm, swagger_definitions=definitions)
+    try:
+        operation = data.get("operation")
+        parsed_endpoints, stored = generation_request(data, [operation] if operation else None)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if stored is not None and not operation:
+        return jsonify({"error": "No operation provided"}), 400
+
+    records = iter_traced(request_run(), iter_generation(parsed_endpoints[:1], stored, data), "generate_single_test")
+    test_cases = collect_generated_test_cases(records)
     if not test_cases:
         return jsonify({"error": "Failed to generate test cases for the specified endpoint"}), 500
     return jsonify({"test_cases": test_cases})
 
 
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    if llm_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **llm_cache.stats()})
+
+
+@app.route('/llm_stats', methods=['GET'])
+def llm_stats():
+    if llm_pool is None:
+        return jsonify({"pooled": False, "models": [llm.model_name]})
+    return jsonify({"pooled": True, "models": llm_pool.stats_snapshot()})
+
+
+@app.route('/runs/<run_id>/trace', methods=['GET'])
+def run_trace(run_id):
+    """The run's timeline in Chrome trace format, for chrome://tracing or ui.perfetto.dev."""
+    recorder = TRACES.get(run_id)
+    if recorder is None:
+        return jsonify({"error": "Unknown run, or tracing is disabled"}), 404
+    response = make_response(json.dumps(recorder.to_chrome()))
+    response.headers["Content-Type"] = "application/json"
+    response.headers["Content-Disposition"] = f"attachment; filename=trace_{run_id}.json"
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text exposition format
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route('/diff_spec', methods=['POST'])
+def diff_spec():
+    data = request.get_json()
+    swagger_url = data.get("swagger_url")
+    if not swagger_url:
+        return jsonify({"error": "Swagger URL is required"}), 400
+    if not is_remote_spec(swagger_url):
+        return jsonify({"error": "Swagger URL must be an http(s) URL"}), 400
+
+    extracted_data = extract_endpoints_from_swagger(swagger_url, spec_cache=spec_cache)
+    if not extracted_data.endpoints:
+        return jsonify({"error": "No endpoints found or error extracting from URL"}), 404
+
+    diff = diff_fingerprints(suite_store.load_fingerprints(swagger_url), endpoint_fingerprints(extracted_data.endpoints))
+    return jsonify(diff.model_dump())
+
+
+@app.route('/regenerate_tests', methods=['POST'])
+def regenerate_tests():
+    data = request.get_json()
+    swagger_url = data.get("swagger_url")
+    if not swagger_url:
+        return jsonify({"error": "Swagger URL is required"}), 400
+    if not is_remote_spec(swagger_url):
+        return jsonify({"error": "Swagger URL must be an http(s) URL"}), 400
+
+    with recording(request_run(), "regenerate_tests"):
+        extracted_data = extract_endpoints_from_swagger(swagger_url, spec_cache=spec_cache)
+        if not extracted_data.endpoints:
+            return jsonify({"error": "No endpoints found or error extracting from URL"}), 404
+
+        diff, test_cases = regenerate_changed_test_cases(
+            swagger_url,
+            extracted_data.endpoints,
+            llm,
+            suite_store,
+            swagger_definitions=extracted_data.definitions,
+            bypass_cache=bool(data.get("force", False)),
+            **generation_options()
+        )
+    return jsonify({"diff": diff.model_dump(), "test_cases": test_cases})
+
+
 @app.route('/execute_tests', methods=['POST'])
 def execute_tests():
     data = request.get_json()
-    test_cases = data.get("test_cases", [])
-    if not test_cases:
-        return jsonify({"error": "No test cases provided"}), 400
+    try:
+        test_cases, stored = execution_request(data)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    records = iter_traced(request_run(), iter_execution(test_cases, stored, data), "execute_tests")
+    stream_format = data.get("stream")
+    if stream_format in STREAM_MIMETYPES:
+        # One record per finished test case, then a final summary record
+        return streaming_response(records, stream_format)
+
+    # Results by test case name plus an overall summary
+    return jsonify(collect_test_results(records))
+
+
+@app.route('/jobs/generate_tests', methods=['POST'])
+def submit_generation_job():
+    data = request.get_json()
+    try:
+        parsed_endpoints, stored = generation_request(data, data.get("operations"))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    job_id = job_queue.submit(
+        "generate_tests",
+        len(parsed_endpoints),
+        lambda: iter_generation(parsed_endpoints, stored, data),
+        lambda records: {"test_cases": collect_generated_test_cases(records)}
+    )
+    return jsonify({"job_id": job_id}), 202
+
+
+@app.route('/jobs/execute_tests', methods=['POST'])
+def submit_execution_job():
+    data = request.get_json()
+    try:
+        test_cases, stored = execution_request(data)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    job_id = job_queue.submit(
+        "execute_tests",
+        len(test_cases),
+        lambda: iter_execution(test_cases, stored, data),
+        collect_test_results
+    )
+    return jsonify({"job_id": job_id}), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
+@app.route('/jobs/<job_id>/records', methods=['GET'])
+def job_records(job_id):
+    # Partial results: the records produced after sequence number `after`
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    records = job_queue.store.load_records(job_id, after=request.args.get("after", 0, type=int))
+    return jsonify({"job": job, "records": records})
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != SUCCEEDED:
+        return jsonify({"error": f"Job is {job['status']}", "job": job}), 409
+    result = job_queue.store.load_result(job_id)
+    if job["kind"] == "load_test" and request.args.get("format") == "csv":
+        response = make_response(load_test_report_to_csv(result))
+        response.headers["Content-Disposition"] = "attachment; filename=load_test_report.csv"
+        response.headers["Content-type"] = "text/csv"
+        return response
+    return jsonify(result)
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] in FINISHED_STATUSES or not job_queue.cancel(job_id):
+        return jsonify({"error": f"Job is already {job['status']}", "job": job}), 409
+    return jsonify({"job_id": job_id, "cancelling": True})
+
+
+@app.route('/load_test', methods=['POST'])
+def load_test():
+    data = request.get_json()
+    try:
+        test_cases, stored = execution_request(data)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    load_test_config = config.get("load_test", {})
+    max_duration = load_test_config.get("max_duration_seconds", MAX_LOAD_TEST_DURATION)
+    try:
+        duration = float(data.get("duration", load_test_config.get("duration_seconds", DEFAULT_LOAD_TEST_DURATION)))
+        target_rps = float(data["target_rps"]) if data.get("target_rps") else None
+        concurrency = int(data.get("concurrency", load_test_config.get("concurrency", DEFAULT_LOAD_TEST_CONCURRENCY)))
+        variants = int(data.get(
+            "payload_variants", load_test_config.get("payload_variants", DEFAULT_LOAD_TEST_PAYLOAD_VARIANTS)
+        ))
+    except (TypeError, ValueError):
+        return jsonify({"error": "duration, target_rps, concurrency and payload_variants must be numbers"}), 400
+    if not 0 < duration <= max_duration:
+        return jsonify({"error": f"duration must be between 0 and {max_duration} seconds"}), 400
+    if not happy_path_cases(test_cases):
+        return jsonify({"error": "No happy-path (2xx) test cases to replay."}), 400
+    endpoints = spec_endpoints_for(data, stored)
+
+    # Runs for up to max_duration seconds, so it is queued instead of holding a request thread;
+    # progress records arrive once a second and the report is the job's result
+    job_id = job_queue.submit(
+        "load_test",
+        math.ceil(duration),
+        lambda: iter_load_test(
+            test_cases,
+            duration_seconds=duration,
+            target_rps=target_rps,
+            concurrency=concurrency,
+            per_host_limit=execution_options()["per_host_limit"],
+            endpoints=endpoints,
+            variants=variants
+        ),
+        collect_load_test_report
+    )
+    return jsonify({"job_id": job_id}), 202
 
-    results = execute_test_cases(test_cases)
-    # The execute_test_cases function already returns a dictionary with summary and individual results
-    return jsonify(results)
 
 @app.route('/download_test_cases', methods=['POST'])
 def download_test_cases():
     data = request.json
-    test_cases = data.get('test_cases', [])
+    export_format = data.get("format", "csv")
+    try:
+        stored = stored_spec_for(data)
+        # Stored suites are exported together with their latest execution results
+        test_cases = iter(stored.iter_test_cases(data.get("operations"), with_results=True) if stored else data.get('test_cases', []))
+        # Peek so an empty selection is still reported as an error rather than an empty file
+        first = next(test_cases, None)
+        if first is None:
+            return jsonify({"error": "No test cases provided for download."}), 400
+        chunks = export_test_cases(itertools.chain([first], test_cases), export_format)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if not test_cases:
-        return jsonify({"error": "No test cases provided for download."}), 400
-
-    # Define the CSV headers based on your test case structure
-    # Ensure all possible keys are included here. Keys from generated tests + keys from execution results.
-    headers = [
-        "Test Case Name",
-        "Description",
-        "Endpoint",
-        "Method",
-        "Operation ID",
-        "Summary",
-        "Request Body",  # Will be stringified JSON
-        "Expected Status Code",
-        "Headers",  # Will be stringified JSON
-        "Actual Status Code",  # From execution results
-        "Status",  # From execution results (Passed/Failed/Error)
-        "Error",  # From execution results
-        "Response Time"  # From execution results
-    ]
-
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=headers)
-
-    writer.writeheader()
-    for tc in test_cases:
-        row = {}
-        for header in headers:
-            # Get the value, default to empty string if not found
-            value = tc.get(header, '')
-
-            # Convert dicts (Request Body, Headers) to JSON strings for CSV
-            if isinstance(value, dict):
-                row[header] = json.dumps(value)
-            # Convert float to string if it's Response Time
-            elif header == "Response Time" and isinstance(value, (float, int)):
-                row[header] = f"{value:.4f}"  # Format to 4 decimal places for consistency
-            else:
-                row[header] = value
-        writer.writerow(row)
-
-    response = make_response(output.getvalue())
-    response.headers["Content-Disposition"] = "attachment; filename=all_test_cases.csv"
-    response.headers["Content-type"] = "text/csv"
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    # Rows are written as they are produced, so large exports start downloading immediately
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=all_test_cases.{extension}"
     return response
 
 if __name__ == '__main__':